@@ -0,0 +1,119 @@
+"""Persistent round-robin rotation over account reference pools."""
+
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+
+
+class AccountRotation:
+    """Shuffled rings with a cursor, one per named pool.
+
+    Each pool is a random permutation of its items walked by a cursor, so a
+    pick is O(1) and every item is used once before any repeats. When the
+    cursor wraps the ring is reshuffled. Cursors survive restarts when a path
+    is given; a pool whose items changed is reshuffled from scratch.
+
+    A pool's items are hashed only when it is registered, i.e. the first time
+    `next` sees a given items object for it (or on `register`); later picks
+    with the same object skip the hash. Call `register` after changing a
+    pool's list in place.
+    """
+
+    def __init__(self, path='data/account_rotation.json', seed=None):
+        self.path = path
+        self.pools = {}  # pool name -> {'signature', 'order', 'cursor'}
+        self._registered = {}  # pool name -> items object last registered
+        self.dirty = False
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load rotation state from disk, starting empty if missing or corrupt."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.pools = json.load(f).get('pools', {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Error loading account rotation: {str(e)}")
+
+    def save(self):
+        """Atomically write rotation state to disk if anything changed."""
+        if not self.path or not self.dirty:
+            return
+        with self._lock:
+            state = json.dumps({'pools': self.pools})
+            self.dirty = False
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(state)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            self.dirty = True
+            raise
+
+    @staticmethod
+    def _signature(items):
+        return hashlib.sha1(json.dumps(list(items), sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _shuffled(self, size, avoid_first=None):
+        order = list(range(size))
+        self._random.shuffle(order)
+        # Don't repeat the last pick right after a reshuffle
+        if size > 1 and order[0] == avoid_first:
+            swap = self._random.randrange(1, size)
+            order[0], order[swap] = order[swap], order[0]
+        return order
+
+    def register(self, pool, items):
+        """Set a pool's items, reshuffling it if they differ from the saved ones."""
+        with self._lock:
+            self._register(pool, items)
+
+    def _register(self, pool, items):
+        signature = self._signature(items)
+        state = self.pools.get(pool)
+        if state is None or state['signature'] != signature:
+            state = {'signature': signature, 'order': self._shuffled(len(items)), 'cursor': 0}
+            self.pools[pool] = state
+            self.dirty = True
+        self._registered[pool] = items
+        return state
+
+    def next(self, pool, items):
+        """Get the next item of the pool's ring, reshuffling when it wraps."""
+        if not items:
+            raise ValueError(f"Rotation pool '{pool}' is empty")
+        with self._lock:
+            state = self.pools.get(pool)
+            if state is None or self._registered.get(pool) is not items:
+                state = self._register(pool, items)
+            if state['cursor'] >= len(state['order']):
+                state['order'] = self._shuffled(len(items), avoid_first=state['order'][-1])
+                state['cursor'] = 0
+
+            index = state['order'][state['cursor']]
+            state['cursor'] += 1
+            self.dirty = True
+        return items[index]
+
+    def reset(self, pool=None):
+        """Forget one pool's position, or every pool's."""
+        with self._lock:
+            if pool is None:
+                self.pools = {}
+                self._registered = {}
+            else:
+                self.pools.pop(pool, None)
+                self._registered.pop(pool, None)
+            self.dirty = True
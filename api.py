@@ -1,10 +1,19 @@
+import asyncio
+import json
+import os
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 from social_media_automation import SocialMediaAutomation
+from job_queue import JobRunner, JobStore
+from llm_gateway import get_gateway, run_blocking
+from singleflight import SingleFlight
 
 app = FastAPI()
 automation = SocialMediaAutomation()
+# Identical generation requests arriving together share one upstream call
+inflight = SingleFlight()
 
 class ContentRequest(BaseModel):
     platform: str = "twitter"
@@ -19,10 +28,13 @@ class ContentWithImageRequest(BaseModel):
 
 @app.post("/generate_content")
 async def generate_content(request: ContentRequest):
-    content = automation.generate_content(
-        platform=request.platform,
-        content_type=request.content_type,
-        topic=request.topic
+    content = await inflight.do(
+        ('generate_content', request.platform, request.content_type, request.topic),
+        lambda: automation.generate_content_async(
+            platform=request.platform,
+            content_type=request.content_type,
+            topic=request.topic
+        )
     )
     
     if content is None:
@@ -32,11 +44,14 @@ async def generate_content(request: ContentRequest):
 
 @app.post("/generate_content_with_image")
 async def generate_content_with_image(request: ContentWithImageRequest):
-    result = await automation.generate_content_with_image(
-        platform=request.platform,
-        content_type=request.content_type,
-        topic=request.topic,
-        style=request.style
+    result = await inflight.do(
+        ('generate_content_with_image', request.platform, request.content_type, request.topic, request.style),
+        lambda: automation.generate_content_with_image(
+            platform=request.platform,
+            content_type=request.content_type,
+            topic=request.topic,
+            style=request.style
+        )
     )
     
     if result is None:
@@ -49,6 +64,100 @@ async def generate_content_with_image(request: ContentWithImageRequest):
         "image_prompt": result['image_prompt']
     }
 
+def run_content_with_image_job(params, progress):
+    """Generate text, image prompt and image, reporting each stage as it finishes"""
+    content = automation.generate_content(params['platform'], params['content_type'], params.get('topic'))
+    progress('content', content=content)
+    if not content:
+        raise ValueError("No content generated")
+    
+    image_prompt = automation.create_image_prompt(content, params['style'])
+    progress('image_prompt', image_prompt=image_prompt)
+    
+    image_url = automation.render_image(image_prompt)
+    progress('image', image_url=image_url)
+    return {"content": content, "image_url": image_url, "image_prompt": image_prompt}
+
+def run_content_job(params, progress):
+    """Generate text only"""
+    content = automation.generate_content(params['platform'], params['content_type'], params.get('topic'))
+    progress('content', content=content)
+    return {"content": content}
+
+jobs = JobRunner(
+    JobStore(os.getenv('JOB_DB_PATH', 'data/jobs.sqlite')),
+    handlers={'content': run_content_job, 'content_with_image': run_content_with_image_job},
+    max_workers=int(os.getenv('JOB_WORKERS', 2))
+)
+
+JOB_TTL_SECONDS = int(os.getenv('JOB_TTL_HOURS', 24)) * 3600
+JOB_PRUNE_INTERVAL = 600  # seconds
+
+async def prune_jobs_periodically():
+    """Drop finished jobs older than the TTL so the job tables stay bounded"""
+    while True:
+        try:
+            await run_blocking(jobs.store.prune, JOB_TTL_SECONDS)
+        except Exception as e:
+            print(f"Error pruning jobs: {str(e)}")
+        await asyncio.sleep(JOB_PRUNE_INTERVAL)
+
+@app.on_event("startup")
+async def resume_jobs():
+    # SQLite calls go through the worker pool so they never block the event loop
+    await run_blocking(jobs.resume)
+    asyncio.ensure_future(prune_jobs_periodically())
+
+@app.post("/jobs/content", status_code=202)
+async def submit_content_job(request: ContentRequest):
+    job_id = await run_blocking(jobs.submit, 'content', request.dict())
+    return {"status": "queued", "job_id": job_id}
+
+@app.post("/jobs/content_with_image", status_code=202)
+async def submit_content_with_image_job(request: ContentWithImageRequest):
+    job_id = await run_blocking(jobs.submit, 'content_with_image', request.dict())
+    return {"status": "queued", "job_id": job_id}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await run_blocking(jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def poll_job_events(job_id, after_seq):
+    """Get a job's new events, or None once the job no longer exists"""
+    if jobs.store.get(job_id) is None:
+        return None
+    return jobs.store.events_since(job_id, after_seq)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream a job's progress as server-sent events until it finishes"""
+    if await run_blocking(jobs.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        seq = 0
+        while True:
+            new_events = await run_blocking(poll_job_events, job_id, seq)
+            if new_events is None:  # pruned meanwhile
+                return
+            for event in new_events:
+                seq = event['seq']
+                yield f"id: {seq}\nevent: {event['stage']}\ndata: {json.dumps(event['data'])}\n\n"
+                # Every finished job ends with a done event
+                if event['stage'] == 'done':
+                    return
+            await asyncio.sleep(0.5)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/stats")
+async def stats():
+    return {"coalescing": inflight.get_stats(), "llm": get_gateway().get_stats()}
@@ -6,6 +6,8 @@ import sqlite3
 import os
 import uvicorn
 from social_media_automation import SocialMediaAutomation
+from llm_gateway import get_gateway, run_blocking
+from singleflight import SingleFlight
 from posting_system import TwitterPostingSystem, PostingSystem
 
 load_dotenv()
@@ -13,6 +15,8 @@ load_dotenv()
 app = FastAPI()
 JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key')
 automation = SocialMediaAutomation()
+# Identical generation requests arriving together share one upstream call
+inflight = SingleFlight()
 twitter_system = TwitterPostingSystem()
 posting_system = PostingSystem()
 
@@ -34,11 +38,18 @@ def update_content_status(content_id: int, status: str):
 @app.post("/generate_content")
 async def generate_content(request: ContentRequest):
     try:
-        content = automation.generate_content(platform=request.platform)
+        content = await inflight.do(
+            ('generate_content', request.platform),
+            lambda: automation.generate_content_async(platform=request.platform)
+        )
         return {"status": "success", "content": content}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/stats")
+async def stats():
+    return {"coalescing": inflight.get_stats(), "llm": get_gateway().get_stats()}
+
 @app.get("/action/{token}")
 async def handle_action(token: str):
     try:
@@ -78,7 +89,7 @@ async def approve_content(request: WebhookRequest):
             raise HTTPException(status_code=404, detail="Content not found")
             
         # 发布推文
-        if twitter_system.post_tweet(content):
+        if await run_blocking(twitter_system.post_tweet, content):
             # 从待处理内容中移除
             twitter_system.pending_contents.pop(content_id)
             return {"status": "success", "message": "Content approved and posted"}
@@ -116,7 +127,7 @@ async def approve_content(content_id: str):
         raise HTTPException(status_code=400, detail="Content is not pending")
     
     # 发布推文
-    if posting_system.post_tweet(details['content']):
+    if await run_blocking(posting_system.post_tweet, details['content']):
         details['status'] = 'approved'
         return {"message": "Content approved and posted successfully"}
     else:
@@ -1,4 +1,5 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, render_template_string, stream_with_context
+import json
 import os
 from content_assistant import ContentAssistant
 from dotenv import load_dotenv
@@ -79,6 +80,9 @@ EDIT_TEMPLATE = """
 
     <script>
         function submitAction(action) {
+            if (action === 'regenerate') {
+                return regenerate();
+            }
             const form = document.getElementById('editForm');
             const content = document.getElementById('content').value;
             const feedback = document.getElementById('feedback').value;
@@ -110,11 +114,87 @@ EDIT_TEMPLATE = """
                 alert('An error occurred');
             });
         }
+
+        // Stream the regenerated draft into the textarea as the model writes it
+        async function regenerate() {
+            const box = document.getElementById('content');
+            const button = document.querySelector('.regenerate');
+            const original = box.value;
+            button.disabled = true;
+            try {
+                const response = await fetch(`/review/regenerate/{{content_id}}/stream`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        content: original,
+                        feedback: document.getElementById('feedback').value
+                    })
+                });
+                if (!response.ok || !response.body) {
+                    throw new Error('Error generating new content');
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let text = '';
+                let finished = false;
+                box.value = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let boundary;
+                    while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                        const event = parseEvent(buffer.slice(0, boundary));
+                        buffer = buffer.slice(boundary + 2);
+                        if (event.type === 'delta') {
+                            text += event.data.text;
+                            box.value = text;
+                        } else if (event.type === 'done') {
+                            finished = true;
+                            box.value = event.data.new_content;
+                        } else if (event.type === 'error') {
+                            throw new Error(event.data.message);
+                        }
+                    }
+                }
+                if (!finished) {
+                    // The stream ended early (e.g. the connection dropped); don't keep a partial draft
+                    throw new Error('Generation was interrupted, please try again');
+                }
+            } catch (error) {
+                console.error('Error:', error);
+                box.value = original;
+                alert(error.message || 'An error occurred');
+            } finally {
+                button.disabled = false;
+            }
+        }
+
+        function parseEvent(message) {
+            let type = 'message';
+            let data = '';
+            for (const line of message.split('\\n')) {
+                if (line.startsWith('event: ')) type = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            return { type: type, data: data ? JSON.parse(data) : {} };
+        }
     </script>
 </body>
 </html>
 """
 
+def regenerate_prompt(content, feedback):
+    """Build the rewrite prompt for the regenerate action"""
+    return f"Please improve this content based on the following feedback:\n\nOriginal content:\n{content}\n\nFeedback:\n{feedback}\n\nGenerate improved version:"
+
+def sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/review/<action>/<content_id>', methods=['GET', 'POST'])
 def review_content(action, content_id):
     if content_id not in pending_content:
@@ -158,8 +238,7 @@ def review_content(action, content_id):
     
     elif action == 'regenerate':
         # Use feedback to improve content
-        prompt = f"Please improve this content based on the following feedback:\n\nOriginal content:\n{updated_content}\n\nFeedback:\n{feedback}\n\nGenerate improved version:"
-        new_content = content_assistant.generate_content(prompt)
+        new_content = content_assistant.generate_content(regenerate_prompt(updated_content, feedback))
         if new_content:
             return jsonify({
                 "success": True,
@@ -172,6 +251,30 @@ def review_content(action, content_id):
     
     return jsonify({"success": False, "message": "Invalid action"}), 400
 
+@app.route('/review/regenerate/<content_id>/stream', methods=['POST'])
+def regenerate_stream(content_id):
+    """Stream a regenerated draft as server-sent events, one per text delta"""
+    if content_id not in pending_content:
+        return jsonify({"success": False, "message": "Content not found"}), 404
+    
+    data = request.get_json() or {}
+    prompt = regenerate_prompt(data.get('content', pending_content[content_id]['text']),
+                               data.get('feedback', ''))
+    
+    def events():
+        text = []
+        try:
+            for delta in content_assistant.stream_content(prompt):
+                text.append(delta)
+                yield sse_event('delta', {"text": delta})
+            yield sse_event('done', {"new_content": ''.join(text)})
+        except Exception as e:
+            app.logger.error(f"Error streaming new content: {str(e)}")
+            yield sse_event('error', {"message": "Error generating new content"})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/success')
 def success():
     return "Action completed successfully!"
@@ -1,10 +1,13 @@
 import os
 import logging
-import openai
 import emoji
 import uuid
+import heapq
 from datetime import datetime
 from dotenv import load_dotenv
+from llm_gateway import get_gateway
+from memory_store import MemoryStore, SQLiteMemoryBackend
+from topic_extractor import TopicExtractor
 
 # Set up logging
 logging.basicConfig(
@@ -17,14 +20,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+SYSTEM_MESSAGE = """You are a tech thought leader who:
+- Provides actionable technical insights
+- Analyzes news with expertise
+- Creates viral but valuable content
+- Maintains technical credibility
+- Engages with Gen Z/Millennial humor"""
+
 class ContentAssistant:
     def __init__(self):
         load_dotenv()
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.llm = get_gateway()  # shared, rate-limited OpenAI client
         self.news_monitor = NewsMonitor()
         self.alpha_generator = AlphaGenerator()
-        self.memory_manager = MemoryManager()
-        self.context_handler = ContextHandler()
+        # Conversation memory survives restarts; only recently active users stay in RAM
+        memory_backend = SQLiteMemoryBackend(os.getenv('MEMORY_DB_PATH', 'data/memory.sqlite'))
+        topic_extractor = TopicExtractor(os.getenv('TOPIC_VOCABULARY_PATH', 'data/topic_vocabulary.json'))
+        self.memory_manager = MemoryManager(backend=memory_backend, topic_extractor=topic_extractor)
+        self.context_handler = ContextHandler(backend=memory_backend, topic_extractor=topic_extractor)
 
     def handle_interaction(self, content, interaction_type, user_id=None):
         """Handle any type of content interaction with memory"""
@@ -53,13 +66,6 @@ class ContentAssistant:
 
     def _generate_contextual_response(self, content, interaction_type, history, context):
         """Generate response based on context and history"""
-        system_message = """You are a tech thought leader who:
-- Provides actionable technical insights
-- Analyzes news with expertise
-- Creates viral but valuable content
-- Maintains technical credibility
-- Engages with Gen Z/Millennial humor"""
-
         prompt = self._create_response_prompt(
             content,
             interaction_type,
@@ -67,19 +73,40 @@ class ContentAssistant:
             context
         )
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
+        response = self.llm.chat(
+            route="final",
             messages=[
-                {"role": "system", "content": system_message},
+                {"role": "system", "content": SYSTEM_MESSAGE},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.8,
             presence_penalty=0.7,
-            frequency_penalty=0.6
+            frequency_penalty=0.6,
+            use_cache=True,  # identical prompts (e.g. regenerating with no feedback) reuse the reply
+            semantic=True  # so do prompts differing only in timestamps or small wording
         )
         
         return self._enhance_response(response.choices[0].message.content.strip())
 
+    def generate_content(self, prompt):
+        """Generate content for a free-form prompt, e.g. a rewrite request from the review page"""
+        try:
+            return self.llm.complete(self._content_messages(prompt), route="retry",
+                                     temperature=0.8, use_cache=True)
+        except Exception as e:
+            logger.error(f"Error generating content: {str(e)}")
+            return None
+
+    def stream_content(self, prompt):
+        """Like generate_content, but yields the text piece by piece as the model writes it"""
+        return self.llm.stream_chat(self._content_messages(prompt), route="retry", temperature=0.8)
+
+    def _content_messages(self, prompt):
+        return [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ]
+
     def _create_response_prompt(self, content, interaction_type, history, context):
         """Create appropriate prompt based on interaction type"""
         base_prompt = f"""
@@ -153,9 +180,14 @@ class AlphaGenerator:
 
 class MemoryManager:
     """Manage conversation memory and history"""
-    def __init__(self):
-        self.memories = {}
+    def __init__(self, max_memories_per_user=200, history_limit=5, backend=None, max_users=1000,
+                 topic_extractor=None):
+        self.topic_extractor = topic_extractor or TopicExtractor()
+        # user_id -> that user's memories, oldest first; the oldest drop off at capacity
+        self.memories = MemoryStore('memories', backend, max_keys=max_users, max_records=max_memories_per_user,
+                                    on_load=self.reindex)
         self.interaction_graph = {}
+        self.history_limit = history_limit
         
     def store_interaction(self, content, response, user_id=None):
         """Store interaction with metadata"""
@@ -163,6 +195,7 @@ class MemoryManager:
         timestamp = datetime.now().isoformat()
         
         memory = {
+            "id": interaction_id,
             "content": content,
             "response": response,
             "timestamp": timestamp,
@@ -171,33 +204,36 @@ class MemoryManager:
             "user_id": user_id
         }
         
-        self.memories[interaction_id] = memory
+        self.memories.append(user_id, memory)
+        if response:
+            self.topic_extractor.add_documents([response])
         self._update_interaction_graph(interaction_id, user_id)
         
+    def reindex(self, memories):
+        """Re-extract topics for memories, e.g. ones stored under an older vocabulary"""
+        all_topics = self.topic_extractor.extract_batch([memory["content"] for memory in memories])
+        for memory, topics in zip(memories, all_topics):
+            memory["topics"] = topics
+
     def get_relevant_history(self, current_content, user_id=None):
         """Get relevant historical interactions"""
-        current_topics = self._extract_topics(current_content)
-        relevant_memories = []
+        if not user_id:
+            return []
+        current_topics = set(self._extract_topics(current_content))
         
-        for memory in self.memories.values():
-            if user_id and memory["user_id"] == user_id:
-                relevance = self._calculate_relevance(memory, current_topics)
-                if relevance > 0.5:  # Threshold for relevance
-                    relevant_memories.append(memory)
+        # Newest first, so ties in relevance go to the more recent memory
+        scored = []
+        for memory in reversed(list(self.memories.get(user_id))):
+            relevance = self._calculate_relevance(memory, current_topics)
+            if relevance > 0.5:  # Threshold for relevance
+                scored.append((relevance, memory))
         
-        return sorted(
-            relevant_memories,
-            key=lambda x: (
-                self._calculate_relevance(x, current_topics),
-                x["timestamp"]
-            ),
-            reverse=True
-        )[:5]
+        best = heapq.nlargest(self.history_limit, scored, key=lambda item: (item[0], item[1]["timestamp"]))
+        return [memory for _, memory in best]
 
     def _extract_topics(self, content):
         """Extract topics from content"""
-        # Placeholder for topic extraction
-        return ["ai", "tech", "privacy"]
+        return self.topic_extractor.extract(content)
 
     def _analyze_sentiment(self, content):
         """Analyze content sentiment"""
@@ -206,8 +242,7 @@ class MemoryManager:
 
     def _calculate_relevance(self, memory, current_topics):
         """Calculate relevance score"""
-        memory_topics = memory["topics"]
-        return len(set(memory_topics) & set(current_topics))
+        return len(current_topics.intersection(memory["topics"]))
 
     def _update_interaction_graph(self, interaction_id, user_id):
         """Update interaction graph"""
@@ -216,34 +251,31 @@ class MemoryManager:
 
 class ContextHandler:
     """Handle conversation context and state"""
-    def __init__(self):
-        self.contexts = {}
+    def __init__(self, backend=None, max_users=1000, max_context=10, topic_extractor=None):
+        # Keep only recent context per user
+        self.contexts = MemoryStore('contexts', backend, max_keys=max_users, max_records=max_context)
         self.active_conversations = {}
+        self.topic_extractor = topic_extractor or TopicExtractor()
         
     def get_context(self, user_id):
         """Get current context for user"""
-        if user_id in self.contexts:
-            return self.contexts[user_id]
+        context = self.contexts.get(user_id)
+        if context:
+            return list(context)
         return None
         
     def update_context(self, user_id, content, response):
         """Update context based on new interaction"""
-        if user_id not in self.contexts:
-            self.contexts[user_id] = []
-            
-        self.contexts[user_id].append({
+        self.contexts.append(user_id, {
             "content": content,
             "response": response,
             "timestamp": datetime.now().isoformat()
         })
-        
-        # Keep only recent context
-        self.contexts[user_id] = self.contexts[user_id][-10:]
 
     def _analyze_conversation(self, user_id):
         """Analyze conversation patterns"""
-        if user_id in self.contexts:
-            conversation = self.contexts[user_id]
+        conversation = self.get_context(user_id)
+        if conversation:
             topics = []
             sentiment_trend = []
             
@@ -261,8 +293,7 @@ class ContextHandler:
 
     def _extract_topics(self, content):
         """Extract topics from content"""
-        # Placeholder for topic extraction
-        return ["ai", "tech", "privacy"]
+        return self.topic_extractor.extract(content)
 
     def _analyze_sentiment(self, content):
         """Analyze content sentiment"""
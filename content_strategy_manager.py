@@ -3,6 +3,8 @@ import random
 from datetime import datetime
 from pathlib import Path
 
+from tweet_length import MAX_TWEET_LENGTH, weighted_length
+
 class ContentStrategyManager:
     def __init__(self, strategy_file='config/content_strategy.json'):
         self.strategy_file = strategy_file
@@ -68,7 +70,8 @@ Include a call to action from: {', '.join(self.strategy['content_guidelines']['c
         """Evaluate if content meets guidelines"""
         guidelines = self.strategy['content_guidelines']
         length_rules = guidelines['post_length'][platform]
-        content_length = len(content)
+        # Twitter counts CJK and emoji double and every URL as 23
+        content_length = weighted_length(content) if platform == 'twitter' else len(content)
         
         # More lenient length check
         length_margin = 20  # Allow 20 characters margin
@@ -83,6 +86,8 @@ Include a call to action from: {', '.join(self.strategy['content_guidelines']['c
             'matches_tone': all(tone not in content.lower() 
                               for tone in self.strategy['content_strategy']['tone_of_voice']['avoid'])
         }
+        if platform == 'twitter':
+            evaluation['within_limit'] = content_length <= MAX_TWEET_LENGTH
         
         # Print evaluation details for debugging
         print(f"Content length: {content_length}")
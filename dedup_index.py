@@ -0,0 +1,156 @@
+"""Near-duplicate story detection with SimHash fingerprints and LSH buckets."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def simhash(text, bits=64):
+    """Compute a SimHash fingerprint of the text's word counts."""
+    counts = Counter(word for word in _WORD_RE.findall(text.lower()) if len(word) > 2)
+    vector = [0] * bits
+    for word, weight in counts.items():
+        # Stable across runs, unlike hash()
+        word_hash = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=bits // 8).digest(), 'big')
+        for bit in range(bits):
+            vector[bit] += weight if word_hash >> bit & 1 else -weight
+    fingerprint = 0
+    for bit in range(bits):
+        if vector[bit] > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class SimHashIndex:
+    """Persistent SimHash index that clusters near-duplicate articles.
+
+    Fingerprints are split into `bands` blocks and bucketed by block value.
+    Two fingerprints within `max_distance` bits (with max_distance < bands)
+    are guaranteed to share a block, so a lookup only compares against the
+    few fingerprints in its own buckets instead of the whole index.
+    """
+
+    def __init__(self, path='data/dedup_index.json', bits=64, bands=8, max_distance=7,
+                 retention_days=7):
+        if max_distance >= bands:
+            raise ValueError("max_distance must be smaller than bands")
+        self.path = path
+        self.bits = bits
+        self.bands = bands
+        self.band_bits = bits // bands
+        self.max_distance = max_distance
+        self.retention_seconds = retention_days * 86400
+        self.entries = {}  # article id -> {'fingerprint', 'cluster_id', 'published_on'}
+        self.cluster_sizes = {}  # cluster id -> number of articles
+        self.buckets = {}  # (band, block value) -> set of article ids
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def _insert(self, article_id, fingerprint, cluster_id, published_on):
+        self.entries[article_id] = {
+            'fingerprint': fingerprint,
+            'cluster_id': cluster_id,
+            'published_on': published_on
+        }
+        self.cluster_sizes[cluster_id] = self.cluster_sizes.get(cluster_id, 0) + 1
+        for key in self._band_keys(fingerprint):
+            self.buckets.setdefault(key, set()).add(article_id)
+
+    def find_duplicate(self, fingerprint):
+        """Get the cluster id of the closest indexed fingerprint, or None."""
+        best_id, best_distance = None, self.max_distance + 1
+        for key in self._band_keys(fingerprint):
+            for candidate_id in self.buckets.get(key, ()):
+                distance = (fingerprint ^ self.entries[candidate_id]['fingerprint']).bit_count()
+                if distance < best_distance:
+                    best_id, best_distance = candidate_id, distance
+        return self.entries[best_id]['cluster_id'] if best_id is not None else None
+
+    def add(self, article_id, text, published_on=None):
+        """Index an article and get its cluster id.
+
+        The cluster id is the id of the first article seen for the story, so
+        a result different from `article_id` means the article is a duplicate.
+        """
+        with self._lock:
+            if article_id in self.entries:
+                return self.entries[article_id]['cluster_id']
+            fingerprint = simhash(text, self.bits)
+            cluster_id = self.find_duplicate(fingerprint) or article_id
+            self._insert(article_id, fingerprint, cluster_id,
+                         published_on if published_on is not None else int(time.time()))
+            self.dirty = True
+            return cluster_id
+
+    def cluster_size(self, cluster_id):
+        """Get how many articles have been clustered into a story."""
+        return self.cluster_sizes.get(cluster_id, 0)
+
+    def prune(self, now=None):
+        """Forget articles older than the retention period."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [article_id for article_id, entry in self.entries.items()
+                       if now - entry['published_on'] > self.retention_seconds]
+            for article_id in expired:
+                entry = self.entries.pop(article_id)
+                for key in self._band_keys(entry['fingerprint']):
+                    self.buckets[key].discard(article_id)
+                    if not self.buckets[key]:
+                        del self.buckets[key]
+                self.cluster_sizes[entry['cluster_id']] -= 1
+                if not self.cluster_sizes[entry['cluster_id']]:
+                    del self.cluster_sizes[entry['cluster_id']]
+            if expired:
+                self.dirty = True
+
+    def load(self):
+        """Load the index from disk, rebuilding the buckets."""
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (ValueError, OSError) as e:
+            print(f"Error loading dedup index: {str(e)}")
+            return
+        for article_id, entry in state.get('entries', {}).items():
+            self._insert(article_id, int(entry['fingerprint'], 16), entry['cluster_id'],
+                         entry['published_on'])
+
+    def save(self):
+        """Atomically write the index to disk if anything changed."""
+        with self._lock:
+            if not self.dirty:
+                return
+            entries = {
+                article_id: {
+                    'fingerprint': format(entry['fingerprint'], 'x'),
+                    'cluster_id': entry['cluster_id'],
+                    'published_on': entry['published_on']
+                }
+                for article_id, entry in self.entries.items()
+            }
+            self.dirty = False
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
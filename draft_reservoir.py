@@ -0,0 +1,132 @@
+"""SQLite reservoir of pre-generated, validated tweet drafts.
+
+A background producer keeps the reservoir topped up; at posting time the
+best draft that is still fresh is taken with one indexed lookup, so a post
+goes out even if the news feed or the LLM is down right then.
+"""
+
+import os
+import sqlite3
+import time
+
+from tweet_length import is_valid_tweet
+
+
+class DraftReservoir:
+    """Bounded store of drafts ranked by score and tagged with topic and freshness.
+
+    Expired drafts are dropped before every read. When full, a new draft
+    replaces the lowest scoring one if it scores higher. Only one draft is
+    kept per story (article or dedup cluster id); taken drafts stay behind,
+    marked with `taken_at`, until the story expires so it is not drafted again.
+    """
+
+    def __init__(self, db_path='data/draft_reservoir.sqlite', capacity=10, max_age_hours=24):
+        self.db_path = db_path
+        self.capacity = capacity
+        self.max_age_seconds = max_age_hours * 3600
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """Initialize drafts table"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS drafts
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             text TEXT NOT NULL UNIQUE,
+             topic TEXT,
+             story_id TEXT UNIQUE,
+             score REAL NOT NULL,
+             created_at REAL NOT NULL,
+             expires_at REAL NOT NULL,
+             taken_at REAL)
+        ''')
+        # Reservoirs created before drafts were marked as taken
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(drafts)')]
+        if 'taken_at' not in columns:
+            conn.execute('ALTER TABLE drafts ADD COLUMN taken_at REAL')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_drafts_score ON drafts (score)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_drafts_expires ON drafts (expires_at)')
+        conn.commit()
+        conn.close()
+
+    def _prune(self, conn, now):
+        conn.execute('DELETE FROM drafts WHERE expires_at <= ?', (now,))
+
+    def add(self, text, score, topic=None, story_id=None, published_on=None, now=None):
+        """Add a draft; returns False if it is invalid, a duplicate, or scores too low to fit"""
+        if not text or not is_valid_tweet(text):
+            return False
+        now = time.time() if now is None else now
+        # Freshness follows the underlying story, not when the draft was written
+        expires_at = (published_on or now) + self.max_age_seconds
+        if expires_at <= now:
+            return False
+
+        conn = self._connect()
+        try:
+            self._prune(conn, now)
+            count = conn.execute('SELECT COUNT(*) FROM drafts WHERE taken_at IS NULL').fetchone()[0]
+            if count >= self.capacity:
+                lowest = conn.execute('''
+                    SELECT id, score FROM drafts WHERE taken_at IS NULL ORDER BY score LIMIT 1
+                ''').fetchone()
+                if lowest[1] >= score:
+                    return False
+                conn.execute('DELETE FROM drafts WHERE id = ?', (lowest[0],))
+            conn.execute('''
+                INSERT INTO drafts (text, topic, story_id, score, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (text, topic, story_id, score, now, expires_at))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        finally:
+            conn.close()
+
+    def take_best(self, now=None):
+        """Mark the highest scoring fresh draft as taken and return it as a dict, or None"""
+        now = time.time() if now is None else now
+        conn = self._connect()
+        try:
+            self._prune(conn, now)
+            row = conn.execute('''
+                SELECT id, text, topic, story_id, score, created_at, expires_at
+                FROM drafts WHERE taken_at IS NULL ORDER BY score DESC LIMIT 1
+            ''').fetchone()
+            if row is None:
+                conn.commit()
+                return None
+            conn.execute('UPDATE drafts SET taken_at = ? WHERE id = ?', (now, row[0]))
+            conn.commit()
+        finally:
+            conn.close()
+        keys = ('id', 'text', 'topic', 'story_id', 'score', 'created_at', 'expires_at')
+        return dict(zip(keys, row))
+
+    def has_story(self, story_id):
+        """Check whether the story already has a draft, waiting or taken"""
+        conn = self._connect()
+        row = conn.execute('SELECT 1 FROM drafts WHERE story_id = ?', (story_id,)).fetchone()
+        conn.close()
+        return row is not None
+
+    def count(self, now=None):
+        """Count fresh drafts still waiting to be taken"""
+        now = time.time() if now is None else now
+        conn = self._connect()
+        count = conn.execute('SELECT COUNT(*) FROM drafts WHERE expires_at > ? AND taken_at IS NULL',
+                             (now,)).fetchone()[0]
+        conn.close()
+        return count
+
+    def free_slots(self, now=None):
+        """Get how many drafts the reservoir can take before it is full"""
+        return max(0, self.capacity - self.count(now))
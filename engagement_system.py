@@ -5,6 +5,8 @@ import os
 import time
 from pathlib import Path
 from dotenv import load_dotenv
+from keyword_matcher import KeywordMatcher
+from http_replay import configure_session
 
 # 加载环境变量
 load_dotenv()
@@ -20,6 +22,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 互动关键词匹配器（只编译一次）
+RELEVANT_MATCHER = KeywordMatcher(['crypto', 'blockchain', 'defi', 'ai', 'web3'])
+HIGH_VALUE_MATCHER = KeywordMatcher(['announcement', 'breaking', 'news', 'research'])
+
 class TwitterEngagementSystem:
     def __init__(self):
         self.config_dir = Path(__file__).parent / "config"
@@ -44,6 +50,8 @@ class TwitterEngagementSystem:
                 access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
                 access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
             )
+            # HTTP_MODE=record|replay 时使用离线录制/回放
+            configure_session(self.client.session)
             logger.info("Successfully connected to Twitter API")
         except Exception as e:
             logger.error(f"Failed to initialize Twitter API: {e}")
@@ -200,14 +208,12 @@ class TwitterEngagementSystem:
     def should_engage_with_tweet(self, text):
         """决定是否与推文互动"""
         # 检查推文是否包含相关关键词
-        relevant_keywords = ['crypto', 'blockchain', 'defi', 'ai', 'web3']
-        return any(keyword in text.lower() for keyword in relevant_keywords)
+        return RELEVANT_MATCHER.matches(text)
 
     def should_retweet(self, text):
         """决定是否转发推文"""
         # 更严格的转发标准
-        high_value_keywords = ['announcement', 'breaking', 'news', 'research']
-        return any(keyword in text.lower() for keyword in high_value_keywords)
+        return HIGH_VALUE_MATCHER.matches(text)
 
     def has_engaged(self, tweet_id):
         """检查是否已经与推文互动过"""
@@ -0,0 +1,188 @@
+"""Caching transport adapter for requests sessions.
+
+Mount `CachingHTTPAdapter` on a `requests.Session` to serve GET responses
+from an on-disk SQLite store for a per-endpoint TTL, and to revalidate
+stale entries with If-None-Match / If-Modified-Since instead of
+re-downloading them.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers describing the wire encoding, which no longer apply to the decoded body we store
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class HTTPCacheStore:
+    """SQLite store of cached responses keyed by method and URL."""
+
+    def __init__(self, db_path='data/http_cache.sqlite'):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """Initialize cache table"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses
+            (key TEXT PRIMARY KEY,
+             status INTEGER NOT NULL,
+             headers TEXT NOT NULL,
+             body BLOB NOT NULL,
+             etag TEXT,
+             last_modified TEXT,
+             stored_at REAL NOT NULL)
+        ''')
+        conn.commit()
+        conn.close()
+
+    def get(self, key):
+        """Get a cached entry as a dict, or None"""
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?',
+            (key,)
+        ).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        status, headers, body, etag, last_modified, stored_at = row
+        return {
+            'status': status,
+            'headers': json.loads(headers),
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': stored_at
+        }
+
+    def put(self, key, status, headers, body, etag=None, last_modified=None):
+        """Store or replace a cached entry"""
+        conn = self._connect()
+        conn.execute('''
+            INSERT OR REPLACE INTO responses (key, status, headers, body, etag, last_modified, stored_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (key, status, json.dumps(headers), body, etag, last_modified, time.time()))
+        conn.commit()
+        conn.close()
+
+    def touch(self, key):
+        """Mark an entry as freshly validated"""
+        conn = self._connect()
+        conn.execute('UPDATE responses SET stored_at = ? WHERE key = ?', (time.time(), key))
+        conn.commit()
+        conn.close()
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that caches GET responses with per-endpoint TTLs.
+
+    `ttl_rules` maps URL prefixes to TTLs in seconds; the longest matching
+    prefix wins. URLs without a rule (and a zero `default_ttl`) bypass the
+    cache entirely. Extra keyword arguments go to `HTTPAdapter`, so retries
+    still apply to the requests that reach the network. If `transport` (an
+    adapter, e.g. the record/replay one) is set, requests the cache cannot
+    answer are sent through it instead of the network.
+    """
+
+    def __init__(self, cache_store, ttl_rules=None, default_ttl=0, transport=None, **kwargs):
+        super().__init__(**kwargs)
+        self.transport = transport
+        self.cache_store = cache_store
+        self.ttl_rules = sorted((ttl_rules or {}).items(), key=lambda rule: len(rule[0]), reverse=True)
+        self.default_ttl = default_ttl
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'bypassed': 0}
+
+    def ttl_for(self, url):
+        """Get the TTL in seconds for a URL"""
+        for prefix, ttl in self.ttl_rules:
+            if url.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def get_stats(self):
+        """Get a snapshot of the hit/miss counters"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['revalidated']) / lookups if lookups else 0.0
+        return stats
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def send(self, request, **kwargs):
+        ttl = self.ttl_for(request.url)
+        if request.method != 'GET' or ttl <= 0 or kwargs.get('stream'):
+            self._count('bypassed')
+            return self._send_upstream(request, **kwargs)
+
+        key = f"{request.method} {request.url}"
+        entry = self.cache_store.get(key)
+
+        if entry is not None:
+            if time.time() - entry['stored_at'] < ttl:
+                self._count('hits')
+                return self._build_response(request, entry)
+            # Stale: ask the server whether our copy is still valid
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self._send_upstream(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache_store.touch(key)
+            self._count('revalidated')
+            return self._build_response(request, entry)
+
+        self._count('misses')
+        if response.status_code == 200:
+            headers = {name: value for name, value in response.headers.items()
+                       if name.lower() not in _DROPPED_HEADERS}
+            self.cache_store.put(
+                key,
+                response.status_code,
+                headers,
+                response.content,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        return response
+
+    def _send_upstream(self, request, **kwargs):
+        if self.transport is not None:
+            return self.transport.send(request, **kwargs)
+        return super().send(request, **kwargs)
+
+    def _build_response(self, request, entry):
+        """Build a requests.Response from a cached entry"""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
@@ -0,0 +1,331 @@
+"""Record/replay HTTP layer and local stand-in server for offline runs.
+
+Captured upstream responses (CryptoCompare, CoinGecko, OpenAI, Twitter) are
+kept in a cassette directory and can be served back in two ways:
+
+* `ReplayAdapter` mounts on any requests.Session (our shared session, the
+  CoinGecko client, tweepy's Client.session) and answers without network.
+* `StandInServer` serves the same cassette over real sockets, for clients
+  that don't use requests (the OpenAI SDK: point OPENAI_BASE_URL at
+  http://127.0.0.1:<port>/v1) and for load tests that want real I/O.
+
+Both can add latency and inject errors. Recording works with
+`RecordingAdapter` for requests sessions, or by running the stand-in server
+with upstreams so unknown requests are proxied and captured.
+
+Sessions are switched over from the environment by `configure_session`:
+HTTP_MODE=record|replay, HTTP_CASSETTE_DIR, HTTP_REPLAY_LATENCY,
+HTTP_REPLAY_JITTER, HTTP_REPLAY_ERROR_RATE.
+
+    python http_replay.py --cassette data/cassettes --port 8765 --latency 0.2 --error-rate 0.05
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Query parameters carrying credentials, never written to or matched from a cassette
+SECRET_PARAMS = {'api_key', 'x_cg_pro_api_key', 'x_cg_demo_api_key', 'apikey'}
+
+# Headers that must not be replayed as-is
+HOP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+# Path prefix -> upstream base URL, used when the stand-in server records by proxying
+DEFAULT_UPSTREAMS = {
+    '/data/': 'https://min-api.cryptocompare.com',
+    '/api/v3/': 'https://api.coingecko.com',
+    '/v1/': 'https://api.openai.com',
+    '/2/': 'https://api.twitter.com',
+}
+
+
+def request_key(method, url):
+    """Build the cassette key for a request, ignoring host and credentials."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SECRET_PARAMS)
+    key = f"{method.upper()} {parts.path}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+class Cassette:
+    """Directory of recorded responses, one JSON file per request key.
+
+    A key can hold several responses; replays cycle through them in order.
+    """
+
+    def __init__(self, path='data/cassettes'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._cache = {}
+
+    def _file_for(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def _load(self, key):
+        if key not in self._cache:
+            try:
+                with open(self._file_for(key), 'r') as f:
+                    self._cache[key] = json.load(f)['responses']
+            except FileNotFoundError:
+                self._cache[key] = []
+        return self._cache[key]
+
+    def record(self, key, status, headers, body):
+        """Append a response for the key"""
+        try:
+            entry = {'status': status, 'headers': dict(headers), 'body': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            entry = {'status': status, 'headers': dict(headers),
+                     'body': base64.b64encode(body).decode('ascii'), 'base64': True}
+        entry['headers'] = {k: v for k, v in entry['headers'].items() if k.lower() not in HOP_HEADERS}
+        with self._lock:
+            responses = self._load(key)
+            responses.append(entry)
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._file_for(key), 'w') as f:
+                json.dump({'key': key, 'responses': responses}, f, indent=2)
+
+    def next_response(self, key):
+        """Get the next recorded (status, headers, body) for the key, or None"""
+        with self._lock:
+            responses = self._load(key)
+            if not responses:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            entry = responses[cursor % len(responses)]
+        body = entry['body']
+        body = base64.b64decode(body) if entry.get('base64') else body.encode('utf-8')
+        return entry['status'], entry['headers'], body
+
+
+class FaultInjector:
+    """Configurable latency and error injection for replayed responses."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self):
+        """Sleep for the configured latency; get an error status to return, or None"""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return self.error_status if fail else None
+
+
+def error_body(message):
+    return json.dumps({'error': message}).encode('utf-8')
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that passes requests through and records the responses."""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.cassette.record(request_key(request.method, request.url),
+                             response.status_code, response.headers, response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """HTTPAdapter that answers from a cassette without touching the network."""
+
+    def __init__(self, cassette, faults=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.faults = faults or FaultInjector()
+
+    def send(self, request, **kwargs):
+        error_status = self.faults.apply()
+        if error_status:
+            return self._build_response(request, error_status, {}, error_body('injected error'))
+
+        recorded = self.cassette.next_response(request_key(request.method, request.url))
+        if recorded is None:
+            return self._build_response(request, 404, {}, error_body('no recording'))
+        return self._build_response(request, *recorded)
+
+    def _build_response(self, request, status, headers, body):
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = 'OK' if status < 400 else 'Error'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def configure_session(session):
+    """Mount a record or replay adapter on the session according to HTTP_MODE.
+
+    An adapter already mounted with a `transport` slot (the caching adapter)
+    is kept and routes its upstream requests through the new adapter, so
+    caching and its stats still work offline. Returns the session unchanged
+    when HTTP_MODE is unset.
+    """
+    mode = os.getenv('HTTP_MODE', '').lower()
+    if mode not in ('record', 'replay'):
+        return session
+    cassette = Cassette(os.getenv('HTTP_CASSETTE_DIR', 'data/cassettes'))
+    if mode == 'record':
+        adapter = RecordingAdapter(cassette)
+    else:
+        adapter = ReplayAdapter(cassette, FaultInjector(
+            latency=float(os.getenv('HTTP_REPLAY_LATENCY', 0)),
+            jitter=float(os.getenv('HTTP_REPLAY_JITTER', 0)),
+            error_rate=float(os.getenv('HTTP_REPLAY_ERROR_RATE', 0))
+        ))
+    for prefix in ('https://', 'http://'):
+        mounted = session.adapters.get(prefix)
+        if hasattr(mounted, 'transport'):
+            mounted.transport = adapter
+        else:
+            session.mount(prefix, adapter)
+    return session
+
+
+class StandInServer:
+    """Local HTTP server serving a cassette with latency and error injection.
+
+    If `upstreams` (path prefix -> base URL) is given, requests without a
+    recording are proxied to the matching upstream and recorded.
+    """
+
+    def __init__(self, cassette, host='127.0.0.1', port=0, faults=None, upstreams=None):
+        self.cassette = cassette
+        self.faults = faults or FaultInjector()
+        self.upstreams = upstreams or {}
+        self.stats = {'served': 0, 'missing': 0, 'injected_errors': 0, 'recorded': 0}
+        self._stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _proxy(self, method, path, headers, body):
+        for prefix, upstream in self.upstreams.items():
+            if path.startswith(prefix):
+                headers = {k: v for k, v in headers.items() if k.lower() not in ('host', 'content-length')}
+                response = requests.request(method, upstream + path, headers=headers,
+                                            data=body or None, timeout=120)
+                self.cassette.record(request_key(method, path), response.status_code,
+                                     response.headers, response.content)
+                self._count('recorded')
+                return response.status_code, dict(response.headers), response.content
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+
+                error_status = server.faults.apply()
+                if error_status:
+                    server._count('injected_errors')
+                    return self._reply(error_status, {'Content-Type': 'application/json'},
+                                       error_body('injected error'))
+
+                recorded = server.cassette.next_response(request_key(self.command, self.path))
+                if recorded is None:
+                    recorded = server._proxy(self.command, self.path, dict(self.headers), body)
+                if recorded is None:
+                    server._count('missing')
+                    return self._reply(404, {'Content-Type': 'application/json'},
+                                       error_body('no recording'))
+                server._count('served')
+                self._reply(*recorded)
+
+            def _reply(self, status, headers, body):
+                self.send_response(status)
+                for name, value in headers.items():
+                    if name.lower() not in HOP_HEADERS:
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='http-stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded API responses locally")
+    parser.add_argument('--cassette', default='data/cassettes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random latency, seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests failing")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--record', action='store_true', help="proxy unknown requests upstream and record them")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        Cassette(args.cassette),
+        host=args.host,
+        port=args.port,
+        faults=FaultInjector(args.latency, args.jitter, args.error_rate, args.error_status),
+        upstreams=DEFAULT_UPSTREAMS if args.record else None
+    )
+    print(f"Serving {args.cassette} on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Background generation jobs persisted in SQLite.
+
+A job is submitted with a kind and JSON params and gets an id back at once;
+a thread pool runs the registered handler for its kind. Handlers report
+progress through a callback, one event per finished stage, which callers
+can poll or stream. Jobs left queued or running when the process stopped
+are picked up again by `JobRunner.resume()`. Finished jobs and their
+events are dropped by `JobStore.prune()` once they are older than a TTL.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobStore:
+    """SQLite store of jobs and their progress events."""
+
+    def __init__(self, db_path='data/jobs.sqlite'):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self):
+        """Initialize job tables"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs
+            (id TEXT PRIMARY KEY,
+             kind TEXT NOT NULL,
+             params TEXT NOT NULL,
+             status TEXT NOT NULL,
+             stage TEXT,
+             result TEXT,
+             error TEXT,
+             created_at REAL NOT NULL,
+             updated_at REAL NOT NULL)
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS job_events
+            (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+             job_id TEXT NOT NULL,
+             stage TEXT NOT NULL,
+             data TEXT NOT NULL,
+             created_at REAL NOT NULL)
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, seq)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs (status, updated_at)')
+        conn.commit()
+        conn.close()
+
+    def create(self, kind, params):
+        """Insert a queued job and get its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        conn.execute('INSERT INTO jobs (id, kind, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                     (job_id, kind, json.dumps(params), QUEUED, now, now))
+        conn.commit()
+        conn.close()
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Set job columns; result is stored as JSON"""
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        conn = self._connect()
+        conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+        conn.commit()
+        conn.close()
+
+    def get(self, job_id):
+        """Get a job as a dict, or None"""
+        conn = self._connect()
+        row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+    def add_event(self, job_id, stage, data):
+        """Record a progress event for a job"""
+        conn = self._connect()
+        conn.execute('INSERT INTO job_events (job_id, stage, data, created_at) VALUES (?, ?, ?, ?)',
+                     (job_id, stage, json.dumps(data), time.time()))
+        conn.execute('UPDATE jobs SET stage = ?, updated_at = ? WHERE id = ?', (stage, time.time(), job_id))
+        conn.commit()
+        conn.close()
+
+    def events_since(self, job_id, after_seq=0):
+        """Get a job's progress events with seq greater than after_seq, oldest first"""
+        conn = self._connect()
+        rows = conn.execute('SELECT seq, stage, data, created_at FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq',
+                            (job_id, after_seq)).fetchall()
+        conn.close()
+        return [{'seq': row['seq'], 'stage': row['stage'], 'data': json.loads(row['data']),
+                 'created_at': row['created_at']} for row in rows]
+
+    def prune(self, max_age, now=None):
+        """Delete finished jobs (and their events) not updated for max_age seconds; returns how many"""
+        cutoff = (time.time() if now is None else now) - max_age
+        conn = self._connect()
+        expired = [row['id'] for row in conn.execute(
+            'SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?', (*FINISHED, cutoff)).fetchall()]
+        for job_id in expired:
+            conn.execute('DELETE FROM job_events WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        conn.commit()
+        conn.close()
+        return len(expired)
+
+    def unfinished(self):
+        """Get ids of jobs that are still queued or were interrupted while running"""
+        conn = self._connect()
+        rows = conn.execute('SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at',
+                            (QUEUED, RUNNING)).fetchall()
+        conn.close()
+        return [row['id'] for row in rows]
+
+
+class JobRunner:
+    """Run stored jobs on a thread pool with handlers registered per kind.
+
+    A handler is called as handler(params, progress) and returns the job
+    result; progress(stage, **data) records a progress event.
+    """
+
+    def __init__(self, store, handlers, max_workers=2):
+        self.store = store
+        self.handlers = handlers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params):
+        """Store a job and queue it; returns the job id immediately"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = self.store.create(kind, params)
+        self._schedule(job_id)
+        return job_id
+
+    def resume(self):
+        """Queue jobs a previous process left unfinished; returns their ids"""
+        job_ids = self.store.unfinished()
+        for job_id in job_ids:
+            self.store.update(job_id, status=QUEUED)
+            self._schedule(job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} unfinished jobs")
+        return job_ids
+
+    def _schedule(self, job_id):
+        with self._lock:
+            if job_id in self._active:
+                return
+            self._active.add(job_id)
+        self.executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        try:
+            job = self.store.get(job_id)
+            handler = self.handlers.get(job['kind'])
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            self.store.update(job_id, status=RUNNING, error=None)
+
+            def progress(stage, **data):
+                self.store.add_event(job_id, stage, data)
+
+            result = handler(job['params'], progress)
+            self.store.update(job_id, status=SUCCEEDED, result=result)
+            self.store.add_event(job_id, 'done', {'status': SUCCEEDED})
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.store.update(job_id, status=FAILED, error=str(e))
+            self.store.add_event(job_id, 'done', {'status': FAILED, 'error': str(e)})
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,61 @@
+"""Compiled keyword matcher shared by news classification and engagement rules."""
+
+import re
+from bisect import bisect_right
+
+# Joins batch texts; contains no word characters so no keyword can span two texts
+_BATCH_SEPARATOR = '\n\x00\n'
+
+
+class KeywordMatcher:
+    """Match a fixed keyword list with a single precompiled alternation regex.
+
+    Keywords may overlap: "agentic ai model" reports both "agentic ai" and
+    "ai model". Of keywords starting at the same position only the longest
+    is reported.
+
+    `keywords` match anywhere in the text (like `keyword in text.lower()`),
+    `word_keywords` only match as whole words (like `\\bkeyword\\b`).
+    """
+
+    def __init__(self, keywords=(), word_keywords=()):
+        self.keywords = [k.lower() for k in keywords]
+        self.word_keywords = [k.lower() for k in word_keywords]
+
+        # Longest first so keywords starting at the same position report the most specific one
+        alternatives = [re.escape(k) for k in sorted(self.keywords, key=len, reverse=True)]
+        if self.word_keywords:
+            words = sorted(self.word_keywords, key=len, reverse=True)
+            alternatives.append(r'\b(?:%s)\b' % '|'.join(re.escape(w) for w in words))
+        # An empty matcher never matches
+        alternation = '|'.join(alternatives) if alternatives else r'(?!)'
+        self.pattern = re.compile(alternation)
+        # Zero-width lookahead so a match does not consume the text a later keyword starts in
+        self.overlapping_pattern = re.compile(r'(?=(%s))' % alternation)
+
+    def matches(self, text):
+        """Check whether the text contains any keyword."""
+        return self.pattern.search(text.lower()) is not None
+
+    def find(self, text):
+        """Get the set of keywords found in the text."""
+        return {m.group(1) for m in self.overlapping_pattern.finditer(text.lower())}
+
+    def classify_batch(self, texts):
+        """Get the set of matched keywords for every text in one regex pass."""
+        # Lowercase per text since lower() can change a string's length
+        lowered = [text.lower() for text in texts]
+        results = [set() for _ in lowered]
+        if not lowered:
+            return results
+
+        starts = []
+        offset = 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + len(_BATCH_SEPARATOR)
+
+        joined = _BATCH_SEPARATOR.join(lowered)
+        for m in self.overlapping_pattern.finditer(joined):
+            results[bisect_right(starts, m.start()) - 1].add(m.group(1))
+        return results
@@ -0,0 +1,107 @@
+"""Content-addressed cache of LLM responses.
+
+Responses are keyed by a hash of the model, messages and sampling
+parameters and stored in SQLite, with a small in-process LRU in front so
+repeated hits don't touch the disk. Entries are evicted least recently
+used first once `max_entries` is exceeded, and dropped outright after
+`max_age` seconds.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(model, messages, params):
+    """Hash a request into its cache key"""
+    payload = json.dumps({'model': model, 'messages': messages, 'params': params},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite store of serialized responses with LRU and age eviction."""
+
+    def __init__(self, db_path='data/llm_cache.sqlite', max_entries=5000, max_age=7 * 86400,
+                 memory_entries=256):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> (body, stored_at)
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """Initialize cache table"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses
+            (key TEXT PRIMARY KEY,
+             body TEXT NOT NULL,
+             stored_at REAL NOT NULL,
+             last_used REAL NOT NULL)
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)')
+        conn.commit()
+        conn.close()
+
+    def _remember(self, key, body, stored_at):
+        with self._lock:
+            self._memory[key] = (body, stored_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Get a cached response body, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.max_age:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+        conn = self._connect()
+        row = conn.execute('SELECT body, stored_at FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None or now - row[1] > self.max_age:
+            conn.close()
+            return None
+        conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+        conn.commit()
+        conn.close()
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def put(self, key, body):
+        """Store a response body and evict old or excess entries"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO responses (key, body, stored_at, last_used) VALUES (?, ?, ?, ?)',
+                     (key, body, now, now))
+        conn.execute('DELETE FROM responses WHERE stored_at < ?', (now - self.max_age,))
+        conn.execute('''
+            DELETE FROM responses WHERE key IN
+            (SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)
+        ''', (self.max_entries,))
+        conn.commit()
+        conn.close()
+        self._remember(key, body, now)
+
+    def __len__(self):
+        conn = self._connect()
+        count = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        conn.close()
+        return count
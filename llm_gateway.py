@@ -0,0 +1,379 @@
+"""Shared gateway for every OpenAI call made by the bots.
+
+One `LLMGateway` per process owns a single OpenAI client, so all callers
+share its HTTP connection pool. Calls are throttled three ways:
+
+* a semaphore caps how many requests are in flight at once; extra callers
+  wait their turn instead of piling more connections onto a slow API,
+* a requests-per-minute token bucket,
+* a tokens-per-minute token bucket, charged with an estimate up front and
+  settled against the reported usage afterwards.
+
+Every call records its queue wait, latency and token usage; `get_stats()`
+summarises them.
+
+With a `LLMResponseCache`, chat calls are answered from the cache when the
+request is deterministic (temperature 0) or the caller passes use_cache=True;
+cache hits skip the queue and spend no tokens. Callers passing semantic=True
+also reuse the completion of a near-duplicate prompt from a `SemanticCache`.
+
+Callers name a route (draft, retry, bulk, image_prompt, final) instead of a
+model; a `ModelRouter` picks the model for it and downgrades routes that
+exceed their latency or token budgets.
+
+Async code (the FastAPI services) must not call the gateway directly from the
+event loop; `run_blocking` offloads a call to a bounded worker pool instead.
+
+Configured from the environment: LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_MINUTE,
+LLM_TOKENS_PER_MINUTE, LLM_QUEUE_TIMEOUT, LLM_MAX_RETRIES, LLM_CACHE_PATH (empty
+disables the cache), LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_AGE_HOURS,
+LLM_SEMANTIC_CACHE_PATH (empty disables it), LLM_SEMANTIC_THRESHOLD, LLM_WORKER_THREADS,
+MODEL_ROUTES_PATH
+(OPENAI_API_KEY and OPENAI_BASE_URL are read by the SDK as usual).
+"""
+
+import asyncio
+import atexit
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+from openai.types.chat import ChatCompletion
+
+from llm_cache import LLMResponseCache, cache_key
+from model_router import ModelRouter
+from semantic_cache import SemanticCache, semantic_scope
+
+logger = logging.getLogger(__name__)
+
+# Model used when neither a model nor a routable route is given
+DEFAULT_MODEL = 'gpt-4'
+
+# Completion tokens assumed when the caller sets no max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 500
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    The level may go negative when actual usage exceeds what was reserved;
+    later callers then wait for the debt to be paid back.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1, deadline=None):
+        """Block until `amount` tokens are available and take them.
+
+        Returns False if the deadline (a time.monotonic() value) passes first.
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return True
+                wait = (amount - self.level) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def charge(self, amount):
+        """Take (or with a negative amount, give back) tokens without waiting."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough token estimate for a chat request: ~4 characters per token."""
+    prompt_chars = sum(len(str(message.get('content') or '')) for message in messages)
+    return prompt_chars // 4 + (max_tokens or DEFAULT_COMPLETION_ESTIMATE)
+
+
+class LLMGateway:
+    """Rate-limited, instrumented access to one shared OpenAI client."""
+
+    def __init__(self, client=None, max_concurrency=4, requests_per_minute=60,
+                 tokens_per_minute=40000, queue_timeout=None, max_retries=2, history_size=1000,
+                 cache=None, semantic_cache=None, router=None):
+        self._client = client
+        self.router = router
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.calls = deque(maxlen=history_size)  # recent per-call metrics
+        self.stats = {'calls': 0, 'errors': 0, 'rejected': 0, 'queued': 0, 'in_flight': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0, 'cache_hits': 0, 'cache_misses': 0,
+                      'semantic_hits': 0}
+        self._stats_lock = threading.Lock()
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The shared OpenAI client, created on first use"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'),
+                                                 max_retries=self.max_retries)
+        return self._client
+
+    def _update(self, **changes):
+        with self._stats_lock:
+            for name, delta in changes.items():
+                self.stats[name] += delta
+
+    def _acquire(self, estimated_tokens):
+        """Wait for a concurrency slot and rate budget; get the queue wait in seconds"""
+        start = time.monotonic()
+        deadline = start + self.queue_timeout if self.queue_timeout else None
+        self._update(queued=1)
+        try:
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                raise TimeoutError("LLM gateway queue timeout waiting for a free slot")
+            if not (self.request_bucket.acquire(1, deadline)
+                    and self.token_bucket.acquire(estimated_tokens, deadline)):
+                self._slots.release()
+                raise TimeoutError("LLM gateway queue timeout waiting for rate budget")
+        except TimeoutError:
+            self._update(rejected=1)
+            raise
+        finally:
+            self._update(queued=-1)
+        self._update(in_flight=1)
+        return time.monotonic() - start
+
+    def _resolve_model(self, model, route):
+        if model:
+            return model
+        if route and self.router is not None:
+            return self.router.pick(route)
+        return DEFAULT_MODEL
+
+    def _release(self, kind, model, estimated_tokens, queue_wait, latency, usage, ok,
+                 first_token=None, route=None):
+        """Free the slot taken by _acquire and record the call's metrics"""
+        self._slots.release()
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        if usage is not None:
+            # Settle the estimate against what the API actually counted
+            self.token_bucket.charge(prompt_tokens + completion_tokens - estimated_tokens)
+        self._update(in_flight=-1, calls=1, errors=0 if ok else 1,
+                     prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        if route and self.router is not None:
+            if self.router.record(route, model, latency, prompt_tokens + completion_tokens, ok=ok):
+                logger.warning(f"LLM route {route}: {model} over its latency budget, downgrading")
+        with self._stats_lock:
+            self.calls.append({'kind': kind, 'model': model, 'route': route, 'ok': ok, 'queue_wait': queue_wait,
+                               'latency': latency, 'first_token': first_token,
+                               'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens})
+        first = f", first token {first_token:.2f}s" if first_token is not None else ''
+        logger.info(f"LLM {kind} {model}: {latency:.2f}s (queued {queue_wait:.2f}s{first}), "
+                    f"{prompt_tokens}+{completion_tokens} tokens{'' if ok else ', failed'}")
+
+    def _call(self, kind, model, estimated_tokens, request, route=None):
+        queue_wait = self._acquire(estimated_tokens)
+        start = time.monotonic()
+        usage = None
+        ok = False
+        try:
+            response = request()
+            usage = getattr(response, 'usage', None)
+            ok = True
+            return response
+        finally:
+            self._release(kind, model, estimated_tokens, queue_wait, time.monotonic() - start, usage, ok,
+                          route=route)
+
+    def chat(self, messages, model=None, route=None, use_cache=None, semantic=False, semantic_key=None,
+             **kwargs):
+        """Create a chat completion; returns the SDK response object.
+
+        The model is taken from the route when not given explicitly.
+
+        Cached when temperature is 0, or whenever use_cache is True;
+        use_cache=False always goes to the API. With semantic=True a cached
+        completion of a near-duplicate prompt is reused as well, but only if
+        the sampling params and `semantic_key` (e.g. the topic of a templated
+        prompt) match exactly.
+        """
+        model = self._resolve_model(model, route)
+        semantic = semantic and use_cache is not False and self.semantic_cache is not None
+        if use_cache is None:
+            use_cache = kwargs.get('temperature', 1) == 0
+        key = cache_key(model, messages, kwargs) if use_cache and self.cache is not None else None
+        if key:
+            body = self.cache.get(key)
+            if body is not None:
+                self._update(cache_hits=1)
+                return ChatCompletion.model_validate_json(body)
+            self._update(cache_misses=1)
+        if semantic:
+            scope = semantic_scope(kwargs, semantic_key)
+            body = self.semantic_cache.lookup(model, messages, scope)
+            if body is not None:
+                self._update(semantic_hits=1)
+                return ChatCompletion.model_validate_json(body)
+
+        estimated = estimate_tokens(messages, kwargs.get('max_tokens'))
+        response = self._call('chat', model, estimated, lambda: self.client.chat.completions.create(
+            model=model, messages=messages, **kwargs), route=route)
+        if (key or semantic) and hasattr(response, 'model_dump_json'):
+            body = response.model_dump_json()
+            if key:
+                self.cache.put(key, body)
+            if semantic:
+                self.semantic_cache.add(model, messages, body, scope)
+                self.semantic_cache.save_if_due()
+        return response
+
+    def stream_chat(self, messages, model=None, route=None, **kwargs):
+        """Stream a chat completion, yielding text deltas as they arrive.
+
+        The concurrency slot is held until the stream is exhausted or closed.
+        """
+        model = self._resolve_model(model, route)
+        estimated = estimate_tokens(messages, kwargs.get('max_tokens'))
+        queue_wait = self._acquire(estimated)
+        start = time.monotonic()
+        first_token = None
+        usage = None
+        ok = False
+        stream = None
+        try:
+            stream = self.client.chat.completions.create(
+                model=model, messages=messages, stream=True,
+                stream_options={'include_usage': True}, **kwargs)
+            for chunk in stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token is None:
+                        first_token = time.monotonic() - start
+                    yield delta
+            ok = True
+        finally:
+            if stream is not None and hasattr(stream, 'close'):
+                stream.close()
+            self._release('stream', model, estimated, queue_wait, time.monotonic() - start, usage, ok,
+                          first_token, route=route)
+
+    def complete(self, messages, model=None, route=None, use_cache=None, semantic=False, **kwargs):
+        """Create a chat completion and get the stripped text of the first choice"""
+        response = self.chat(messages, model=model, route=route, use_cache=use_cache, semantic=semantic,
+                             **kwargs)
+        return response.choices[0].message.content.strip()
+
+    def image(self, prompt, model='dall-e-2', **kwargs):
+        """Generate an image; returns the SDK response object"""
+        return self._call('image', model, 0, lambda: self.client.images.generate(
+            model=model, prompt=prompt, **kwargs))
+
+    def get_stats(self):
+        """Get counters plus latency percentiles over recent calls"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+            latencies = sorted(call['latency'] for call in self.calls)
+            waits = [call['queue_wait'] for call in self.calls]
+        stats['latency_p50'] = _percentile(latencies, 50)
+        stats['latency_p95'] = _percentile(latencies, 95)
+        stats['avg_queue_wait'] = sum(waits) / len(waits) if waits else 0.0
+        first_tokens = sorted(call['first_token'] for call in list(self.calls)
+                              if call['first_token'] is not None)
+        stats['first_token_p50'] = _percentile(first_tokens, 50)
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        stats['cache_hit_rate'] = stats['cache_hits'] / lookups if lookups else 0.0
+        if self.router is not None:
+            stats['routing'] = self.router.get_stats()
+        return stats
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Get the process-wide gateway, configured from the environment"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                queue_timeout = os.getenv('LLM_QUEUE_TIMEOUT')
+                cache_path = os.getenv('LLM_CACHE_PATH', 'data/llm_cache.sqlite')
+                routes_path = os.getenv('MODEL_ROUTES_PATH', 'config/model_routes.json')
+                semantic_path = os.getenv('LLM_SEMANTIC_CACHE_PATH', 'data/semantic_cache.npz')
+                semantic_cache = SemanticCache(
+                    semantic_path,
+                    threshold=float(os.getenv('LLM_SEMANTIC_THRESHOLD', 0.92))
+                ) if semantic_path else None
+                _gateway = LLMGateway(
+                    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 4)),
+                    requests_per_minute=int(os.getenv('LLM_REQUESTS_PER_MINUTE', 60)),
+                    tokens_per_minute=int(os.getenv('LLM_TOKENS_PER_MINUTE', 40000)),
+                    queue_timeout=float(queue_timeout) if queue_timeout else None,
+                    max_retries=int(os.getenv('LLM_MAX_RETRIES', 2)),
+                    cache=LLMResponseCache(
+                        cache_path,
+                        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 5000)),
+                        max_age=float(os.getenv('LLM_CACHE_MAX_AGE_HOURS', 168)) * 3600
+                    ) if cache_path else None,
+                    semantic_cache=semantic_cache,
+                    router=ModelRouter.from_file(routes_path) if os.path.exists(routes_path) else None
+                )
+                if semantic_cache is not None:
+                    atexit.register(semantic_cache.save)
+    return _gateway
+
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """Get the bounded thread pool that runs blocking generation for async callers"""
+    global _workers
+    if _workers is None:
+        with _workers_lock:
+            if _workers is None:
+                _workers = ThreadPoolExecutor(max_workers=int(os.getenv('LLM_WORKER_THREADS', 8)),
+                                              thread_name_prefix='llm-worker')
+    return _workers
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Await a blocking call on the worker pool, leaving the event loop free"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_worker_pool(), functools.partial(func, *args, **kwargs))
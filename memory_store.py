@@ -0,0 +1,154 @@
+"""Durable conversation memory with a bounded in-RAM hot set.
+
+Memory records are JSON dicts appended under a (namespace, key) pair, e.g.
+('memories', user_id). A backend keeps them durably and trims every key to
+its newest `max_records`; `MemoryStore` sits in front and keeps only the
+most recently used keys in RAM, loading a key from the backend on a miss.
+RAM use therefore stays flat however many users show up, and history is
+still there after a restart.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class MemoryBackend:
+    """Base backend: durable, per-key append-only record lists."""
+
+    def append(self, namespace, key, record, max_records=None):
+        """Store a record and drop the key's oldest records beyond max_records."""
+        raise NotImplementedError
+
+    def load(self, namespace, key, limit=None):
+        """Get the key's newest `limit` records, oldest first."""
+        raise NotImplementedError
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """Memory records in a SQLite database in WAL mode.
+
+    WAL lets the reply path read while a writer appends, and each call uses
+    its own connection so the backend can be shared between threads.
+    """
+
+    def __init__(self, db_path='data/memory.sqlite'):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def init_db(self):
+        """Initialize memory table"""
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS memory_records
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             namespace TEXT NOT NULL,
+             key TEXT NOT NULL,
+             data TEXT NOT NULL,
+             created_at REAL NOT NULL)
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_memory_records_key ON memory_records (namespace, key, id)')
+        conn.commit()
+        conn.close()
+
+    def append(self, namespace, key, record, max_records=None):
+        conn = self._connect()
+        conn.execute('INSERT INTO memory_records (namespace, key, data, created_at) VALUES (?, ?, ?, ?)',
+                     (namespace, key, json.dumps(record), time.time()))
+        if max_records:
+            conn.execute('''
+                DELETE FROM memory_records
+                WHERE namespace = ? AND key = ? AND id <= (
+                    SELECT id FROM memory_records WHERE namespace = ? AND key = ?
+                    ORDER BY id DESC LIMIT 1 OFFSET ?)
+            ''', (namespace, key, namespace, key, max_records))
+        conn.commit()
+        conn.close()
+
+    def load(self, namespace, key, limit=None):
+        conn = self._connect()
+        rows = conn.execute('SELECT data FROM memory_records WHERE namespace = ? AND key = ? ORDER BY id DESC LIMIT ?',
+                            (namespace, key, -1 if limit is None else limit)).fetchall()
+        conn.close()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+
+class MemoryStore:
+    """Per-key record deques for one namespace, with an LRU hot set in RAM.
+
+    Each key holds at most `max_records` records, oldest first. At most
+    `max_keys` keys stay in RAM; the least recently used one is dropped
+    from RAM (not from the backend) when another key is loaded. Without a
+    backend the store is RAM only and dropped keys are forgotten.
+    `on_load`, if given, is called with each list of records loaded from
+    the backend before it is cached, e.g. to refresh derived fields.
+    """
+
+    def __init__(self, namespace, backend=None, max_keys=1000, max_records=200, on_load=None):
+        self.namespace = namespace
+        self.backend = backend
+        self.max_keys = max_keys
+        self.max_records = max_records
+        self.on_load = on_load
+        self.hot = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(key):
+        return '' if key is None else str(key)
+
+    def get(self, key):
+        """Get the key's records, oldest first, loading them from the backend if needed"""
+        key = self._key(key)
+        with self._lock:
+            records = self.hot.get(key)
+            if records is not None:
+                self.hot.move_to_end(key)
+                self.stats['hits'] += 1
+                return records
+            self.stats['misses'] += 1
+        loaded = self.backend.load(self.namespace, key, self.max_records) if self.backend else []
+        if loaded and self.on_load:
+            self.on_load(loaded)
+        with self._lock:
+            # Another thread may have loaded the key meanwhile; keep its copy
+            records = self.hot.setdefault(key, deque(loaded, maxlen=self.max_records))
+            self.hot.move_to_end(key)
+            self._evict()
+        return records
+
+    __getitem__ = get
+
+    def append(self, key, record):
+        """Add a record to the key, in RAM and in the backend"""
+        records = self.get(key)
+        with self._lock:
+            records.append(record)
+        if self.backend:
+            self.backend.append(self.namespace, self._key(key), record, self.max_records)
+
+    def _evict(self):
+        while len(self.hot) > self.max_keys:
+            self.hot.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get_stats(self):
+        """Get hot-set counters plus the hit rate"""
+        stats = dict(self.stats)
+        stats['hot_keys'] = len(self.hot)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,120 @@
+"""Tiered model routing with per-route latency and token budgets.
+
+Each route (draft, retry, bulk, image_prompt, final, ...) lists its models
+from preferred to cheapest, a p95 latency budget and an hourly token
+budget, read from config/model_routes.json. `pick(route)` returns the first
+model that is not downgraded:
+
+* when a model's p95 latency on a route exceeds the budget, the route stops
+  using it for `cooldown_seconds` and falls to the next tier, then tries it
+  again with a fresh latency window,
+* when a route has spent its hourly token budget it uses its cheapest model
+  until usage drops back under the budget.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+
+class ModelRouter:
+    """Choose a model per route and downgrade routes that blow their budgets."""
+
+    # Latency samples needed before a p95 means more than "the slowest call"
+    MIN_SAMPLES = 20
+    # A failed call counts as at least this many latency budgets, like a timeout
+    FAILURE_PENALTY = 2
+
+    def __init__(self, routes, default_route=None, cooldown_seconds=600, latency_window=50):
+        self.routes = routes
+        self.default_route = default_route
+        self.cooldown_seconds = cooldown_seconds
+        self.latency = defaultdict(lambda: deque(maxlen=latency_window))  # (route, model) -> seconds
+        self.tokens = defaultdict(deque)  # route -> (timestamp, tokens)
+        self.down_until = {}  # (route, model) -> timestamp
+        self.downgrades = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path='config/model_routes.json'):
+        """Build a router from a routes config file"""
+        with open(path, 'r') as f:
+            config = json.load(f)
+        return cls(config['routes'], default_route=config.get('default_route'),
+                   cooldown_seconds=config.get('cooldown_seconds', 600),
+                   latency_window=config.get('latency_window', 50))
+
+    def _route(self, route):
+        if route in self.routes:
+            return route
+        if self.default_route in self.routes:
+            return self.default_route
+        raise ValueError(f"Unknown model route: {route}")
+
+    def _tokens_last_hour(self, route, now):
+        usage = self.tokens[route]
+        while usage and usage[0][0] < now - 3600:
+            usage.popleft()
+        return sum(tokens for _, tokens in usage)
+
+    def pick(self, route, now=None):
+        """Get the model to use for a route right now"""
+        now = time.time() if now is None else now
+        route = self._route(route)
+        models = self.routes[route]['models']
+        with self._lock:
+            budget = self.routes[route].get('tokens_per_hour')
+            if budget and self._tokens_last_hour(route, now) >= budget:
+                return models[-1]
+            for model in models:
+                if self.down_until.get((route, model), 0) <= now:
+                    return model
+        return models[-1]
+
+    def record(self, route, model, latency, tokens, now=None, ok=True):
+        """Record a finished call; downgrade the model if it broke the latency budget.
+
+        Failed calls are recorded too, as slow as FAILURE_PENALTY budgets if
+        they failed fast, so a model that keeps erroring is downgraded.
+        """
+        now = time.time() if now is None else now
+        route = self._route(route)
+        config = self.routes[route]
+        budget = config.get('p95_latency_seconds')
+        if not ok and budget:
+            latency = max(latency, budget * self.FAILURE_PENALTY)
+        with self._lock:
+            self.tokens[route].append((now, tokens))
+            samples = self.latency[(route, model)]
+            samples.append(latency)
+            # The last tier is the floor; there is nothing cheaper to fall back to
+            if (budget and model != config['models'][-1] and len(samples) >= self.MIN_SAMPLES
+                    and _p95(samples) > budget):
+                self.down_until[(route, model)] = now + self.cooldown_seconds
+                samples.clear()
+                self.downgrades += 1
+                return True
+        return False
+
+    def get_stats(self, now=None):
+        """Get the current model, p95 latency and hourly tokens per route"""
+        now = time.time() if now is None else now
+        stats = {'downgrades': self.downgrades, 'routes': {}}
+        for route, config in self.routes.items():
+            model = self.pick(route, now)
+            with self._lock:
+                samples = list(self.latency[(route, model)])
+                tokens = self._tokens_last_hour(route, now)
+            stats['routes'][route] = {
+                'model': model,
+                'p95_latency': _p95(samples) if samples else 0.0,
+                'tokens_last_hour': tokens,
+                'downgraded': model != config['models'][0]
+            }
+        return stats
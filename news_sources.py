@@ -0,0 +1,233 @@
+"""Pluggable news source adapters for CryptoNewsAggregator.
+
+Every adapter fetches one upstream feed and normalises its entries into the
+same article record:
+
+    {'id': 'hackernews:123', 'title': ..., 'body': ..., 'url': ...,
+     'source': 'HackerNews', 'published_on': <unix timestamp>}
+
+`fetch_all` runs a list of adapters in parallel with bounded concurrency and
+merges their articles into one stream, newest first.
+"""
+
+import html
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+
+import requests
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def clean_text(text):
+    """Strip HTML tags and entities from feed text."""
+    return ' '.join(html.unescape(_TAG_RE.sub(' ', text or '')).split())
+
+
+def parse_timestamp(value):
+    """Parse an RFC 822 or ISO 8601 date into a unix timestamp, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+class NewsSource:
+    """Base adapter: fetch `url` and normalise the response into articles."""
+
+    name = 'News'
+    key = 'news'
+    default_url = None
+
+    def __init__(self, url=None, http_session=None, timeout=15):
+        self.url = url or self.default_url
+        self.http_session = http_session or requests.Session()
+        self.timeout = timeout
+
+    def request_kwargs(self):
+        """Extra keyword arguments for the GET request."""
+        return {}
+
+    def fetch(self):
+        """Fetch and normalise the latest articles from this source."""
+        response = self.http_session.get(self.url, timeout=self.timeout, **self.request_kwargs())
+        response.raise_for_status()
+        return [article for article in self.parse(response) if article['title'] and article['published_on']]
+
+    def parse(self, response):
+        raise NotImplementedError
+
+    def make_article(self, raw_id, title, body, url, published_on):
+        return {
+            'id': f"{self.key}:{raw_id}",
+            'title': clean_text(title),
+            'body': clean_text(body),
+            'url': url,
+            'source': self.name,
+            'published_on': published_on
+        }
+
+
+class CryptoCompareSource(NewsSource):
+    """CryptoCompare news API, filtered to AI/Technology/Trading categories."""
+
+    name = 'CryptoCompare'
+    key = 'cryptocompare'
+    default_url = "https://min-api.cryptocompare.com/data/v2/news/?lang=EN&categories=AI|Technology|Trading"
+
+    def __init__(self, url=None, http_session=None, timeout=30, api_key=None):
+        super().__init__(url, http_session, timeout)
+        self.api_key = api_key or os.getenv('CRYPTOCOMPARE_API_KEY')
+
+    def request_kwargs(self):
+        return {'headers': {'authorization': f'Apikey {self.api_key}'}, 'verify': False}
+
+    def parse(self, response):
+        articles = []
+        for item in response.json().get('Data') or []:
+            article = self.make_article(item['id'], item['title'], item['body'],
+                                        item.get('url'), item['published_on'])
+            # Keep the outlet name, CryptoCompare is only the aggregator
+            article['source'] = item['source_info']['name']
+            articles.append(article)
+        return articles
+
+
+class HackerNewsSource(NewsSource):
+    """Latest AI stories from the HackerNews Algolia search API."""
+
+    name = 'HackerNews'
+    key = 'hackernews'
+    default_url = "https://hn.algolia.com/api/v1/search_by_date?tags=story&query=AI&hitsPerPage=50"
+
+    def parse(self, response):
+        return [
+            self.make_article(hit['objectID'], hit.get('title'), hit.get('story_text') or '',
+                              hit.get('url') or f"https://news.ycombinator.com/item?id={hit['objectID']}",
+                              hit.get('created_at_i'))
+            for hit in response.json().get('hits', [])
+        ]
+
+
+class GitHubTrendingSource(NewsSource):
+    """Most starred AI repositories created in the last week (GitHub search API)."""
+
+    name = 'GitHub Trending'
+    key = 'github'
+    default_url = "https://api.github.com/search/repositories"
+
+    def request_kwargs(self):
+        since = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%d')
+        return {'params': {'q': f'topic:artificial-intelligence created:>{since}',
+                           'sort': 'stars', 'order': 'desc', 'per_page': 30}}
+
+    def parse(self, response):
+        return [
+            self.make_article(repo['id'], f"{repo['full_name']}: {repo.get('description') or ''}",
+                              repo.get('description') or '', repo.get('html_url'),
+                              parse_timestamp(repo.get('created_at')))
+            for repo in response.json().get('items', [])
+        ]
+
+
+class FeedSource(NewsSource):
+    """Generic RSS 2.0 / Atom feed (blogs, ArXiv, TechCrunch)."""
+
+    def __init__(self, name, url, key=None, http_session=None, timeout=15):
+        super().__init__(url, http_session, timeout)
+        self.name = name
+        self.key = key or re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+    def parse(self, response):
+        root = ET.fromstring(response.content)
+        if root.tag == f'{ATOM_NS}feed':
+            return [self._parse_atom_entry(entry) for entry in root.iter(f'{ATOM_NS}entry')]
+        return [self._parse_rss_item(item) for item in root.iter('item')]
+
+    def _parse_rss_item(self, item):
+        link = item.findtext('link') or ''
+        return self.make_article(item.findtext('guid') or link, item.findtext('title'),
+                                 item.findtext('description') or '', link,
+                                 parse_timestamp(item.findtext('pubDate')))
+
+    def _parse_atom_entry(self, entry):
+        link = entry.find(f'{ATOM_NS}link')
+        body = entry.findtext(f'{ATOM_NS}summary') or entry.findtext(f'{ATOM_NS}content') or ''
+        published = entry.findtext(f'{ATOM_NS}published') or entry.findtext(f'{ATOM_NS}updated')
+        return self.make_article(entry.findtext(f'{ATOM_NS}id'), entry.findtext(f'{ATOM_NS}title'),
+                                 body, link.get('href') if link is not None else None,
+                                 parse_timestamp(published))
+
+
+# Feed URLs for the sources named in PostingSystem.get_default_config / VERIFIED_SOURCES
+FEED_URLS = {
+    'TechCrunch': "https://techcrunch.com/category/artificial-intelligence/feed/",
+    'ArXiv': "https://export.arxiv.org/api/query?search_query=cat:cs.AI&sortBy=submittedDate&sortOrder=descending&max_results=50",
+    'OpenAI Blog': "https://openai.com/news/rss.xml",
+    'DeepMind Blog': "https://deepmind.google/blog/rss.xml",
+    'HuggingFace Blog': "https://huggingface.co/blog/feed.xml",
+    'Microsoft AI Blog': "https://blogs.microsoft.com/ai/feed/",
+    'AWS AI Blog': "https://aws.amazon.com/blogs/machine-learning/feed/",
+}
+
+SOURCE_REGISTRY = {
+    'CryptoCompare': CryptoCompareSource,
+    'HackerNews': HackerNewsSource,
+    'GitHub Trending': GitHubTrendingSource,
+}
+for _name, _url in FEED_URLS.items():
+    SOURCE_REGISTRY[_name] = partial(FeedSource, _name, _url)
+
+
+def build_sources(names, http_session=None):
+    """Build adapters for the given source names, skipping unknown ones."""
+    sources = []
+    for name in names:
+        factory = SOURCE_REGISTRY.get(name.strip())
+        if factory is None:
+            print(f"Unknown news source: {name}")
+            continue
+        sources.append(factory(http_session=http_session))
+    return sources
+
+
+def fetch_all(sources, max_workers=4):
+    """Fetch all sources in parallel and merge their articles, newest first.
+
+    A failing source is reported and skipped so one bad feed can't empty
+    the whole stream. Articles with the same id are kept once.
+    """
+    if not sources:
+        return []
+
+    def fetch_one(source):
+        try:
+            return source.fetch()
+        except Exception as e:
+            print(f"Error fetching news from {source.name}: {str(e)}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sources)),
+                            thread_name_prefix='news-source') as executor:
+        batches = list(executor.map(fetch_one, sources))
+
+    merged = {}
+    for batch in batches:
+        for article in batch:
+            merged.setdefault(article['id'], article)
+    return sorted(merged.values(), key=lambda article: article['published_on'], reverse=True)
@@ -0,0 +1,89 @@
+"""Local store backing incremental news ingestion."""
+
+import json
+import os
+import tempfile
+import time
+
+
+class NewsStore:
+    """Persist already processed articles.
+
+    Every article id that has been classified is remembered (AI-related or
+    not) so it is never parsed again, and AI-related items are kept so the
+    full 24h window can be served without re-downloading it.
+    """
+
+    def __init__(self, path='data/news_store.json', window_hours=24):
+        self.path = path
+        self.window_seconds = window_hours * 3600
+        self.seen_ids = {}  # article id -> published_on
+        self.articles = {}  # article id -> processed news item
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load store state from disk, starting empty if missing or corrupt."""
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.seen_ids = state.get('seen_ids', {})
+            self.articles = state.get('articles', {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Error loading news store: {str(e)}")
+
+    def save(self):
+        """Atomically write store state to disk if anything changed."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        state = {
+            'seen_ids': self.seen_ids,
+            'articles': self.articles
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def is_recent(self, published_on, now=None):
+        """Check whether a publish timestamp falls inside the store window."""
+        now = time.time() if now is None else now
+        return now - published_on <= self.window_seconds
+
+    def is_seen(self, article_id):
+        """Check whether an article has already been processed."""
+        return str(article_id) in self.seen_ids
+
+    def add(self, article_id, published_on, news_item=None):
+        """Record a processed article, keeping the item if it is AI-related."""
+        article_id = str(article_id)
+        self.seen_ids[article_id] = published_on
+        if news_item is not None:
+            self.articles[article_id] = news_item
+        self.dirty = True
+
+    def prune(self, now=None):
+        """Drop articles and seen ids that fell out of the window."""
+        expired = [article_id for article_id, published_on in self.seen_ids.items()
+                   if not self.is_recent(published_on, now)]
+        for article_id in expired:
+            del self.seen_ids[article_id]
+            self.articles.pop(article_id, None)
+        if expired:
+            self.dirty = True
+
+    def get_window(self, now=None):
+        """Get stored articles inside the window, newest first."""
+        recent = [item for item in self.articles.values()
+                  if self.is_recent(item['published_on'], now)]
+        recent.sort(key=lambda item: item['published_on'], reverse=True)
+        return recent
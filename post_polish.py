@@ -0,0 +1,30 @@
+"""Final-route polish for drafts about to go to a human reviewer.
+
+Drafts are written on the cheap routes; the one that is sent for review is
+rewritten once on the big model, so the reviewer approves exactly the text
+that will be posted.
+"""
+
+import logging
+
+from tweet_length import is_valid_tweet
+
+logger = logging.getLogger(__name__)
+
+
+def polish_post(llm, text, platform='twitter'):
+    """Rewrite a draft on the final route; keeps the draft if that fails or comes back too long"""
+    try:
+        polished = llm.complete(
+            route="final",
+            messages=[{"role": "system", "content": f"Polish this {platform} post. Keep its meaning, facts and "
+                                                    f"tone; fix wording and flow. Reply with the post only."},
+                      {"role": "user", "content": text}],
+            temperature=0.3
+        )
+    except Exception as e:
+        logger.error(f"Error polishing content: {str(e)}")
+        return text
+    if not polished or (platform == 'twitter' and not is_valid_tweet(polished)):
+        return text
+    return polished
@@ -2,15 +2,19 @@ import os
 import json
 import logging
 import smtplib
-import openai
 import time
 import ssl
 import emoji
 import uuid
+import heapq
+from collections import Counter, defaultdict
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+from llm_gateway import get_gateway
+from memory_store import MemoryStore, SQLiteMemoryBackend
+from topic_extractor import TopicExtractor
 from pathlib import Path
 
 # Set up logging
@@ -29,12 +33,15 @@ class PostingSystem:
         """Initialize enhanced posting system with memory"""
         try:
             load_dotenv()  # Explicitly load .env file
-            self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.llm = get_gateway()  # shared, rate-limited OpenAI client
             self.config = self.get_default_config()
             self.news_cache = {}
             self.alpha_insights = []
-            self.tweet_memory = TweetMemory()
-            self.conversation_handler = ConversationHandler()
+            # Conversation memory survives restarts; only recent history stays in RAM
+            memory_backend = SQLiteMemoryBackend(os.getenv('MEMORY_DB_PATH', 'data/memory.sqlite'))
+            topic_extractor = TopicExtractor(os.getenv('TOPIC_VOCABULARY_PATH', 'data/topic_vocabulary.json'))
+            self.tweet_memory = TweetMemory(backend=memory_backend, topic_extractor=topic_extractor)
+            self.conversation_handler = ConversationHandler(backend=memory_backend)
             logger.info("Enhanced posting system initialized with memory")
         except Exception as e:
             logger.error(f"Error initializing posting system: {str(e)}")
@@ -226,8 +233,8 @@ For humor tweets, ensure:
 Follow the format EXACTLY.
 """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
+        response = self.llm.chat(
+            route="final",
             messages=[
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": base_prompt}
@@ -260,52 +267,89 @@ Follow the format EXACTLY.
 
 class TweetMemory:
     """Handle tweet memory and conversation history"""
-    def __init__(self):
-        self.interactions = {}
+    STORE_KEY = 'interactions'
+
+    def __init__(self, history_limit=5, backend=None, max_interactions=1000, topic_extractor=None):
+        self.interactions = {}  # the newest max_interactions, oldest first
         self.conversation_graphs = {}
+        self.topic_index = defaultdict(list)  # topic -> interaction ids, oldest first
+        self.history_limit = history_limit
+        self.backend = backend
+        self.max_interactions = max_interactions
+        self.topic_extractor = topic_extractor or TopicExtractor()
+        if backend:
+            interactions = backend.load('tweet_memory', self.STORE_KEY, max_interactions)
+            if not self.topic_extractor.documents:
+                self.topic_extractor.fit(item["response"] for item in interactions if item["response"])
+            # Stored topics may come from an older vocabulary
+            self.reindex(interactions)
         
     def store_interaction(self, tweet, response):
         """Store tweet interaction with metadata"""
         interaction_id = str(uuid.uuid4())
         timestamp = datetime.now().isoformat()
+        topics = self._extract_topics(tweet)
         
-        self.interactions[interaction_id] = {
+        interaction = {
+            "id": interaction_id,
             "tweet": tweet,
             "response": response,
             "timestamp": timestamp,
-            "topics": self._extract_topics(tweet),
+            "topics": topics,
             "context": self._extract_context(tweet)
         }
+        self._index(interaction)
+        if response:
+            self.topic_extractor.add_documents([response])
+        if self.backend:
+            self.backend.append('tweet_memory', self.STORE_KEY, interaction, self.max_interactions)
         
         self._update_conversation_graph(interaction_id)
+
+    def reindex(self, interactions=None):
+        """Re-extract topics for interactions (default: those in memory) and rebuild the topic index"""
+        interactions = list(self.interactions.values() if interactions is None else interactions)
+        all_topics = self.topic_extractor.extract_batch([interaction["tweet"] for interaction in interactions])
+        self.interactions = {}
+        self.topic_index = defaultdict(list)
+        for interaction, topics in zip(interactions, all_topics):
+            interaction["topics"] = topics
+            self._index(interaction)
+
+    def _index(self, interaction):
+        """Add an interaction to the in-memory window and topic index, dropping the oldest beyond the limit"""
+        interaction_id = interaction["id"]
+        self.interactions[interaction_id] = interaction
+        for topic in set(interaction["topics"]):
+            self.topic_index[topic].append(interaction_id)
+        
+        while len(self.interactions) > self.max_interactions:
+            oldest_id = next(iter(self.interactions))
+            oldest = self.interactions.pop(oldest_id)
+            for topic in set(oldest["topics"]):
+                ids = self.topic_index[topic]
+                ids.remove(oldest_id)  # the oldest id is first, so this is cheap
+                if not ids:
+                    del self.topic_index[topic]
         
     def get_relevant_history(self, current_tweet):
         """Get relevant conversation history for current tweet"""
-        topics = self._extract_topics(current_tweet)
-        relevant_interactions = []
+        # Only interactions sharing a topic are looked at, counting the overlap as we go
+        overlap = Counter()
+        for topic in set(self._extract_topics(current_tweet)):
+            overlap.update(self.topic_index.get(topic, ()))
         
-        # Find related interactions based on topics and recency
-        for interaction_id, data in self.interactions.items():
-            if self._is_relevant(data, topics):
-                relevant_interactions.append(data)
-        
-        # Sort by relevance and recency
-        relevant_interactions.sort(
-            key=lambda x: (self._calculate_relevance(x, topics), x["timestamp"]),
-            reverse=True
+        # Keep the top few by relevance, then recency, without sorting every match
+        best = heapq.nlargest(
+            self.history_limit,
+            overlap.items(),
+            key=lambda item: (item[1], self.interactions[item[0]]["timestamp"])
         )
-        
-        return relevant_interactions[:5]  # Return top 5 most relevant
+        return [self.interactions[interaction_id] for interaction_id, _ in best]
 
     def _extract_topics(self, text):
         """Extract key topics from text"""
-        # In real implementation, use NLP for topic extraction
-        return ["ai", "tech", "privacy"]  # Placeholder
-
-    def _calculate_relevance(self, interaction, current_topics):
-        """Calculate relevance score of interaction to current topics"""
-        interaction_topics = interaction["topics"]
-        return len(set(interaction_topics) & set(current_topics))
+        return self.topic_extractor.extract(text)
 
     def _update_conversation_graph(self, interaction_id):
         """Update conversation graph with new interaction"""
@@ -317,23 +361,15 @@ class TweetMemory:
         # Placeholder for context extraction logic
         return {}
 
-    def _is_relevant(self, interaction, current_topics):
-        """Check if interaction is relevant to current topics"""
-        interaction_topics = interaction["topics"]
-        return bool(set(interaction_topics) & set(current_topics))
-
 class ConversationHandler:
     """Handle ongoing conversations and context"""
-    def __init__(self):
-        self.active_conversations = {}
+    def __init__(self, backend=None, max_users=1000, max_turns=50):
+        self.active_conversations = MemoryStore('conversations', backend, max_keys=max_users, max_records=max_turns)
         self.context_cache = {}
         
     def update_conversation(self, user_id, tweet, response):
         """Update conversation state for a user"""
-        if user_id not in self.active_conversations:
-            self.active_conversations[user_id] = []
-            
-        self.active_conversations[user_id].append({
+        self.active_conversations.append(user_id, {
             "tweet": tweet,
             "response": response,
             "timestamp": datetime.now().isoformat()
@@ -341,9 +377,7 @@ class ConversationHandler:
         
     def get_conversation_context(self, user_id):
         """Get context for ongoing conversation"""
-        if user_id in self.active_conversations:
-            return self.active_conversations[user_id]
-        return []
+        return list(self.active_conversations.get(user_id))
 
 if __name__ == "__main__":
     # Initialize the posting system
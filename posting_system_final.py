@@ -4,14 +4,22 @@ import logging
 import time
 import signal
 import sys
+import threading
 from datetime import datetime, timedelta
 from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
 from real_crypto_news import CryptoNewsAggregator, generate_tweet
+from news_store import NewsStore
+from dedup_index import SimHashIndex
+from account_rotation import AccountRotation
+from draft_reservoir import DraftReservoir
+from news_sources import FEED_URLS, GitHubTrendingSource, HackerNewsSource, build_sources
 import urllib3
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from http_cache import CachingHTTPAdapter, HTTPCacheStore
+from http_replay import configure_session
+from tweet_length import is_valid_tweet, truncate_tweet, weighted_length
 
 # Configure requests retry strategy
 retry_strategy = Retry(
@@ -19,10 +27,32 @@ retry_strategy = Retry(
     backoff_factor=1,
     status_forcelist=[429, 500, 502, 503, 504],
 )
-adapter = HTTPAdapter(max_retries=retry_strategy)
-http = requests.Session()
-http.mount("https://", adapter)
-http.mount("http://", adapter)
+# Cache news and market responses on disk so retries and restarts don't burn rate limits
+HTTP_CACHE_TTLS = {
+    "https://min-api.cryptocompare.com/data/v2/news/": int(os.getenv('NEWS_CACHE_TTL', 300)),
+    "https://api.coingecko.com/api/v3/search/trending": int(os.getenv('TRENDING_CACHE_TTL', 600)),
+    HackerNewsSource.default_url: int(os.getenv('NEWS_CACHE_TTL', 300)),
+    # Unauthenticated GitHub search allows 10 requests a minute; the weekly top list moves slowly
+    GitHubTrendingSource.default_url: int(os.getenv('GITHUB_CACHE_TTL', 3600)),
+}
+HTTP_CACHE_TTLS.update({url: int(os.getenv('FEED_CACHE_TTL', 1800)) for url in FEED_URLS.values()})
+# Extra feeds (see news_sources.SOURCE_REGISTRY) are opt-in via NEWS_SOURCES
+DEFAULT_NEWS_SOURCES = 'CryptoCompare'
+
+
+def create_http_session(cache_path=None):
+    """Build a retrying session backed by the on-disk HTTP cache; returns (session, caching adapter)"""
+    adapter = CachingHTTPAdapter(
+        HTTPCacheStore(cache_path or os.getenv('HTTP_CACHE_PATH', 'data/http_cache.sqlite')),
+        ttl_rules=HTTP_CACHE_TTLS,
+        max_retries=retry_strategy
+    )
+    http = requests.Session()
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    configure_session(http)  # HTTP_MODE=record|replay sends cache misses through the record/replay layer
+    return http, adapter
+
 
 # Disable SSL warnings
 urllib3.disable_warnings()
@@ -74,15 +104,42 @@ class AIPostingSystem:
             load_dotenv()
             logger.info("Environment variables loaded")
             
-            # Initialize news aggregator with retry mechanism
-            self.news_aggregator = CryptoNewsAggregator(http_session=http)
+            # Built here rather than at import so importing the module touches no files
+            http, self.http_adapter = create_http_session()
+
+            # Initialize news aggregator with retry mechanism and incremental ingestion
+            source_names = os.getenv('NEWS_SOURCES', DEFAULT_NEWS_SOURCES).split(',')
+            self.news_aggregator = CryptoNewsAggregator(
+                http_session=http,
+                news_store=NewsStore(os.getenv('NEWS_STORE_PATH', 'data/news_store.json')),
+                sources=build_sources(source_names, http_session=http),
+                max_source_workers=int(os.getenv('NEWS_SOURCE_WORKERS', 4)),
+                dedup_index=SimHashIndex(os.getenv('DEDUP_INDEX_PATH', 'data/dedup_index.json')),
+                account_rotation=AccountRotation(os.getenv('ACCOUNT_ROTATION_PATH', 'data/account_rotation.json'))
+            )
             logger.info("News aggregator initialized with retry mechanism")
             
             self.posting_hour = 19  # Set posting time to 19:00 (7 PM)
             self.posting_window_minutes = 5  # Post within first 5 minutes of the hour
             self.max_retries = 3
             self.retry_delay = 30  # seconds
+            self.news_timeout = 20  # seconds to wait for the news feed
+            self.trending_timeout = 10  # seconds to wait for trending coins
             self.last_post_date = None
+            self.prefetch_minutes = int(os.getenv('PREFETCH_MINUTES', 30))  # Start warming this long before posting
+            self.prefetch_refresh_minutes = 10  # Regenerate the draft if it gets older than this
+            self._prefetched_draft = None
+            self._prefetch_thread = None
+            self._prefetch_lock = threading.Lock()
+            # Pre-generated drafts to fall back on when news or the LLM is down at posting time
+            self.draft_reservoir = DraftReservoir(
+                os.getenv('DRAFT_RESERVOIR_PATH', 'data/draft_reservoir.sqlite'),
+                capacity=int(os.getenv('DRAFT_RESERVOIR_SIZE', 10)),
+                max_age_hours=int(os.getenv('DRAFT_MAX_AGE_HOURS', 24))
+            )
+            self.refill_interval = int(os.getenv('DRAFT_REFILL_MINUTES', 30)) * 60
+            self._refill_thread = None
+            self._stop_refill = threading.Event()
             self.initialize_twitter_api()
             logging.info(f"AI posting system initialized - Will post at {self.posting_hour:02d}:00")
             
@@ -114,6 +171,7 @@ class AIPostingSystem:
                     access_token_secret=access_token_secret,
                     wait_on_rate_limit=True
                 )
+                configure_session(self.client.session)
                 logger.info("Twitter API initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Twitter API: {str(e)}")
@@ -136,6 +194,7 @@ class AIPostingSystem:
     def handle_termination(self, signum, frame):
         """Handle termination signals gracefully"""
         logger.info("Received termination signal. Cleaning up...")
+        self._stop_refill.set()
         sys.exit(0)
 
     def restart_system(self):
@@ -170,6 +229,120 @@ class AIPostingSystem:
         
         return should_post
 
+    def should_prefetch_now(self):
+        """Check if we are in the warm-up period before the posting window"""
+        current_time = datetime.now()
+        if self.last_post_date == current_time.date():
+            return False
+        
+        target_datetime = current_time.replace(
+            hour=self.posting_hour,
+            minute=0,
+            second=0,
+            microsecond=0
+        )
+        minutes_until_post = (target_datetime - current_time).total_seconds() / 60
+        return self.posting_window_minutes < minutes_until_post <= self.prefetch_minutes
+
+    def start_prefetch(self):
+        """Warm news, coins and the draft tweet in the background"""
+        if self._prefetch_thread and self._prefetch_thread.is_alive():
+            return
+        with self._prefetch_lock:
+            draft = self._prefetched_draft
+        if draft and datetime.now() - draft['created_at'] < timedelta(minutes=self.prefetch_refresh_minutes):
+            return
+        
+        logger.info("Prefetching draft ahead of posting window...")
+        self._prefetch_thread = threading.Thread(target=self._prefetch_draft, name='post-prefetch', daemon=True)
+        self._prefetch_thread.start()
+
+    def _prefetch_draft(self):
+        """Generate a draft and cache it for the posting window"""
+        try:
+            tweet = self.generate_post()
+            if tweet:
+                with self._prefetch_lock:
+                    self._prefetched_draft = {'tweet': tweet, 'created_at': datetime.now()}
+                logger.info("Prefetched draft ready")
+            else:
+                logger.warning("Prefetch could not generate a draft, will generate at posting time")
+        except Exception as e:
+            logger.error(f"Error prefetching draft: {str(e)}")
+
+    def take_prefetched_draft(self):
+        """Take the cached draft if it is still fresh enough to post"""
+        with self._prefetch_lock:
+            draft, self._prefetched_draft = self._prefetched_draft, None
+        if not draft:
+            return None
+        
+        max_age = timedelta(minutes=self.prefetch_minutes + self.posting_window_minutes)
+        if datetime.now() - draft['created_at'] > max_age:
+            logger.info("Prefetched draft is stale, discarding")
+            return None
+        return draft['tweet']
+
+    def refill_reservoir(self):
+        """Generate drafts for the best unseen stories until the reservoir is full"""
+        free_slots = self.draft_reservoir.free_slots()
+        if not free_slots:
+            return 0
+        
+        news, trending = self.news_aggregator.get_news_and_trending(
+            news_timeout=self.news_timeout,
+            trending_timeout=self.trending_timeout
+        )
+        if not news:
+            return 0
+        
+        ranker = self.news_aggregator.ranker
+        scores = ranker.score(news, trending)
+        added = 0
+        for score, item in sorted(zip(scores, news), key=lambda pair: pair[0], reverse=True):
+            if added >= free_slots:
+                break
+            story_id = str(item.get('cluster_id', item['id']))
+            if self.draft_reservoir.has_story(story_id):
+                continue
+            tweet = generate_tweet(item, trending, self.news_aggregator)
+            topics = sorted(self.news_aggregator.ai_matcher.find(item['title']))
+            if self.draft_reservoir.add(tweet, score, topic=topics[0] if topics else 'general',
+                                        story_id=story_id, published_on=item.get('published_on')):
+                added += 1
+        self.news_aggregator.account_rotation.save()
+        logger.info(f"Added {added} drafts to the reservoir ({self.draft_reservoir.count()} ready)")
+        return added
+
+    def _refill_loop(self):
+        """Keep the reservoir topped up until stopped"""
+        while not self._stop_refill.is_set():
+            try:
+                self.refill_reservoir()
+            except Exception as e:
+                logger.error(f"Error refilling draft reservoir: {str(e)}")
+            self._stop_refill.wait(self.refill_interval)
+
+    def start_reservoir_producer(self):
+        """Start the background thread that refills the reservoir"""
+        if self._refill_thread and self._refill_thread.is_alive():
+            return
+        self._stop_refill.clear()
+        self._refill_thread = threading.Thread(target=self._refill_loop, name='draft-reservoir', daemon=True)
+        self._refill_thread.start()
+
+    def take_reservoir_draft(self):
+        """Take the best fresh draft from the reservoir, or None if it is empty"""
+        try:
+            draft = self.draft_reservoir.take_best()
+        except Exception as e:
+            logger.error(f"Error reading draft reservoir: {str(e)}")
+            return None
+        if not draft:
+            return None
+        logger.info(f"Using reservoir draft on {draft['topic']} (score {draft['score']:.2f})")
+        return draft['text']
+
     def generate_post(self):
         """Generate a new AI-focused crypto post"""
         try:
@@ -178,13 +351,19 @@ class AIPostingSystem:
             while retry_count < self.max_retries:
                 try:
                     logger.info(f"Attempt {retry_count + 1}/{self.max_retries} to generate post")
-                    # Get latest news and trending coins
-                    news = self.news_aggregator.get_latest_news()
-                    trending = self.news_aggregator.get_trending_ai_coins()
+                    # Get latest news and trending coins concurrently
+                    news, trending = self.news_aggregator.get_news_and_trending(
+                        news_timeout=self.news_timeout,
+                        trending_timeout=self.trending_timeout
+                    )
+
+                    logger.info(f"HTTP cache stats: {self.http_adapter.get_stats()}")
 
                     if news:
                         # Generate tweet with our meme format
-                        tweet = generate_tweet(news[0], trending, self.news_aggregator)
+                        best_news = self.news_aggregator.pick_best_news(news, trending)
+                        tweet = generate_tweet(best_news, trending, self.news_aggregator)
+                        self.news_aggregator.account_rotation.save()
                         logger.info("Successfully generated news-based content")
                         return tweet
                     else:
@@ -224,6 +403,13 @@ class AIPostingSystem:
             if not self.client:
                 raise Exception("Twitter client not initialized")
             
+            if not tweet_content or not tweet_content.strip():
+                logger.error("Refusing to post an empty tweet")
+                return False
+            if not is_valid_tweet(tweet_content):
+                logger.warning(f"Tweet is {weighted_length(tweet_content)} weighted characters, truncating")
+                tweet_content = truncate_tweet(tweet_content)
+            
             response = self.client.create_tweet(text=tweet_content)
             tweet_id = response.data['id']
             logger.info(f"Successfully posted tweet (ID: {tweet_id})")
@@ -236,10 +422,18 @@ class AIPostingSystem:
         """Generate and post a new tweet if conditions are met"""
         try:
             if not self.should_post_now():
+                if self.should_prefetch_now():
+                    self.start_prefetch()
                 return None
 
-            logger.info("Generating post content...")
-            tweet = self.generate_post()
+            tweet = self.take_prefetched_draft()
+            if tweet:
+                logger.info("Using prefetched draft")
+            else:
+                tweet = self.take_reservoir_draft()
+            if not tweet:
+                logger.info("Generating post content...")
+                tweet = self.generate_post()
             if tweet:
                 logger.info(f"Successfully generated tweet: {tweet}")
                 logger.info("Attempting to post tweet...")
@@ -269,6 +463,7 @@ class AIPostingSystem:
         logger.info(f"Starting AI posting system - Will post at {self.posting_hour:02d}:00")
         
         if continuous:
+            self.start_reservoir_producer()
             while True:
                 try:
                     self.make_post()
@@ -1,11 +1,11 @@
 import os
 import json
 import logging
-import openai
 import time
 import emoji
 from datetime import datetime
 from dotenv import load_dotenv
+from llm_gateway import get_gateway
 from pathlib import Path
 from tweet_templates import get_template, get_joke
 import random
@@ -26,7 +26,7 @@ class PostingSystem:
         """Initialize posting system with real data sources"""
         try:
             load_dotenv()
-            self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.llm = get_gateway()  # shared, rate-limited OpenAI client
             self.config = self.get_default_config()
             self.tweet_memory = TweetMemory()
             logger.info("Enhanced posting system initialized with real data sources")
@@ -83,12 +83,13 @@ class PostingSystem:
             - Format appropriately for Twitter
             """
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
+            response = self.llm.chat(
+                route="final",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that extracts verified information for tweets."},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                use_cache=True  # same headline on a retry gets the same extraction
             )
             
             # Extract information from response
@@ -1,12 +1,12 @@
 import os
 import json
 import logging
-import openai
 import time
 import emoji
 import random
 from datetime import datetime
 from dotenv import load_dotenv
+from llm_gateway import get_gateway
 from pathlib import Path
 from tweet_templates import get_template, get_joke, VERIFIED_SOURCES
 
@@ -26,7 +26,7 @@ class PostingSystem:
         """Initialize posting system with Gen-Z style"""
         try:
             load_dotenv()
-            self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.llm = get_gateway()  # shared, rate-limited OpenAI client
             self.config = self.get_default_config()
             self.tweet_memory = TweetMemory()
             logger.info("Gen-Z style posting system initialized fr fr")
@@ -98,12 +98,13 @@ class PostingSystem:
             - Keep it technically accurate but make it fun
             """
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
+            response = self.llm.chat(
+                route="final",
                 messages=[
                     {"role": "system", "content": "You are a Gen-Z tech expert who keeps it real (fr fr) while providing accurate information."},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                use_cache=True  # same headline on a retry gets the same extraction
             )
             
             # Extract information and style it
@@ -4,275 +4,415 @@ import os
 import json
 import requests
 from datetime import datetime, timedelta
+from pathlib import Path
 from pycoingecko import CoinGeckoAPI
 from dotenv import load_dotenv
 import random
+import heapq
 import pytz
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from account_rotation import AccountRotation
+from keyword_matcher import KeywordMatcher
+from news_sources import CryptoCompareSource, fetch_all
+from tweet_templates import VERIFIED_SOURCES
+from tweet_length import ELLIPSIS, MAX_TWEET_LENGTH, truncate_tweet, weighted_length
+
+class ArticleRanker:
+    """Rank candidate articles so the best one is picked without extra LLM calls.
+
+    Each article is scored on keyword density, freshness, source weight,
+    overlap with trending coins and cross-source coverage. Features are
+    computed for the whole batch at once (one matcher pass per feature) and
+    normalised to 0..1 before the weighted sum.
+    """
+
+    DEFAULT_WEIGHTS = {
+        'keyword_density': 0.3,
+        'freshness': 0.3,
+        'source_weight': 0.2,
+        'trending_overlap': 0.15,
+        'coverage': 0.05
+    }
+
+    def __init__(self, keyword_matcher, weights=None, source_weights=None, half_life_hours=6):
+        self.keyword_matcher = keyword_matcher
+        self.weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        if source_weights is None:
+            # Verified outlets get full weight, everything else half
+            source_weights = {source: 1.0 for sources in VERIFIED_SOURCES.values() for source in sources}
+        self.source_weights = source_weights
+        self.default_source_weight = 0.5
+        self.half_life_seconds = half_life_hours * 3600
+
+    def _trending_matcher(self, trending_coins):
+        names = [coin['item']['name'] for coin in trending_coins or []]
+        symbols = [coin['item']['symbol'] for coin in trending_coins or []]
+        return KeywordMatcher(names, word_keywords=symbols)
+
+    def score(self, news_items, trending_coins=None, now=None):
+        """Score every article in the batch, higher is better."""
+        if not news_items:
+            return []
+        now = time.time() if now is None else now
+        texts = [f"{item['title']} {item.get('body', '')}" for item in news_items]
+
+        keyword_hits = self.keyword_matcher.classify_batch(texts)
+        density = [len(hits) / max(1, len(text.split())) for hits, text in zip(keyword_hits, texts)]
+        trending = [len(hits) for hits in self._trending_matcher(trending_coins).classify_batch(texts)]
+        coverage = [item.get('coverage', 1) for item in news_items]
+        freshness = [0.5 ** (max(0, now - item.get('published_on', now)) / self.half_life_seconds)
+                     for item in news_items]
+        source = [self.source_weights.get(item.get('source'), self.default_source_weight)
+                  for item in news_items]
+
+        features = {
+            'keyword_density': self._normalise(density),
+            'freshness': freshness,
+            'source_weight': source,
+            'trending_overlap': self._normalise(trending),
+            'coverage': self._normalise(coverage)
+        }
+        return [sum(self.weights[name] * values[i] for name, values in features.items())
+                for i in range(len(news_items))]
+
+    def top_k(self, news_items, k=1, trending_coins=None, now=None):
+        """Get the k best articles, best first."""
+        scores = self.score(news_items, trending_coins, now)
+        best = heapq.nlargest(k, range(len(news_items)), key=scores.__getitem__)
+        return [news_items[i] for i in best]
+
+    @staticmethod
+    def _normalise(values):
+        """Scale values to 0..1 by the batch maximum."""
+        highest = max(values, default=0)
+        if highest <= 0:
+            return [0.0] * len(values)
+        return [value / highest for value in values]
 
 class CryptoNewsAggregator:
-    def __init__(self, http_session=None):
+    def __init__(self, http_session=None, news_store=None, sources=None, max_source_workers=4,
+                 dedup_index=None, account_rotation=None):
         load_dotenv()
         self.coingecko = CoinGeckoAPI()
         self.api_key = os.getenv('CRYPTOCOMPARE_API_KEY')
         self.http_session = http_session or requests.Session()
+        if http_session is not None:
+            # Route CoinGecko through the shared (caching, retrying) session too
+            self.coingecko.session = http_session
+        self.news_store = news_store  # Enables incremental ingestion when set
+        # News source adapters, fetched in parallel; CryptoCompare only by default
+        self.sources = sources if sources is not None else [
+            CryptoCompareSource(http_session=self.http_session, api_key=self.api_key)
+        ]
+        self.max_source_workers = max_source_workers
+        self.dedup_index = dedup_index  # Collapses near-duplicate stories when set
+        self._news_store_lock = threading.Lock()
+        self._fetch_executor = None
+        self._inflight_fetches = {}  # feed name -> future of its last fetch
+        self._inflight_lock = threading.Lock()
         self.ai_keywords = [
             'artificial intelligence', 'machine learning', 'neural network',
             'autonomous agent', 'agentic ai', 'llm', 'language model',
             'deep learning', 'ai model', 'chatbot', 'intelligent agent',
             'predictive analytics', 'ai trading', 'ml algorithm'
         ]
-        self.used_accounts = set()  # Track used accounts in this session
+        self.ai_matcher = KeywordMatcher(self.ai_keywords, word_keywords=['ai', 'ml'])
+        self.ranker = ArticleRanker(self.ai_matcher)
+        # Rotation through reference accounts; in-memory unless a persistent one is passed
+        self.account_rotation = account_rotation or AccountRotation(path=None)
         
     def reset_used_accounts(self):
         """Reset the used accounts tracking at the start of each day"""
-        self.used_accounts = set()
-        
-    def get_unused_account(self, accounts):
-        """Get a random unused account, reset if all are used"""
-        available = [acc for acc in accounts if acc not in self.used_accounts]
-        if not available:
-            self.reset_used_accounts()
-            available = accounts
+        self.account_rotation.reset()
         
-        chosen = random.choice(available)
-        self.used_accounts.add(chosen)
-        return chosen
+    def get_unused_account(self, accounts, pool='default'):
+        """Get the next account of the pool's rotation, every account is used before any repeats"""
+        return self.account_rotation.next(pool, accounts)
         
     def contains_ai_content(self, text):
         """Check if text contains AI-related keywords."""
-        text = text.lower()
-        return any(keyword in text for keyword in self.ai_keywords) or \
-               bool(re.search(r'\b(ai|ml)\b', text))
+        return self.ai_matcher.matches(text)
         
+    def _build_news_item(self, article):
+        """Turn a normalised source article into a news item, or None if not AI-related."""
+        # Strict check for AI-related content
+        title = article['title']
+        body = article['body'][:500]  # Check first 500 chars for performance
+        sentences = body.split('. ')
+        
+        # Classify title, body and every sentence in a single matcher pass
+        title_hits, body_hits, *sentence_hits = self.ai_matcher.classify_batch([title, body] + sentences)
+        if not (title_hits or body_hits):
+            return None
+        
+        # Extract key AI insights from the body, removing metadata
+        clean_sentences = [s for s, hits in zip(sentences, sentence_hits)
+                        if hits and 
+                        'appeared first' not in s.lower() and
+                        len(s.split()) > 5]  # Ensure meaningful sentences
+        
+        return {
+            'id': article['id'],
+            'title': title,
+            'body': body,
+            'ai_insights': clean_sentences[:2],  # Top 2 AI-related sentences
+            'source': article['source'],
+            'url': article.get('url'),
+            'published_on': article['published_on']
+        }
+
+    def _collapse_duplicate(self, news_item, known_items):
+        """Check a news item against the dedup index.
+
+        Returns True if it repeats a story already in `known_items` (id -> item),
+        in which case that story's coverage count is bumped instead.
+        """
+        if self.dedup_index is None:
+            news_item['coverage'] = 1
+            return False
+        cluster_id = self.dedup_index.add(
+            news_item['id'],
+            f"{news_item['title']} {news_item['body']}",
+            news_item['published_on']
+        )
+        news_item['cluster_id'] = cluster_id
+        news_item['coverage'] = self.dedup_index.cluster_size(cluster_id)
+        if cluster_id == news_item['id']:
+            return False
+        if cluster_id in known_items:
+            known_items[cluster_id]['coverage'] = news_item['coverage']
+        return True
+
+    def _fetch_articles(self):
+        """Fetch all configured sources and merge them into one stream, newest first."""
+        return fetch_all(self.sources, max_workers=self.max_source_workers)
+
     def get_latest_news(self):
         """Get AI and agent-related news from the last 24 hours."""
+        if self.news_store is not None:
+            return self._get_latest_news_incremental()
         try:
-            url = "https://min-api.cryptocompare.com/data/v2/news/?lang=EN&categories=AI|Technology|Trading"
-            headers = {'authorization': f'Apikey {self.api_key}'}
-            response = self.http_session.get(url, headers=headers, verify=False, timeout=30)
-            news_data = response.json()
+            articles = self._fetch_articles()
             
-            if 'Data' in news_data and news_data['Data']:
+            if articles:
                 sg_tz = pytz.timezone('Asia/Singapore')
                 current_time = datetime.now(sg_tz)
-                recent_news = []
+                recent_news = {}
                 
-                for article in news_data['Data']:
+                for article in articles:
                     published_time = datetime.fromtimestamp(article['published_on']).replace(tzinfo=sg_tz)
                     time_diff = current_time - published_time
                     
                     if time_diff <= timedelta(hours=24):
-                        # Strict check for AI-related content
-                        title = article['title']
-                        body = article['body'][:500]  # Check first 500 chars for performance
-                        
-                        if self.contains_ai_content(title) or self.contains_ai_content(body):
-                            # Extract key AI insights from the body
-                            sentences = body.split('. ')
-                            # Remove metadata and clean up sentences
-                            clean_sentences = [s for s in sentences 
-                                            if self.contains_ai_content(s) and 
-                                            'appeared first' not in s.lower() and
-                                            len(s.split()) > 5]  # Ensure meaningful sentences
-                            
-                            recent_news.append({
-                                'title': title,
-                                'body': body,
-                                'ai_insights': clean_sentences[:2],  # Top 2 AI-related sentences
-                                'source': article['source_info']['name']
-                            })
+                        news_item = self._build_news_item(article)
+                        if news_item and not self._collapse_duplicate(news_item, recent_news):
+                            recent_news[news_item['id']] = news_item
                 
-                return recent_news
+                if self.dedup_index is not None:
+                    self.dedup_index.save()
+                return list(recent_news.values())
             return []
         except Exception as e:
             print(f"Error fetching news: {str(e)}")
             return []
 
+    def _get_latest_news_incremental(self):
+        """Classify only articles not seen before and return the stored 24h window."""
+        # A timed-out concurrent fetch may still be running against the store
+        with self._news_store_lock:
+            return self._ingest_new_articles()
+
+    def _ingest_new_articles(self):
+        store = self.news_store
+        now = time.time()
+        try:
+            for article in self._fetch_articles():
+                published_on = article['published_on']
+                # Skip anything already processed or outside the window
+                if not store.is_recent(published_on, now) or store.is_seen(article['id']):
+                    continue
+                news_item = self._build_news_item(article)
+                if news_item and self._collapse_duplicate(news_item, store.articles):
+                    # Same story from another outlet, or one already covered on an earlier run
+                    news_item = None
+                store.add(article['id'], published_on, news_item)
+        except Exception as e:
+            print(f"Error fetching news: {str(e)}")
+        
+        try:
+            store.prune(now)
+            store.save()
+            if self.dedup_index is not None:
+                self.dedup_index.prune(now)
+                self.dedup_index.save()
+        except Exception as e:
+            print(f"Error saving news store: {str(e)}")
+        return store.get_window(now)
+
     def get_trending_ai_coins(self):
         """Get trending AI-related coins."""
         try:
             trending = self.coingecko.get_search_trending()
-            ai_coins = [coin for coin in trending['coins'] 
-                       if self.contains_ai_content(coin['item']['name']) or 
-                          self.contains_ai_content(coin['item']['symbol'])]
+            coins = trending['coins']
+            name_hits = self.ai_matcher.classify_batch(coin['item']['name'] for coin in coins)
+            symbol_hits = self.ai_matcher.classify_batch(coin['item']['symbol'] for coin in coins)
+            ai_coins = [coin for coin, name, symbol in zip(coins, name_hits, symbol_hits)
+                       if name or symbol]
             return ai_coins[:3]  # Top 3 AI-related trending coins
         except Exception as e:
             print(f"Error fetching trending coins: {str(e)}")
             return []
 
-def generate_tweet(news_item, trending_coins=None, aggregator=None):
-    """Generate tweets about AI crypto news with varying formats, including philosophical insights."""
+    def pick_best_news(self, news, trending_coins=None):
+        """Get the highest ranked article, or None if there is no news."""
+        best = self.ranker.top_k(news, k=1, trending_coins=trending_coins)
+        return best[0] if best else None
+
+    def get_news_and_trending(self, news_timeout=20, trending_timeout=10):
+        """Fetch news and trending coins concurrently.
+
+        Each source gets its own timeout, measured from the start of the call.
+        A source that is too slow yields an empty list so the caller can carry
+        on with whatever arrived in time. A fetch that is still running from
+        an earlier call is awaited again rather than started twice, so stuck
+        fetches cannot pile up and fill the worker pool.
+        """
+        start = time.monotonic()
+        fetches = [
+            ('news', self._submit_fetch('news', self.get_latest_news), news_timeout),
+            ('trending', self._submit_fetch('trending', self.get_trending_ai_coins), trending_timeout)
+        ]
+        
+        results = {}
+        for name, future, timeout in fetches:
+            remaining = max(0, start + timeout - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FuturesTimeoutError:
+                print(f"Timed out fetching {name} after {timeout}s, continuing without it")
+                results[name] = []
+        return results['news'], results['trending']
+
+    def _submit_fetch(self, name, func):
+        """Get the in-flight future for a feed, starting a fetch only if none is running"""
+        with self._inflight_lock:
+            if self._fetch_executor is None:
+                # Not used as a context manager: shutting down would wait for slow fetches
+                self._fetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='news-fetch')
+            future = self._inflight_fetches.get(name)
+            if future is None or future.done():
+                future = self._fetch_executor.submit(func)
+                self._inflight_fetches[name] = future
+            return future
+
+class TweetTemplateRegistry:
+    """Tweet formats and reference tables, loaded once and pre-rendered into slots.
+
+    Every slot already carries its separators and labels, so assembling a
+    tweet is a handful of random picks and a single join.
+    """
+
+    def __init__(self, path=None):
+        path = path or Path(__file__).parent / "config" / "tweet_formats.json"
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        # One tuple of openers per format, headline label baked in
+        self.formats = [
+            tuple(f"{template}\n\n{fmt['headline_label']}:\n" for template in fmt['templates'])
+            for fmt in data['formats']
+        ]
+        self.insight_prefix = f"\n\n{data['insight_label']}: "
+        
+        # Crypto influencer references with their typical styles, and traders with their typical advice
+        self.influencer_refs = [tuple(ref) for ref in data['influencer_refs']]
+        self.trader_refs = [tuple(ref) for ref in data['trader_refs']]
+        self.influencer_slots = {ref: f"\n\n{ref[0]} {ref[1]}" for ref in self.influencer_refs}
+        self.trader_slots = {ref: f"\n\neven {ref[0]} {ref[1]}... you good? 👀" for ref in self.trader_refs}
+        
+        # Spicy questions without account references
+        self.question_slots = tuple(f"\n\n{question}" for question in data['questions'])
+        self.hashtag_slot = f"\n{data['hashtags']}"
+        self.influencer_ref_probability = data['influencer_ref_probability']
+        self.trader_ref_probability = data['trader_ref_probability']
+
+TEMPLATE_REGISTRY = TweetTemplateRegistry()
+
+def generate_tweet(news_item, trending_coins=None, aggregator=None, max_length=MAX_TWEET_LENGTH):
+    """Generate tweets about AI crypto news with varying formats, including philosophical insights.
+
+    Advances the aggregator's account rotation without saving it; callers
+    save once per post or batch.
+    """
     
     # Initialize aggregator if not provided
     if aggregator is None:
         aggregator = CryptoNewsAggregator()
     
-    # Different tweet formats
-    formats = [
-        "ai_manual",
-        "expectation_reality",
-        "tier_list",
-        "patch_notes",
-        "alignment_chart",
-        "skill_tree"
-    ]
-    
-    # AI Manual format
-    ai_manual = [
-        "AI Trading Manual v2025:\n1. turn on AI\n2. touch grass\n3. come back to gains 📈",
-        "How to Trade in 2025:\n1. let AI do its thing\n2. go outside\n3. profit 🤖",
-        "AI Agent Setup Guide:\n1. deploy bot\n2. delete trading apps\n3. enjoy life 🌴",
-        "Trading Psychology 2025:\n1. trust the AI\n2. ignore the charts\n3. stay hydrated 💧",
-        "Modern Trading Steps:\n1. AI does analysis\n2. AI makes trades\n3. you take credit 😎"
-    ]
-    
-    # Expectation vs Reality
-    expectation_reality = [
-        "Humans trading:\n- research for hours\n- emotional decisions\n- panic sells\n\nAI trading:\n- instant analysis\n- pure logic\n- never sleeps 🤖",
-        "What you think AI trading is:\n- complex math\n- rocket science\n- magic\n\nWhat it actually is:\n- number go up\n- you go outside\n- life good 📈",
-        "Crypto Bros:\n- 'trust me bro'\n- 'to the moon'\n- 'buy my course'\n\nAI Agents:\n- verified data\n- actual profits\n- no merch 💅",
-        "Human Copium:\n- 'AI can't feel markets'\n- 'need human touch'\n- 'tech will fail'\n\nMeanwhile AI:\n- outperforms\n- outlasts\n- outsmart 🧠",
-        "Traditional Trading:\n- charts\n- indicators\n- stress\n\nAI Trading:\n- beep boop\n- task failed successfully\n- number go up 🚀"
-    ]
-    
-    # Tier List
-    tier_list = [
-        "Trading Tier List 2025:\nS: AI Agents\nA: AI + Human\nB: Bot Trading\nF: Manual Trading 📊",
-        "Portfolio Manager Tier List:\nS: Autonomous AI\nA: Supervised AI\nB: Quant Bots\nF: Your Emotions 🎯",
-        "Trading Speed Tier List:\nS: AI Microseconds\nA: Bot Milliseconds\nB: HFT Seconds\nF: Human Minutes ⚡",
-        "Risk Management Tier List:\nS: AI Systems\nA: Smart Contracts\nB: Stop Losses\nF: Trust Me Bro 🛡️",
-        "Market Analysis Tier List:\nS: AI Networks\nA: Machine Learning\nB: Technical Analysis\nF: Astrology 🔮"
-    ]
-    
-    # Patch Notes
-    patch_notes = [
-        "HUMAN TRADER v2025.1 PATCH NOTES:\n- nerfed emotional trading\n- buffed AI integration\n- removed FOMO feature 🎮",
-        "MARKET UPDATE v2025:\n- added AI agents\n- removed human error\n- fixed paper hands bug\n- buffed returns 🛠️",
-        "TRADING v2.0 CHANGELOG:\n- deprecated manual trading\n- added AI autopilot\n- removed sleep requirement 🔄",
-        "CRYPTO PATCH 2025.1:\n- AI agents now meta\n- humans need buff\n- emotion mechanic removed\n- added grass touching 🌱",
-        "MARKET HOTFIX:\n- fixed human error bug\n- implemented AI oversight\n- removed panic sell button 🔧"
-    ]
-    
-    # Alignment Chart
-    alignment_chart = [
-        "Trading Alignment Chart:\nLawful Good: AI Agent\nChaotic Good: AI + Human\nChaotic Evil: 3am Trading 📱",
-        "Market Player Alignment:\nLawful Good: AI Systems\nNeutral: Quant Bots\nChaotic Evil: Trust Me Bros 🎲",
-        "Portfolio Alignment:\nLawful Good: AI Manager\nNeutral Good: Index Bot\nChaotic Evil: Leverage Trading 🎯",
-        "Strategy Alignment:\nLawful Good: AI Analysis\nTrue Neutral: DCA Bot\nChaotic Evil: FOMO Trading 🎭",
-        "Trader Alignment:\nLawful Good: AI Agent\nNeutral Good: Bot Trader\nChaotic Evil: Emotional Trader 🃏"
-    ]
-    
-    # Skill Tree
-    skill_tree = [
-        "TRADING SKILL TREE 2025:\n⭐ AI Integration (MAX)\n└ Human Emotion (DISABLED)\n  └ Manual Trading (DEPRECATED) 🎮",
-        "MARKET SKILL TREE:\n⭐ AI Analysis (MAXED)\n└ Technical Analysis (OBSOLETE)\n  └ Gut Feeling (ERROR 404) 🎯",
-        "PORTFOLIO SKILL TREE:\n⭐ AI Management (UNLOCKED)\n└ Bot Trading (UPGRADED)\n  └ Manual Trading (LOCKED) 🔒",
-        "TRADER EVOLUTION TREE:\n⭐ AI Partnership (EVOLVED)\n└ Bot Usage (LEARNED)\n  └ Chart Reading (FORGOTTEN) 📊",
-        "CRYPTO SKILL TREE:\n⭐ AI Agent (MASTERED)\n└ Smart Contracts (LEARNED)\n  └ Emotional Control (404) 🎓"
-    ]
-    
-    # Crypto influencer references with their typical styles
-    influencer_refs = [
-        ("@cobie", "would never fall for human trading cope 🧵"),
-        ("@gainzy", "AI only goes up 📈"),
-        ("@CryptoKaleo", "called it: AI agents > human traders"),
-        ("@DegenSpartan", "letting the AI cook 👨‍🍳"),
-        ("@0xWave", "was right about AI trading supremacy"),
-        ("@0xfoobar", "watching AI agents flip traders rn 👀"),
-        ("@VitalikButerin", "AI alignment looking good ser"),
-        ("@zhusu", "been real quiet since AI started trading"),
-        ("@AltcoinPsycho", "'imagine not having an AI agent'"),
-        ("@IamNomad", "spotted this AI alpha first"),
-        ("@loomdart", "AI agents are the new meta"),
-        ("@Pentosh1", "AI chart patterns never lie"),
-        ("@CryptoCred", "technical analysis is dead, AI killed it"),
-        ("@SmallCapScience", "adapt or get rekt by AI"),
-        ("@crypto_birb", "AI agents flipping my bags")
-    ]
+    registry = TEMPLATE_REGISTRY
     
-    # Trader references with their typical advice
-    trader_refs = [
-        ("@MacnBTC", "switched to AI trading"),
-        ("@CryptoMessiah", "AI agents are free money"),
-        ("@inversebrah", "inverse the humans, follow the AI"),
-        ("@TheCryptoDog", "letting the AI hunt for alpha"),
-        ("@nebraskangooner", "these AI levels are key"),
-        ("@Cryptanzee", "AI agents never sleep"),
-        ("@TraderMayne", "AI trading is the future"),
-        ("@CryptoTony__", "AI broke the trendline"),
-        ("@ByzGeneral", "AI armies are assembling"),
-        ("@CryptoKaleo", "AI agents printing rn")
-    ]
-    
-    # Choose format
-    format_type = random.choice(formats)
-    
-    if format_type == "ai_manual":
-        tweet = f"{random.choice(ai_manual)}\n\n"
-        tweet += f"Latest Example:\n{news_item['title']}"
-            
-    elif format_type == "expectation_reality":
-        tweet = f"{random.choice(expectation_reality)}\n\n"
-        tweet += f"Breaking News:\n{news_item['title']}"
-        
-    elif format_type == "tier_list":
-        tweet = f"{random.choice(tier_list)}\n\n"
-        tweet += f"Today's Proof:\n{news_item['title']}"
-        
-    elif format_type == "patch_notes":
-        tweet = f"{random.choice(patch_notes)}\n\n"
-        tweet += f"Changelog Entry:\n{news_item['title']}"
-        
-    elif format_type == "alignment_chart":
-        tweet = f"{random.choice(alignment_chart)}\n\n"
-        tweet += f"Current Meta:\n{news_item['title']}"
-        
-    else:  # skill_tree
-        tweet = f"{random.choice(skill_tree)}\n\n"
-        tweet += f"Skill Unlocked:\n{news_item['title']}"
+    # Choose format and opener
+    opener = random.choice(random.choice(registry.formats))
+    headline = news_item['title']
     
     # Add AI insights if available
+    insight = ''
     if news_item.get('ai_insights'):
-        tweet += f"\n\nPatch Note: {random.choice(news_item['ai_insights'])}"
+        insight = registry.insight_prefix + random.choice(news_item['ai_insights'])
     
     # Choose random unused accounts for this tweet
-    influencer = aggregator.get_unused_account(influencer_refs)
-    trader = aggregator.get_unused_account(trader_refs)
-    
-    # Format the references
-    influencer_ref = f"{influencer[0]} {influencer[1]}"
-    trader_ref = f"{trader[0]} {trader[1]}"
+    influencer = aggregator.get_unused_account(registry.influencer_refs, pool='influencer')
+    trader = aggregator.get_unused_account(registry.trader_refs, pool='trader')
     
-    # Add the references to the tweet
-    if random.random() < 0.7:  # 70% chance to add influencer reference
-        tweet += f"\n\n{influencer_ref}"
+    influencer_ref = ''
+    if random.random() < registry.influencer_ref_probability:  # 70% chance to add influencer reference
+        influencer_ref = registry.influencer_slots[influencer]
     
-    # Add trader reference with different format
-    if random.random() < 0.3:  # 30% chance to use trader reference
-        tweet += f"\n\neven {trader_ref}... you good? 👀"
+    if random.random() < registry.trader_ref_probability:  # 30% chance to use trader reference
+        closing = registry.trader_slots[trader]
     else:
-        # Spicy questions without account references
-        questions = [
-            "still trading manually? that's kinda cringe bro 😬",
-            "imagine not having AI automation in 2025... you good? 👀",
-            "what's your excuse for not using AI? wrong answers only 🎭",
-            "day trading is cool but have you tried grass touching? 🌱",
-            "how's that technical analysis working out for you? 📉"
-        ]
-        tweet += f"\n\n{random.choice(questions)}"
-    
-    tweet += "\n#AIFirst #CryptoNetworks #TheNetwork"
+        closing = random.choice(registry.question_slots)
     
+    parts = [opener, headline, insight, influencer_ref, closing, registry.hashtag_slot]
+    tweet = ''.join(parts)
+    if weighted_length(tweet) > max_length:
+        tweet = _fit_tweet(parts, max_length)
     return tweet
 
+def _fit_tweet(parts, max_length):
+    """Drop optional parts, then shorten the headline, until the tweet fits."""
+    opener, headline, insight, influencer_ref, closing, hashtags = parts
+    # Optional parts in the order they are dropped, least important first
+    for kept in ((insight, closing), (insight,), ()):
+        tweet = ''.join((opener, headline) + kept + (hashtags,))
+        if weighted_length(tweet) <= max_length:
+            return tweet
+    
+    available = max_length - weighted_length(opener + hashtags)
+    if available <= weighted_length(ELLIPSIS):
+        return truncate_tweet(opener + headline + hashtags, max_length)
+    return opener + truncate_tweet(headline, available) + hashtags
+
+def generate_tweets(news_items, n, trending_coins=None, aggregator=None):
+    """Generate n candidate tweets, cycling through the news items."""
+    if not news_items:
+        return []
+    if aggregator is None:
+        aggregator = CryptoNewsAggregator()
+    tweets = [generate_tweet(news_items[i % len(news_items)], trending_coins, aggregator)
+              for i in range(n)]
+    aggregator.account_rotation.save()
+    return tweets
+
 if __name__ == "__main__":
     aggregator = CryptoNewsAggregator()
     news = aggregator.get_latest_news()
     trending = aggregator.get_trending_ai_coins()
     
     if news:
-        tweet = generate_tweet(news[0], trending, aggregator)
+        tweet = generate_tweet(aggregator.pick_best_news(news, trending), trending, aggregator)
         print(f"\n{tweet}\n")
     else:
         print("No recent AI news found in the last 24 hours.")
@@ -0,0 +1,172 @@
+"""Near-duplicate prompt cache over local hashed bag-of-words vectors.
+
+Prompts that differ only in timestamps or small wording changes map to
+nearly the same vector, so their completions can be reused without an
+embedding service. Each prompt is hashed into a fixed-size, L2-normalised
+vector of word unigrams and bigrams (numbers dropped); cached prompts are
+rows of one NumPy matrix and a lookup is a single matrix-vector product.
+
+A vector match only counts within the same model and scope. The scope
+holds what must match exactly: sampling parameters, plus any key the
+caller gives for the parts of a templated prompt that change its meaning
+(e.g. the topic), since "...against phishing attacks" and "...against
+malware attacks" are near-identical as vectors.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+_WORD_RE = re.compile(r'[a-z][a-z0-9_]*')
+
+
+def _bucket(feature, dim):
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+    value = int.from_bytes(digest, 'big')
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+def vectorize(text, dim=1024):
+    """Hash text into an L2-normalised bag-of-words vector."""
+    words = _WORD_RE.findall(text.lower())
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+        index, sign = _bucket(feature, dim)
+        vector[index] += sign
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def semantic_scope(params=None, key=None):
+    """Build the exact-match scope for sampling params and a caller key."""
+    payload = json.dumps({'params': params or {}, 'key': key}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def prompt_text(messages):
+    """Flatten chat messages into the text that gets vectorised."""
+    return '\n'.join(f"{message.get('role', '')}: {message.get('content') or ''}" for message in messages)
+
+
+class SemanticCache:
+    """Completions keyed by prompt vector, reused above a cosine threshold.
+
+    Rows live in a preallocated matrix; once `max_entries` is reached the
+    oldest row is overwritten. Only entries for the same model and scope
+    match.
+    """
+
+    def __init__(self, path='data/semantic_cache.npz', dim=1024, threshold=0.92,
+                 max_entries=2000, max_age=7 * 86400):
+        self.path = path
+        self.dim = dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.matrix = np.zeros((max_entries, dim), dtype=np.float32)
+        self.models = [''] * max_entries
+        self.scopes = [''] * max_entries
+        self.bodies = [''] * max_entries
+        self.stored_at = np.zeros(max_entries, dtype=np.float64)
+        self.size = 0
+        self.next_row = 0
+        self.dirty = False
+        self.last_saved = time.monotonic()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load cached rows from disk, starting empty if missing or corrupt."""
+        if not self.path:
+            return
+        try:
+            with np.load(self.path) as state:
+                if state['matrix'].shape[1] != self.dim:
+                    return
+                count = min(len(state['matrix']), self.max_entries)
+                if not count:
+                    return
+                self.matrix[:count] = state['matrix'][-count:]
+                self.stored_at[:count] = state['stored_at'][-count:]
+                self.models[:count] = [str(model) for model in state['models'][-count:]]
+                if 'scopes' in state:
+                    self.scopes[:count] = [str(scope) for scope in state['scopes'][-count:]]
+                self.bodies[:count] = [str(body) for body in state['bodies'][-count:]]
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, OSError) as e:
+            print(f"Error loading semantic cache: {str(e)}")
+            return
+        self.size = count
+        self.next_row = count % self.max_entries
+
+    def save(self):
+        """Atomically write cached rows to disk, oldest first, if anything changed."""
+        if not self.path or not self.dirty:
+            return
+        with self._lock:
+            if self.size < self.max_entries:
+                order = np.arange(self.size)
+            else:
+                order = np.roll(np.arange(self.max_entries), -self.next_row)
+            state = {
+                'matrix': self.matrix[order],
+                'stored_at': self.stored_at[order],
+                'models': np.array([self.models[i] for i in order], dtype=str),
+                'scopes': np.array([self.scopes[i] for i in order], dtype=str),
+                'bodies': np.array([self.bodies[i] for i in order], dtype=str)
+            }
+            self.dirty = False
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **state)
+            os.replace(tmp_path, self.path)
+            self.last_saved = time.monotonic()
+        except Exception:
+            os.unlink(tmp_path)
+            self.dirty = True
+            raise
+
+    def save_if_due(self, interval=60):
+        """Save at most once per interval seconds, since the matrix can be large."""
+        if time.monotonic() - self.last_saved >= interval:
+            self.save()
+
+    def lookup(self, model, messages, scope='', now=None):
+        """Get the cached body of the most similar prompt above the threshold, or None"""
+        now = time.time() if now is None else now
+        vector = vectorize(prompt_text(messages), self.dim)
+        with self._lock:
+            if not self.size:
+                return None
+            scores = self.matrix[:self.size] @ vector
+            models = np.array(self.models[:self.size])
+            scopes = np.array(self.scopes[:self.size])
+            scores[(models != model) | (scopes != scope) | (now - self.stored_at[:self.size] > self.max_age)] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            return self.bodies[best]
+
+    def add(self, model, messages, body, scope='', now=None):
+        """Cache a completion body for the prompt"""
+        vector = vectorize(prompt_text(messages), self.dim)
+        with self._lock:
+            row = self.next_row
+            self.matrix[row] = vector
+            self.models[row] = model
+            self.scopes[row] = scope
+            self.bodies[row] = body
+            self.stored_at[row] = time.time() if now is None else now
+            self.next_row = (row + 1) % self.max_entries
+            self.size = min(self.size + 1, self.max_entries)
+            self.dirty = True
@@ -0,0 +1,44 @@
+"""Coalesce concurrent identical async calls into one execution.
+
+The first caller for a key starts the work; callers arriving with the same
+key while it is in flight await the same result (or exception) instead of
+starting their own. Once it finishes the key is forgotten, so later calls
+run fresh.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Per-key deduplication of in-flight coroutines, with saved-call counters."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {'calls': 0, 'executions': 0, 'saved': 0, 'errors': 0}
+
+    async def do(self, key, func):
+        """Await func() once per key among concurrent callers; func returns an awaitable"""
+        self.stats['calls'] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats['executions'] += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats['saved'] += 1
+        # A waiter that goes away (e.g. the client disconnects) must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats['errors'] += 1
+
+    def get_stats(self):
+        """Get counters plus the number of keys currently in flight"""
+        stats = dict(self.stats)
+        stats['in_flight'] = len(self._inflight)
+        stats['saved_rate'] = stats['saved'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
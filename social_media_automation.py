@@ -2,7 +2,6 @@ import os
 import schedule
 import time
 from datetime import datetime
-import openai
 from dotenv import load_dotenv
 import tweepy
 import requests
@@ -16,6 +15,9 @@ from jose import jwt
 import base64
 from pathlib import Path
 from content_strategy_manager import ContentStrategyManager
+from llm_gateway import get_gateway, run_blocking
+from tweet_length import is_valid_tweet, weighted_length
+from post_polish import polish_post
 import logging
 
 # Load environment variables
@@ -94,8 +96,8 @@ class EmailReviewSystem:
 
 class SocialMediaAutomation:
     def __init__(self):
-        # Initialize OpenAI
-        openai.api_key = os.getenv('OPENAI_API_KEY')
+        # Initialize OpenAI (shared, rate-limited client)
+        self.llm = get_gateway()
         
         # Initialize Twitter API
         auth = tweepy.OAuthHandler(
@@ -149,11 +151,11 @@ class SocialMediaAutomation:
             prompt = self._create_content_prompt(platform, content_type, topic)
             
             # Generate content using OpenAI
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
+            response = self.llm.chat(
+                route="draft",  # a reviewer sees it before it is posted
                 messages=[{"role": "system", "content": prompt}],
                 temperature=0.7,
-                max_tokens=280 if platform == 'twitter' else 1000
+                max_tokens=280 if platform == 'twitter' else 1000  # not cached: repeat requests want a fresh draft
             )
             
             return response.choices[0].message.content.strip()
@@ -162,48 +164,16 @@ class SocialMediaAutomation:
             logger.error(f"Error generating content: {str(e)}")
             raise
 
+    async def generate_content_async(self, platform='twitter', content_type='tips', topic=None):
+        """Generate content on the worker pool without blocking the event loop"""
+        return await run_blocking(self.generate_content, platform, content_type, topic)
+
     def generate_image(self, content, style="digital art"):
         """Generate an image using OpenAI's DALL-E based on the content"""
         try:
-            # Create an image prompt based on the content
-            system_prompt = """You are an expert at creating image generation prompts.
-            Create a detailed prompt that will generate an image matching the social media post content.
-            Focus on visual elements, style, mood, and composition.
-            Do not include any text elements as they will be added separately."""
-            
-            user_prompt = f"""Create an image generation prompt for this social media post:
-            {content}
-            
-            Style requirements:
-            - Professional and modern look
-            - {style} style
-            - Suitable for social media
-            - No text elements
-            """
-            
-            # Get the image prompt from GPT
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7
-            )
-            
-            image_prompt = response.choices[0].message.content.strip()
-            print(f"Generated image prompt: {image_prompt}")
-            
-            # Generate the image using DALL-E
-            response = openai.Image.create(
-                prompt=image_prompt,
-                n=1,
-                size="1024x1024"
-            )
-            
-            image_url = response['data'][0]['url']
+            image_prompt = self.create_image_prompt(content, style)
             return {
-                'url': image_url,
+                'url': self.render_image(image_prompt),
                 'prompt': image_prompt
             }
             
@@ -211,16 +181,57 @@ class SocialMediaAutomation:
             print(f"Error generating image: {str(e)}")
             return None
 
+    def create_image_prompt(self, content, style="digital art"):
+        """Write a DALL-E prompt matching the content"""
+        system_prompt = """You are an expert at creating image generation prompts.
+        Create a detailed prompt that will generate an image matching the social media post content.
+        Focus on visual elements, style, mood, and composition.
+        Do not include any text elements as they will be added separately."""
+        
+        user_prompt = f"""Create an image generation prompt for this social media post:
+        {content}
+        
+        Style requirements:
+        - Professional and modern look
+        - {style} style
+        - Suitable for social media
+        - No text elements
+        """
+        
+        # Get the image prompt from GPT
+        response = self.llm.chat(
+            route="image_prompt",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.7,
+            use_cache=True  # one image prompt per post content
+        )
+        
+        image_prompt = response.choices[0].message.content.strip()
+        print(f"Generated image prompt: {image_prompt}")
+        return image_prompt
+
+    def render_image(self, image_prompt):
+        """Generate the image for a prompt using DALL-E; returns its URL"""
+        response = self.llm.image(
+            prompt=image_prompt,
+            n=1,
+            size="1024x1024"
+        )
+        return response.data[0].url
+
     async def generate_content_with_image(self, platform='twitter', content_type='tips', topic=None, style="digital art"):
         """Generate both content and matching image"""
         try:
             # First generate the text content
-            content = self.generate_content(platform, content_type, topic)
+            content = await self.generate_content_async(platform, content_type, topic)
             if not content:
                 return None
                 
-            # Then generate a matching image
-            image_result = self.generate_image(content, style)
+            # Then generate a matching image (its prompt is derived from the text)
+            image_result = await run_blocking(self.generate_image, content, style)
             if not image_result:
                 return {'content': content, 'image': None}
                 
@@ -236,6 +247,8 @@ class SocialMediaAutomation:
 
     def save_content_for_review(self, content, platform, scheduled_time):
         """Save content to database and send for review"""
+        # Polish before review so the reviewer approves exactly what gets posted
+        content = polish_post(self.llm, content, platform)
         conn = sqlite3.connect('content.db')
         c = conn.cursor()
         
@@ -286,6 +299,9 @@ class SocialMediaAutomation:
             content_id, text, platform, scheduled_time, status, created_at = content
             
             if platform == 'twitter':
+                if not is_valid_tweet(text):
+                    print(f"Skipping content {content_id}: {weighted_length(text)} weighted characters is over the Twitter limit")
+                    continue
                 try:
                     self.twitter_api.update_status(text)
                     print(f"Successfully posted to Twitter: {text}")
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from account_rotation import AccountRotation
+from real_crypto_news import CryptoNewsAggregator, generate_tweets
+
+ACCOUNTS = [('@a', 'one'), ('@b', 'two'), ('@c', 'three'), ('@d', 'four')]
+
+
+class TestAccountRotation(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'rotation.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_every_account_used_before_repeats(self):
+        rotation = AccountRotation(self.path, seed=1)
+        for _ in range(3):
+            picks = [rotation.next('influencer', ACCOUNTS) for _ in ACCOUNTS]
+            self.assertEqual(sorted(picks), ACCOUNTS)
+
+    def test_no_immediate_repeat_across_reshuffle(self):
+        rotation = AccountRotation(None, seed=2)
+        picks = [rotation.next('pool', ACCOUNTS[:2]) for _ in range(20)]
+        self.assertTrue(all(a != b for a, b in zip(picks, picks[1:])))
+
+    def test_cursor_survives_restart(self):
+        rotation = AccountRotation(self.path, seed=3)
+        first = [rotation.next('trader', ACCOUNTS) for _ in range(2)]
+        rotation.save()
+
+        restarted = AccountRotation(self.path)
+        rest = [restarted.next('trader', ACCOUNTS) for _ in range(2)]
+        self.assertEqual(sorted(first + rest), ACCOUNTS)
+
+    def test_pools_are_independent_and_reset_on_change(self):
+        rotation = AccountRotation(None, seed=4)
+        rotation.next('influencer', ACCOUNTS)
+        self.assertEqual(sorted(rotation.next('trader', ACCOUNTS) for _ in ACCOUNTS), ACCOUNTS)
+
+        rotation.next('influencer', ACCOUNTS[:3])
+        self.assertEqual(rotation.pools['influencer']['cursor'], 1)
+        with self.assertRaises(ValueError):
+            rotation.next('empty', [])
+
+    def test_items_are_hashed_only_when_registered(self):
+        rotation = AccountRotation(None, seed=6)
+        with mock.patch.object(AccountRotation, '_signature', wraps=AccountRotation._signature) as signature:
+            for _ in range(10):
+                rotation.next('influencer', ACCOUNTS)
+            self.assertEqual(signature.call_count, 1)
+            rotation.next('influencer', list(ACCOUNTS))
+            self.assertEqual(signature.call_count, 2)
+        # Same items in a new object keep the position
+        self.assertEqual(rotation.pools['influencer']['cursor'], 3)
+
+    def test_generate_tweets_saves_once_per_batch(self):
+        aggregator = CryptoNewsAggregator(account_rotation=AccountRotation(self.path, seed=7))
+        news = [{'title': 'AI agents launch a token', 'body': '', 'published_on': 0}]
+        with mock.patch.object(AccountRotation, 'save', autospec=True) as save:
+            generate_tweets(news, 5, aggregator=aggregator)
+        self.assertEqual(save.call_count, 1)
+
+    def test_aggregator_uses_rotation(self):
+        aggregator = CryptoNewsAggregator(account_rotation=AccountRotation(self.path, seed=5))
+        picks = [aggregator.get_unused_account(ACCOUNTS, pool='influencer') for _ in ACCOUNTS]
+        self.assertEqual(sorted(picks), ACCOUNTS)
+        aggregator.account_rotation.save()
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import time
+import unittest
+
+from dedup_index import SimHashIndex, simhash
+from real_crypto_news import CryptoNewsAggregator
+
+STORY = ("OpenAI launches autonomous trading agent for crypto markets. The new language model "
+         "agent executes trades on decentralized exchanges with built-in risk controls and audit logs.")
+REWORDED = ("OpenAI unveils autonomous trading agent for crypto markets. The new language model "
+            "agent executes trades on decentralized exchanges with built in risk controls and audit logs.")
+OTHER = ("Bitcoin miners shift capacity to AI data centers as hashprice falls to record lows, "
+         "analysts say margins will keep shrinking this quarter.")
+
+
+class StaticSource:
+    name = 'Static'
+
+    def __init__(self, articles):
+        self.articles = articles
+
+    def fetch(self):
+        return self.articles
+
+
+class TestSimHashIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'dedup.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_simhash_is_stable(self):
+        self.assertEqual(simhash(STORY), simhash(STORY))
+
+    def test_near_duplicates_share_a_cluster(self):
+        index = SimHashIndex(self.path)
+        self.assertEqual(index.add('a', STORY), 'a')
+        self.assertEqual(index.add('b', REWORDED), 'a')
+        self.assertEqual(index.add('c', OTHER), 'c')
+        self.assertEqual(index.cluster_size('a'), 2)
+
+    def test_index_persists_across_runs(self):
+        index = SimHashIndex(self.path)
+        index.add('a', STORY)
+        index.save()
+
+        reloaded = SimHashIndex(self.path)
+        self.assertEqual(reloaded.add('b', REWORDED), 'a')
+
+    def test_prune_forgets_old_articles(self):
+        index = SimHashIndex(self.path, retention_days=1)
+        index.add('a', STORY, published_on=time.time() - 2 * 86400)
+        index.prune()
+        self.assertEqual(index.add('b', REWORDED), 'b')
+        self.assertEqual(index.buckets.keys(), {key for key in index._band_keys(simhash(REWORDED))})
+
+    def test_aggregator_counts_story_once(self):
+        now = int(time.time())
+        source = StaticSource([
+            {'id': 's:1', 'title': 'AI agent trades crypto', 'body': STORY, 'url': None,
+             'source': 'CoinDesk', 'published_on': now - 10},
+            {'id': 's:2', 'title': 'AI agent trades crypto', 'body': REWORDED, 'url': None,
+             'source': 'The Block', 'published_on': now - 20},
+        ])
+        aggregator = CryptoNewsAggregator(sources=[source], dedup_index=SimHashIndex(self.path))
+
+        news = aggregator.get_latest_news()
+        self.assertEqual([item['id'] for item in news], ['s:1'])
+        self.assertEqual(news[0]['coverage'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
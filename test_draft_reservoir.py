@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from draft_reservoir import DraftReservoir
+
+NOW = 1_700_000_000
+
+
+class TestDraftReservoir(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'drafts.sqlite')
+        self.reservoir = DraftReservoir(self.path, capacity=3, max_age_hours=1)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_take_best_returns_highest_score_once(self):
+        self.reservoir.add('low draft', 0.2, topic='ai', story_id='1', now=NOW)
+        self.reservoir.add('high draft', 0.9, topic='agents', story_id='2', now=NOW)
+        best = self.reservoir.take_best(now=NOW)
+        self.assertEqual(best['text'], 'high draft')
+        self.assertEqual(best['topic'], 'agents')
+        self.assertEqual(self.reservoir.take_best(now=NOW)['text'], 'low draft')
+        self.assertIsNone(self.reservoir.take_best(now=NOW))
+
+    def test_expired_drafts_are_skipped(self):
+        self.reservoir.add('old story', 0.9, story_id='1', published_on=NOW - 1800, now=NOW)
+        self.reservoir.add('new story', 0.1, story_id='2', published_on=NOW, now=NOW)
+        self.assertFalse(self.reservoir.add('stale', 0.5, story_id='3', published_on=NOW - 7200, now=NOW))
+        self.assertEqual(self.reservoir.take_best(now=NOW + 2000)['text'], 'new story')
+
+    def test_capacity_evicts_lowest_score(self):
+        for i, score in enumerate([0.5, 0.3, 0.7]):
+            self.reservoir.add(f'draft {i}', score, story_id=str(i), now=NOW)
+        self.assertFalse(self.reservoir.add('too weak', 0.1, story_id='x', now=NOW))
+        self.assertTrue(self.reservoir.add('strong', 0.8, story_id='y', now=NOW))
+        self.assertEqual(self.reservoir.count(now=NOW), 3)
+        self.assertEqual(self.reservoir.free_slots(now=NOW), 0)
+        texts = [self.reservoir.take_best(now=NOW)['text'] for _ in range(3)]
+        self.assertEqual(texts, ['strong', 'draft 2', 'draft 0'])
+
+    def test_rejects_invalid_and_duplicate_drafts(self):
+        self.assertFalse(self.reservoir.add('x' * 300, 0.5, now=NOW))
+        self.assertTrue(self.reservoir.add('first take', 0.5, story_id='1', now=NOW))
+        self.assertFalse(self.reservoir.add('second take', 0.6, story_id='1', now=NOW))
+        self.assertTrue(self.reservoir.has_story('1'))
+
+    def test_taken_story_is_not_drafted_again(self):
+        self.reservoir.add('posted draft', 0.5, story_id='1', now=NOW)
+        self.reservoir.take_best(now=NOW)
+        self.assertTrue(self.reservoir.has_story('1'))
+        self.assertFalse(self.reservoir.add('redraft', 0.9, story_id='1', now=NOW))
+        self.assertEqual(self.reservoir.count(now=NOW), 0)
+        self.assertEqual(self.reservoir.free_slots(now=NOW), 3)
+        self.assertIsNone(self.reservoir.take_best(now=NOW))
+
+    def test_drafts_survive_restart(self):
+        self.reservoir.add('kept draft', 0.5, story_id='1', now=NOW)
+        reopened = DraftReservoir(self.path, capacity=3, max_age_hours=1)
+        self.assertEqual(reopened.take_best(now=NOW)['text'], 'kept draft')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from http_cache import CachingHTTPAdapter, HTTPCacheStore
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        ETagHandler.requests_seen.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b'{"Data": [1, 2, 3]}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCachingHTTPAdapter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), ETagHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ETagHandler.requests_seen = []
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_session(self, ttl):
+        adapter = CachingHTTPAdapter(HTTPCacheStore(self.db_path), ttl_rules={self.base_url + '/news': ttl})
+        session = requests.Session()
+        session.mount('http://', adapter)
+        return session, adapter
+
+    def test_fresh_entries_are_served_from_cache(self):
+        session, adapter = self.make_session(ttl=60)
+        first = session.get(self.base_url + '/news')
+        second = session.get(self.base_url + '/news')
+
+        self.assertEqual(first.json(), second.json())
+        self.assertTrue(second.from_cache)
+        self.assertEqual(len(ETagHandler.requests_seen), 1)
+        self.assertEqual(adapter.get_stats()['hits'], 1)
+        self.assertEqual(adapter.get_stats()['misses'], 1)
+
+    def test_stale_entries_are_revalidated(self):
+        session, adapter = self.make_session(ttl=60)
+        session.get(self.base_url + '/news')
+
+        # A new session over the same store simulates a restart with an expired TTL
+        session, adapter = self.make_session(ttl=0.001)
+        response = session.get(self.base_url + '/news')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'Data': [1, 2, 3]})
+        self.assertEqual(ETagHandler.requests_seen, [None, '"v1"'])
+        self.assertEqual(adapter.get_stats()['revalidated'], 1)
+
+    def test_urls_without_rule_bypass_cache(self):
+        session, adapter = self.make_session(ttl=60)
+        session.get(self.base_url + '/other')
+        session.get(self.base_url + '/other')
+
+        self.assertEqual(len(ETagHandler.requests_seen), 2)
+        self.assertEqual(adapter.get_stats()['bypassed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
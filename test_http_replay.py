@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from http_cache import CachingHTTPAdapter, HTTPCacheStore
+from http_replay import (Cassette, FaultInjector, RecordingAdapter, ReplayAdapter,
+                         StandInServer, configure_session, request_key)
+from news_sources import CryptoCompareSource
+from real_crypto_news import CryptoNewsAggregator
+
+NEWS_PAYLOAD = {'Data': [
+    {'id': 1, 'title': 'AI agents run a hedge fund', 'body': 'A language model now manages the book.',
+     'url': 'https://example.com/1', 'published_on': int(time.time()) - 60,
+     'source_info': {'name': 'CoinDesk'}}
+]}
+
+
+class TestHTTPReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cassette = Cassette(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_request_key_ignores_host_and_secrets(self):
+        self.assertEqual(
+            request_key('get', 'https://api.coingecko.com/api/v3/search/trending?x_cg_pro_api_key=s&b=2&a=1'),
+            request_key('GET', 'http://127.0.0.1:9/api/v3/search/trending?a=1&b=2')
+        )
+
+    def test_record_then_replay_offline(self):
+        upstream = StandInServer(self.cassette).start()
+        self.addCleanup(upstream.stop)
+        self.cassette.record('GET /data/v2/news/?categories=AI', 200,
+                             {'Content-Type': 'application/json'}, json.dumps(NEWS_PAYLOAD).encode())
+
+        # Record what the upstream returns into a fresh cassette
+        recorded = Cassette(self.tmpdir.name + '/recorded')
+        session = requests.Session()
+        session.mount('http://', RecordingAdapter(recorded))
+        session.get(upstream.base_url + '/data/v2/news/?categories=AI')
+
+        # Replay it through the aggregator with no server at all
+        replay = requests.Session()
+        replay.mount('https://', ReplayAdapter(recorded))
+        source = CryptoCompareSource(url='https://min-api.cryptocompare.com/data/v2/news/?categories=AI',
+                                     http_session=replay, api_key='test')
+        news = CryptoNewsAggregator(http_session=replay, sources=[source]).get_latest_news()
+
+        self.assertEqual([item['title'] for item in news], ['AI agents run a hedge fund'])
+
+    def test_stand_in_server_injects_latency_and_errors(self):
+        self.cassette.record('POST /v1/chat/completions', 200, {'Content-Type': 'application/json'},
+                             b'{"choices": []}')
+        server = StandInServer(self.cassette, faults=FaultInjector(latency=0.05)).start()
+        self.addCleanup(server.stop)
+
+        start = time.monotonic()
+        response = requests.post(server.base_url + '/v1/chat/completions', json={'model': 'x'})
+        self.assertEqual(response.json(), {'choices': []})
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+        server.faults = FaultInjector(error_rate=1.0, error_status=429)
+        self.assertEqual(requests.post(server.base_url + '/v1/chat/completions').status_code, 429)
+
+        server.faults = FaultInjector()
+        self.assertEqual(requests.get(server.base_url + '/missing').status_code, 404)
+        self.assertEqual(server.stats, {'served': 1, 'missing': 1, 'injected_errors': 1, 'recorded': 0})
+
+    def test_replay_cycles_through_recordings(self):
+        self.cassette.record('GET /2/users/me', 200, {}, b'first')
+        self.cassette.record('GET /2/users/me', 200, {}, b'second')
+        session = requests.Session()
+        session.mount('https://', ReplayAdapter(Cassette(self.tmpdir.name)))
+
+        bodies = [session.get('https://api.twitter.com/2/users/me').content for _ in range(3)]
+        self.assertEqual(bodies, [b'first', b'second', b'first'])
+
+    def test_replay_mode_keeps_caching_adapter(self):
+        self.cassette.record('GET /api/v3/search/trending', 200, {}, b'{"coins": []}')
+        caching = CachingHTTPAdapter(HTTPCacheStore(os.path.join(self.tmpdir.name, 'cache.sqlite')),
+                                     ttl_rules={'https://api.coingecko.com/': 600})
+        session = requests.Session()
+        session.mount('https://', caching)
+        session.mount('http://', caching)
+        with mock.patch.dict(os.environ, {'HTTP_MODE': 'replay', 'HTTP_CASSETTE_DIR': self.tmpdir.name}):
+            configure_session(session)
+
+        self.assertIs(session.adapters['https://'], caching)
+        self.assertIsInstance(caching.transport, ReplayAdapter)
+        for _ in range(2):
+            self.assertEqual(session.get('https://api.coingecko.com/api/v3/search/trending').json(), {'coins': []})
+        self.assertEqual((caching.get_stats()['misses'], caching.get_stats()['hits']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
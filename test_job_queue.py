@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobRunner, JobStore
+
+
+def wait_for(store, job_id, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job['status'] in (SUCCEEDED, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def staged_job(params, progress):
+    progress('content', content=f"about {params['topic']}")
+    progress('image', image_url='https://example.com/a.png')
+    return {'content': f"about {params['topic']}"}
+
+
+def failing_job(params, progress):
+    progress('content', content=None)
+    raise ValueError("No content generated")
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.tmpdir.name, 'jobs.sqlite'))
+        self.runner = JobRunner(self.store, {'staged': staged_job, 'failing': failing_job})
+
+    def tearDown(self):
+        self.runner.shutdown()
+        self.tmpdir.cleanup()
+
+    def test_submit_returns_immediately(self):
+        release = threading.Event()
+        runner = JobRunner(self.store, {'slow': lambda params, progress: release.wait(2) and {}})
+        self.addCleanup(runner.shutdown)
+
+        start = time.monotonic()
+        job_id = runner.submit('slow', {})
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertIn(self.store.get(job_id)['status'], (QUEUED, RUNNING))
+        release.set()
+        self.assertEqual(wait_for(self.store, job_id)['status'], SUCCEEDED)
+
+    def test_progress_events_and_result(self):
+        job_id = self.runner.submit('staged', {'topic': 'agents'})
+        job = wait_for(self.store, job_id)
+
+        self.assertEqual(job['result'], {'content': 'about agents'})
+        events = self.store.events_since(job_id)
+        self.assertEqual([event['stage'] for event in events], ['content', 'image', 'done'])
+        self.assertEqual(self.store.events_since(job_id, events[0]['seq'])[0]['stage'], 'image')
+
+    def test_failure_is_recorded(self):
+        job_id = self.runner.submit('failing', {})
+        job = wait_for(self.store, job_id)
+        self.assertEqual((job['status'], job['error']), (FAILED, 'No content generated'))
+        self.assertEqual(self.store.events_since(job_id)[-1]['data']['status'], FAILED)
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.runner.submit('missing', {})
+
+    def test_unfinished_jobs_resume_after_restart(self):
+        queued = self.store.create('staged', {'topic': 'queued'})
+        interrupted = self.store.create('staged', {'topic': 'interrupted'})
+        self.store.update(interrupted, status=RUNNING)
+
+        self.assertEqual(self.runner.resume(), [queued, interrupted])
+        self.assertEqual(wait_for(self.store, interrupted)['result'], {'content': 'about interrupted'})
+        self.assertEqual(wait_for(self.store, queued)['status'], SUCCEEDED)
+
+
+    def test_prune_drops_only_old_finished_jobs(self):
+        finished = self.runner.submit('staged', {'topic': 'agents'})
+        wait_for(self.store, finished)
+        deadline = time.monotonic() + 2
+        while self.store.events_since(finished)[-1]['stage'] != 'done' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queued = self.store.create('staged', {'topic': 'later'})
+
+        self.assertEqual(self.store.prune(3600), 0)
+        self.assertEqual(self.store.prune(3600, now=time.time() + 7200), 1)
+        self.assertIsNone(self.store.get(finished))
+        self.assertEqual(self.store.events_since(finished), [])
+        self.assertEqual(self.store.get(queued)['status'], QUEUED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher(
+            ['machine learning', 'llm', 'ai model'],
+            word_keywords=['ai', 'ml']
+        )
+
+    def test_substring_and_word_keywords(self):
+        self.assertTrue(self.matcher.matches('New LLMs everywhere'))
+        self.assertTrue(self.matcher.matches('The AI is here'))
+        self.assertFalse(self.matcher.matches('She said it was plain'))
+        self.assertFalse(self.matcher.matches('HTML parsing'))
+
+    def test_find_prefers_longest_keyword(self):
+        self.assertEqual(self.matcher.find('A new AI model and Machine Learning'),
+                         {'ai model', 'machine learning'})
+
+    def test_overlapping_keywords_are_all_reported(self):
+        matcher = KeywordMatcher(['agentic ai', 'ai model'])
+        self.assertEqual(matcher.find('An agentic AI model'), {'agentic ai', 'ai model'})
+        self.assertEqual(matcher.classify_batch(['agentic ai model', 'ai model']),
+                         [{'agentic ai', 'ai model'}, {'ai model'}])
+
+    def test_classify_batch_keeps_texts_apart(self):
+        results = self.matcher.classify_batch(['deep machine', 'learning rates', 'ml ops', ''])
+        self.assertEqual(results, [set(), set(), {'ml'}, set()])
+
+    def test_classify_batch_handles_length_changing_lowercase(self):
+        results = self.matcher.classify_batch(['İİİ', 'ai'])
+        self.assertEqual(results, [set(), {'ai'}])
+
+    def test_empty_matcher_never_matches(self):
+        self.assertFalse(KeywordMatcher().matches('anything'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletion
+
+from llm_cache import LLMResponseCache, cache_key
+from llm_gateway import LLMGateway
+
+MESSAGES = [{'role': 'user', 'content': 'Summarise: AI agents run a hedge fund'}]
+
+
+class CountingCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        return ChatCompletion.model_validate({
+            'id': f'call-{self.calls}', 'object': 'chat.completion', 'created': 0, 'model': model,
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': f'reply {self.calls}'}}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+        })
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'llm_cache.sqlite')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_covers_model_messages_and_params(self):
+        key = cache_key('gpt-4', MESSAGES, {'temperature': 0})
+        self.assertEqual(key, cache_key('gpt-4', MESSAGES, {'temperature': 0}))
+        self.assertNotEqual(key, cache_key('gpt-3.5-turbo', MESSAGES, {'temperature': 0}))
+        self.assertNotEqual(key, cache_key('gpt-4', MESSAGES, {'temperature': 0.5}))
+
+    def test_round_trip_survives_restart(self):
+        LLMResponseCache(self.path).put('k', 'body')
+        self.assertEqual(LLMResponseCache(self.path).get('k'), 'body')
+        self.assertIsNone(LLMResponseCache(self.path).get('missing'))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LLMResponseCache(self.path, max_entries=2, memory_entries=0)
+        cache.put('a', '1')
+        time.sleep(0.01)
+        cache.put('b', '2')
+        time.sleep(0.01)
+        cache.get('a')
+        cache.put('c', '3')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.get('a'), cache.get('b')), ('1', None))
+
+    def test_expired_entries_are_ignored(self):
+        cache = LLMResponseCache(self.path, max_age=0.05)
+        cache.put('a', '1')
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('a'))
+
+
+class TestGatewayCaching(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.completions = CountingCompletions()
+        self.gateway = LLMGateway(
+            client=SimpleNamespace(chat=SimpleNamespace(completions=self.completions)),
+            cache=LLMResponseCache(os.path.join(self.tmpdir.name, 'llm_cache.sqlite'))
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_deterministic_calls_are_cached(self):
+        first = self.gateway.complete(MESSAGES, temperature=0)
+        second = self.gateway.complete(MESSAGES, temperature=0)
+        self.assertEqual((first, second), ('reply 1', 'reply 1'))
+        self.assertEqual(self.completions.calls, 1)
+        stats = self.gateway.get_stats()
+        self.assertEqual((stats['cache_hits'], stats['calls'], stats['prompt_tokens']), (1, 1, 10))
+
+    def test_sampled_calls_bypass_cache_unless_opted_in(self):
+        self.gateway.complete(MESSAGES, temperature=0.7)
+        self.gateway.complete(MESSAGES, temperature=0.7)
+        self.assertEqual(self.completions.calls, 2)
+
+        self.gateway.complete(MESSAGES, temperature=0.7, use_cache=True)
+        self.assertEqual(self.gateway.complete(MESSAGES, temperature=0.7, use_cache=True), 'reply 3')
+        self.assertEqual(self.completions.calls, 3)
+
+        self.gateway.complete(MESSAGES, temperature=0, use_cache=False)
+        self.assertEqual(self.completions.calls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from llm_gateway import LLMGateway, TokenBucket, estimate_tokens, run_blocking
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("upstream down")
+            message = SimpleNamespace(content=' reply ')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                                   usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeStream:
+    def __init__(self, pieces, delay=0.0):
+        self.pieces = pieces
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            time.sleep(self.delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))],
+                                  usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=7, completion_tokens=3))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStreamingCompletions:
+    def __init__(self, stream):
+        self.stream = stream
+        self.kwargs = None
+
+    def create(self, model, messages, **kwargs):
+        self.kwargs = kwargs
+        return self.stream
+
+
+def fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+MESSAGES = [{'role': 'user', 'content': 'hello there'}]
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_blocks_until_refilled(self):
+        bucket = TokenBucket(per_minute=600, capacity=1)  # 10 per second
+        self.assertTrue(bucket.acquire())
+        start = time.monotonic()
+        self.assertTrue(bucket.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+    def test_deadline(self):
+        bucket = TokenBucket(per_minute=1, capacity=1)
+        bucket.acquire()
+        self.assertFalse(bucket.acquire(deadline=time.monotonic() + 0.05))
+
+
+class TestLLMGateway(unittest.TestCase):
+    def test_concurrency_is_capped(self):
+        completions = FakeCompletions(delay=0.05)
+        gateway = LLMGateway(client=fake_client(completions), max_concurrency=2,
+                             requests_per_minute=6000)
+        threads = [threading.Thread(target=gateway.chat, args=(MESSAGES,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(completions.peak, 2)
+        stats = gateway.get_stats()
+        self.assertEqual((stats['calls'], stats['in_flight'], stats['queued']), (6, 0, 0))
+        self.assertGreater(stats['avg_queue_wait'], 0)
+
+    def test_metrics_record_tokens_and_errors(self):
+        gateway = LLMGateway(client=fake_client(FakeCompletions()))
+        self.assertEqual(gateway.complete(MESSAGES), 'reply')
+        self.assertEqual(gateway.stats['prompt_tokens'], 10)
+        self.assertEqual(gateway.stats['completion_tokens'], 5)
+
+        gateway = LLMGateway(client=fake_client(FakeCompletions(fail=True)))
+        with self.assertRaises(RuntimeError):
+            gateway.chat(MESSAGES)
+        self.assertEqual(gateway.get_stats()['errors'], 1)
+        self.assertFalse(gateway.calls[0]['ok'])
+
+    def test_queue_timeout_rejects(self):
+        completions = FakeCompletions(delay=0.3)
+        gateway = LLMGateway(client=fake_client(completions), max_concurrency=1, queue_timeout=0.05)
+        worker = threading.Thread(target=gateway.chat, args=(MESSAGES,))
+        worker.start()
+        time.sleep(0.05)
+        with self.assertRaises(TimeoutError):
+            gateway.chat(MESSAGES)
+        worker.join()
+        self.assertEqual(gateway.stats['rejected'], 1)
+
+    def test_token_budget_is_settled_against_usage(self):
+        gateway = LLMGateway(client=fake_client(FakeCompletions()), tokens_per_minute=1000)
+        gateway.chat(MESSAGES, max_tokens=100)
+        self.assertEqual(estimate_tokens(MESSAGES, 100), 102)
+        # Only the 15 tokens actually used stay charged
+        self.assertAlmostEqual(gateway.token_bucket.level, 985, delta=1)
+
+    def test_stream_yields_deltas_as_they_arrive(self):
+        stream = FakeStream(['Hello', None, ' world'], delay=0.05)
+        completions = FakeStreamingCompletions(stream)
+        gateway = LLMGateway(client=fake_client(completions), max_concurrency=1)
+
+        start = time.monotonic()
+        deltas = gateway.stream_chat(MESSAGES)
+        self.assertEqual(next(deltas), 'Hello')
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(gateway.stats['in_flight'], 1)
+        self.assertEqual(list(deltas), [' world'])
+
+        self.assertTrue(completions.kwargs['stream'])
+        self.assertTrue(stream.closed)
+        stats = gateway.get_stats()
+        self.assertEqual((stats['in_flight'], stats['prompt_tokens'], stats['completion_tokens']), (0, 7, 3))
+        self.assertGreater(stats['first_token_p50'], 0)
+
+    def test_abandoned_stream_frees_its_slot(self):
+        gateway = LLMGateway(client=fake_client(FakeStreamingCompletions(FakeStream(['a', 'b']))),
+                             max_concurrency=1, queue_timeout=0.1)
+        deltas = gateway.stream_chat(MESSAGES)
+        next(deltas)
+        deltas.close()
+        self.assertEqual(gateway.stats['in_flight'], 0)
+        self.assertEqual(list(gateway.stream_chat(MESSAGES)), ['a', 'b'])
+
+
+class TestRunBlocking(unittest.TestCase):
+    def test_event_loop_stays_responsive(self):
+        gateway = LLMGateway(client=fake_client(FakeCompletions(delay=0.3)))
+
+        async def scenario():
+            ticks = []
+
+            async def heartbeat():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            beat = asyncio.ensure_future(heartbeat())
+            replies = await asyncio.gather(*(run_blocking(gateway.complete, MESSAGES) for _ in range(2)))
+            beat.cancel()
+            return replies, ticks
+
+        start = time.monotonic()
+        replies, ticks = asyncio.run(scenario())
+        self.assertEqual(replies, ['reply', 'reply'])
+        self.assertLess(time.monotonic() - start, 0.55)
+        self.assertGreater(len(ticks), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
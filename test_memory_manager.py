@@ -0,0 +1,40 @@
+import unittest
+
+from content_assistant import MemoryManager
+
+
+class KeywordMemoryManager(MemoryManager):
+    """MemoryManager whose topics are just the content's words"""
+
+    def _extract_topics(self, content):
+        return content.split()
+
+
+class TestMemoryManager(unittest.TestCase):
+    def test_history_is_limited_to_the_user(self):
+        manager = KeywordMemoryManager()
+        manager.store_interaction('ai agents', 'mine', user_id='alice')
+        manager.store_interaction('ai agents', 'theirs', user_id='bob')
+        history = manager.get_relevant_history('ai', user_id='alice')
+        self.assertEqual([memory['response'] for memory in history], ['mine'])
+        self.assertEqual(manager.get_relevant_history('ai'), [])
+        self.assertEqual(manager.get_relevant_history('ai', user_id='carol'), [])
+
+    def test_ranks_by_relevance_then_recency(self):
+        manager = KeywordMemoryManager(history_limit=2)
+        for content, response in [('ai agents', 'r1'), ('ai', 'r2'), ('ai', 'r3'), ('tech', 'r4')]:
+            manager.store_interaction(content, response, user_id='alice')
+        for i, memory in enumerate(manager.memories['alice']):
+            memory['timestamp'] = f'2024-01-01T00:00:0{i}'
+        history = manager.get_relevant_history('ai agents', user_id='alice')
+        self.assertEqual([memory['response'] for memory in history], ['r1', 'r3'])
+
+    def test_per_user_capacity_drops_oldest(self):
+        manager = KeywordMemoryManager(max_memories_per_user=2)
+        for i in range(3):
+            manager.store_interaction('ai', f'r{i}', user_id='alice')
+        self.assertEqual([memory['response'] for memory in manager.memories['alice']], ['r1', 'r2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from content_assistant import ContextHandler, MemoryManager
+from memory_store import MemoryStore, SQLiteMemoryBackend
+from posting_system import TweetMemory
+
+
+class TestMemoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backend = SQLiteMemoryBackend(os.path.join(self.tmpdir.name, 'memory.sqlite'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_backend_keeps_newest_records_per_key(self):
+        for i in range(5):
+            self.backend.append('ns', 'alice', {'n': i}, max_records=3)
+        self.backend.append('ns', 'bob', {'n': 'b'}, max_records=3)
+        self.assertEqual(self.backend.load('ns', 'alice'), [{'n': 2}, {'n': 3}, {'n': 4}])
+        self.assertEqual(self.backend.load('ns', 'alice', limit=2), [{'n': 3}, {'n': 4}])
+        self.assertEqual(self.backend.load('other', 'alice'), [])
+
+    def test_lru_hot_set_reloads_evicted_keys(self):
+        store = MemoryStore('ns', self.backend, max_keys=2, max_records=3)
+        for user in ('a', 'b', 'c'):
+            store.append(user, {'user': user})
+        self.assertEqual(list(store.hot), ['b', 'c'])
+        self.assertEqual(list(store.get('a')), [{'user': 'a'}])
+        self.assertEqual(list(store.hot), ['c', 'a'])
+        self.assertEqual(store.get_stats()['evictions'], 2)
+
+    def test_history_is_warm_after_restart(self):
+        manager = MemoryManager(backend=self.backend)
+        manager.store_interaction('agent alignment research', 'reply', user_id='alice')
+        ContextHandler(backend=self.backend).update_context('alice', 'hi', 'hello')
+        memory = TweetMemory(backend=self.backend)
+        memory.store_interaction('agent alignment tweet', 'reply')
+
+        restarted = MemoryManager(backend=self.backend)
+        self.assertEqual(restarted.get_relevant_history('agent alignment', user_id='alice')[0]['response'], 'reply')
+        self.assertEqual(ContextHandler(backend=self.backend).get_context('alice')[0]['response'], 'hello')
+        self.assertEqual(TweetMemory(backend=self.backend).get_relevant_history('agent alignment')[0]['tweet'],
+                         'agent alignment tweet')
+
+    def test_loaded_memories_are_reindexed(self):
+        self.backend.append('memories', 'alice', {'id': '1', 'content': 'zk rollups keep getting cheaper',
+                                                  'response': 'reply', 'timestamp': '2024-01-01T00:00:00',
+                                                  'topics': ['general'], 'sentiment': 0.0, 'user_id': 'alice'})
+        manager = MemoryManager(backend=self.backend)
+        self.assertIn('rollups', manager.memories.get('alice')[0]['topics'])
+        self.assertEqual(manager.get_relevant_history('Are rollups safe?', user_id='alice')[0]['id'], '1')
+
+    def test_tweet_memory_window_is_bounded(self):
+        memory = TweetMemory(backend=self.backend, max_interactions=2)
+        for i in range(3):
+            memory.store_interaction(f'tweet {i}', 'reply')
+        self.assertEqual([item['tweet'] for item in memory.interactions.values()], ['tweet 1', 'tweet 2'])
+        indexed = {interaction_id for ids in memory.topic_index.values() for interaction_id in ids}
+        self.assertEqual(indexed, set(memory.interactions))
+        reloaded = TweetMemory(backend=self.backend, max_interactions=2)
+        self.assertEqual(list(reloaded.interactions), list(memory.interactions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from types import SimpleNamespace
+
+from llm_gateway import LLMGateway
+from model_router import ModelRouter
+from post_polish import polish_post
+
+ROUTES = {
+    'draft': {'models': ['gpt-4o-mini', 'gpt-3.5-turbo'], 'p95_latency_seconds': 5, 'tokens_per_hour': 1000},
+    'final': {'models': ['gpt-4', 'gpt-4o-mini'], 'p95_latency_seconds': 20, 'tokens_per_hour': 10000},
+}
+
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_700_000_000
+        self.router = ModelRouter(ROUTES, default_route='final', cooldown_seconds=600)
+
+    def test_routes_pick_their_preferred_model(self):
+        self.assertEqual(self.router.pick('draft', self.now), 'gpt-4o-mini')
+        self.assertEqual(self.router.pick('final', self.now), 'gpt-4')
+        self.assertEqual(self.router.pick('unknown', self.now), 'gpt-4')
+
+    def test_slow_model_is_downgraded_then_retried_after_cooldown(self):
+        for _ in range(ModelRouter.MIN_SAMPLES - 1):
+            self.assertFalse(self.router.record('final', 'gpt-4', 30, 100, now=self.now))
+        self.assertTrue(self.router.record('final', 'gpt-4', 30, 100, now=self.now))
+
+        self.assertEqual(self.router.pick('final', self.now + 1), 'gpt-4o-mini')
+        self.assertEqual(self.router.pick('final', self.now + 601), 'gpt-4')
+        self.assertEqual(self.router.pick('draft', self.now + 1), 'gpt-4o-mini')
+
+    def test_occasional_slow_call_is_tolerated(self):
+        for latency in [2, 3, 2, 30, 2, 3, 2, 2, 3, 2, 2, 3, 2, 2, 3, 2, 2, 3, 2, 2, 3]:
+            self.router.record('final', 'gpt-4', latency, 100, now=self.now)
+        self.assertEqual(self.router.pick('final', self.now), 'gpt-4')
+
+    def test_failing_model_is_downgraded(self):
+        for _ in range(ModelRouter.MIN_SAMPLES):
+            self.router.record('final', 'gpt-4', 0.1, 0, now=self.now, ok=False)
+        self.assertEqual(self.router.pick('final', self.now + 1), 'gpt-4o-mini')
+
+    def test_token_budget_forces_cheapest_model_for_an_hour(self):
+        self.router.record('draft', 'gpt-4o-mini', 1, 1200, now=self.now)
+        self.assertEqual(self.router.pick('draft', self.now + 10), 'gpt-3.5-turbo')
+        self.assertEqual(self.router.pick('draft', self.now + 3601), 'gpt-4o-mini')
+
+    def test_last_tier_is_never_downgraded(self):
+        for _ in range(ModelRouter.MIN_SAMPLES * 2):
+            self.router.record('draft', 'gpt-3.5-turbo', 60, 10, now=self.now)
+        self.assertEqual(self.router.downgrades, 0)
+
+    def test_config_file_loads(self):
+        router = ModelRouter.from_file('config/model_routes.json')
+        self.assertEqual(router.pick('final'), 'gpt-4')
+        self.assertEqual(router.pick('image_prompt'), 'gpt-3.5-turbo')
+
+
+class TestGatewayRouting(unittest.TestCase):
+    def test_route_selects_model_and_records_latency(self):
+        models = []
+
+        def create(model, messages, **kwargs):
+            models.append(model)
+            message = SimpleNamespace(content='ok')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                                   usage=SimpleNamespace(prompt_tokens=600, completion_tokens=600))
+
+        router = ModelRouter(ROUTES)
+        gateway = LLMGateway(client=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+                             router=router)
+        messages = [{'role': 'user', 'content': 'draft a post'}]
+
+        gateway.complete(messages, route='draft')
+        gateway.complete(messages, route='draft')
+        gateway.complete(messages, route='final')
+        gateway.complete(messages, model='gpt-4-turbo', route='final')
+
+        # The first draft call spent the route's hourly token budget
+        self.assertEqual(models, ['gpt-4o-mini', 'gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo'])
+        self.assertEqual(gateway.get_stats()['routing']['routes']['draft']['model'], 'gpt-3.5-turbo')
+        self.assertEqual(gateway.calls[0]['route'], 'draft')
+
+    def test_failed_calls_are_recorded(self):
+        def create(model, messages, **kwargs):
+            raise TimeoutError('upstream timed out')
+
+        router = ModelRouter(ROUTES)
+        gateway = LLMGateway(client=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+                             router=router)
+        for _ in range(ModelRouter.MIN_SAMPLES):
+            with self.assertRaises(TimeoutError):
+                gateway.complete([{'role': 'user', 'content': 'polish this'}], route='final')
+        self.assertEqual(router.downgrades, 1)
+        self.assertEqual(router.pick('final'), 'gpt-4o-mini')
+
+    def test_review_copy_is_polished_on_the_final_route(self):
+        replies = ['Polished tweet', 'x' * 400]
+        models = []
+
+        def create(model, messages, **kwargs):
+            models.append(model)
+            message = SimpleNamespace(content=replies.pop(0))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+        gateway = LLMGateway(client=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            create=create))), router=ModelRouter(ROUTES))
+        self.assertEqual(polish_post(gateway, 'rough tweet'), 'Polished tweet')
+        # An over-long rewrite is dropped in favour of the draft
+        self.assertEqual(polish_post(gateway, 'rough tweet'), 'rough tweet')
+        self.assertEqual(models, ['gpt-4', 'gpt-4'])
+
+if __name__ == '__main__':
+    unittest.main()
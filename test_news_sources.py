@@ -0,0 +1,121 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from news_sources import (CryptoCompareSource, FeedSource, HackerNewsSource,
+                          build_sources, fetch_all, parse_timestamp)
+
+RSS_FIXTURE = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <item>
+    <title>OpenAI ships &lt;b&gt;agents&lt;/b&gt; SDK</title>
+    <link>https://example.com/agents</link>
+    <guid>post-1</guid>
+    <description>&lt;p&gt;A new language model toolkit.&lt;/p&gt;</description>
+    <pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate>
+  </item>
+</channel></rss>"""
+
+ATOM_FIXTURE = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/2501.00001</id>
+    <title>Scaling Autonomous Agents</title>
+    <summary>We study agentic AI systems.</summary>
+    <published>2025-01-06T12:00:00Z</published>
+    <link href="http://arxiv.org/abs/2501.00001"/>
+  </entry>
+</feed>"""
+
+HN_FIXTURE = json.dumps({'hits': [
+    {'objectID': '42', 'title': 'Show HN: LLM trading bot', 'url': None, 'created_at_i': 1736164800}
+]}).encode()
+
+CRYPTOCOMPARE_FIXTURE = json.dumps({'Data': [
+    {'id': 9, 'title': 'AI token rallies', 'body': 'Machine learning funds pile in.',
+     'url': 'https://example.com/9', 'published_on': 1736150400, 'source_info': {'name': 'CoinDesk'}}
+]}).encode()
+
+ROUTES = {
+    '/rss': ('application/rss+xml', RSS_FIXTURE),
+    '/atom': ('application/atom+xml', ATOM_FIXTURE),
+    '/hn': ('application/json', HN_FIXTURE),
+    '/cc': ('application/json', CRYPTOCOMPARE_FIXTURE),
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        route = ROUTES.get(self.path)
+        if route is None:
+            self.send_response(500)
+            self.end_headers()
+            return
+        content_type, body = route
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestNewsSources(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_rss_feed_is_normalised(self):
+        articles = FeedSource('OpenAI Blog', self.base_url + '/rss').fetch()
+        self.assertEqual(articles, [{
+            'id': 'openai_blog:post-1',
+            'title': 'OpenAI ships agents SDK',
+            'body': 'A new language model toolkit.',
+            'url': 'https://example.com/agents',
+            'source': 'OpenAI Blog',
+            'published_on': 1736157600
+        }])
+
+    def test_atom_feed_is_normalised(self):
+        article, = FeedSource('ArXiv', self.base_url + '/atom').fetch()
+        self.assertEqual(article['id'], 'arxiv:http://arxiv.org/abs/2501.00001')
+        self.assertEqual(article['url'], 'http://arxiv.org/abs/2501.00001')
+        self.assertEqual(article['published_on'], 1736164800)
+
+    def test_fetch_all_merges_newest_first_and_skips_failures(self):
+        sources = [
+            FeedSource('OpenAI Blog', self.base_url + '/rss'),
+            FeedSource('ArXiv', self.base_url + '/atom'),
+            HackerNewsSource(url=self.base_url + '/hn'),
+            CryptoCompareSource(url=self.base_url + '/cc', api_key='test'),
+            FeedSource('Broken', self.base_url + '/missing'),
+        ]
+        merged = fetch_all(sources, max_workers=2)
+
+        self.assertEqual([a['id'] for a in merged],
+                         ['arxiv:http://arxiv.org/abs/2501.00001', 'hackernews:42',
+                          'openai_blog:post-1', 'cryptocompare:9'])
+        self.assertEqual(merged[-1]['source'], 'CoinDesk')
+
+    def test_build_sources_skips_unknown_names(self):
+        sources = build_sources(['CryptoCompare', 'Nope', 'ArXiv'])
+        self.assertEqual([s.name for s in sources], ['CryptoCompare', 'ArXiv'])
+
+    def test_parse_timestamp_formats(self):
+        self.assertEqual(parse_timestamp('2025-01-06T12:00:00Z'), 1736164800)
+        self.assertEqual(parse_timestamp('Mon, 06 Jan 2025 12:00:00 +0000'), 1736164800)
+        self.assertIsNone(parse_timestamp('not a date'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+import unittest
+
+from news_store import NewsStore
+from real_crypto_news import CryptoNewsAggregator
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, articles):
+        self.articles = articles
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse({'Data': list(self.articles)})
+
+
+def make_article(article_id, published_on, title):
+    return {
+        'id': article_id,
+        'published_on': published_on,
+        'title': title,
+        'body': 'A new machine learning model was released to trade crypto markets today.',
+        'source_info': {'name': 'CoinDesk'}
+    }
+
+
+class TestIncrementalNews(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'news_store.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_only_new_articles_are_classified(self):
+        now = int(time.time())
+        session = FakeSession([make_article(1, now - 60, 'AI agent launches')])
+        aggregator = CryptoNewsAggregator(http_session=session, news_store=NewsStore(self.path))
+
+        classified = []
+        original = aggregator._build_news_item
+        aggregator._build_news_item = lambda article: classified.append(article['id']) or original(article)
+
+        self.assertEqual(len(aggregator.get_latest_news()), 1)
+        session.articles.insert(0, make_article(2, now - 30, 'LLM trading desk opens'))
+        news = aggregator.get_latest_news()
+
+        self.assertEqual(classified, ['cryptocompare:1', 'cryptocompare:2'])
+        self.assertEqual([item['id'] for item in news], ['cryptocompare:2', 'cryptocompare:1'])
+
+    def test_state_survives_reload(self):
+        now = int(time.time())
+        store = NewsStore(self.path)
+        store.add(7, now - 10, {'id': '7', 'title': 'x', 'published_on': now - 10})
+        store.add(8, now - 5)
+        store.save()
+
+        reloaded = NewsStore(self.path)
+        self.assertTrue(reloaded.is_seen(7))
+        self.assertTrue(reloaded.is_seen(8))
+        self.assertEqual(len(reloaded.get_window()), 1)
+
+    def test_prune_drops_expired_articles(self):
+        now = int(time.time())
+        store = NewsStore(self.path)
+        store.add(1, now - 25 * 3600, {'id': '1', 'title': 'old', 'published_on': now - 25 * 3600})
+        store.add(2, now - 60, {'id': '2', 'title': 'new', 'published_on': now - 60})
+        store.prune(now)
+
+        self.assertFalse(store.is_seen(1))
+        self.assertEqual([item['id'] for item in store.get_window(now)], ['2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
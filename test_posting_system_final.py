@@ -0,0 +1,191 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import posting_system_final
+from http_cache import CachingHTTPAdapter
+from news_sources import SOURCE_REGISTRY, build_sources
+from posting_system_final import AIPostingSystem
+
+NEWS = [{'id': 'cryptocompare:1', 'title': 'LLM agents start trading on-chain', 'body': 'An AI model runs a fund',
+         'url': 'https://example.com/1', 'source': 'CoinDesk', 'published_on': 1_700_000_000}]
+
+
+class FakeClock:
+    """Stands in for the module's datetime so tests control now()"""
+
+    def __init__(self, hour, minute):
+        self.current = datetime(2024, 1, 1, hour, minute)
+
+    def set(self, hour, minute):
+        self.current = self.current.replace(hour=hour, minute=minute)
+
+    def now(self):
+        return self.current
+
+
+class PostingSystemTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        env = {name: os.path.join(self.tmpdir.name, filename) for name, filename in [
+            ('NEWS_STORE_PATH', 'news_store.json'),
+            ('DEDUP_INDEX_PATH', 'dedup_index.json'),
+            ('ACCOUNT_ROTATION_PATH', 'account_rotation.json'),
+            ('DRAFT_RESERVOIR_PATH', 'drafts.sqlite'),
+            ('HTTP_CACHE_PATH', 'http_cache.sqlite'),
+        ]}
+        env['PREFETCH_MINUTES'] = '30'
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(AIPostingSystem, 'initialize_twitter_api'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.clock = FakeClock(18, 40)
+        clock_patch = mock.patch.object(posting_system_final, 'datetime', self.clock)
+        clock_patch.start()
+        self.addCleanup(clock_patch.stop)
+
+        self.system = AIPostingSystem()
+        self.system.retry_delay = 0
+        self.news_calls = 0
+
+        def get_news_and_trending(**kwargs):
+            self.news_calls += 1
+            return list(NEWS), []
+
+        self.system.news_aggregator.get_news_and_trending = get_news_and_trending
+        self.posted = []
+        self.system.post_to_twitter = lambda tweet: self.posted.append(tweet) or True
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def prefetch(self):
+        self.system.start_prefetch()
+        if self.system._prefetch_thread:
+            self.system._prefetch_thread.join(5)
+
+
+class TestNewsSources(PostingSystemTestCase):
+    def test_extra_feeds_are_opt_in(self):
+        self.assertEqual([source.name for source in self.system.news_aggregator.sources], ['CryptoCompare'])
+
+    def test_http_cache_is_created_by_the_system_not_on_import(self):
+        self.assertEqual(self.system.http_adapter.cache_store.db_path, os.environ['HTTP_CACHE_PATH'])
+        repo = os.path.dirname(os.path.abspath(posting_system_final.__file__))
+        subprocess.run([sys.executable, '-c', 'import posting_system_final'], cwd=self.tmpdir.name, check=True,
+                       env=dict(os.environ, PYTHONPATH=repo), capture_output=True)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'data')))
+
+    def test_every_source_is_cached(self):
+        adapter = CachingHTTPAdapter(None, ttl_rules=posting_system_final.HTTP_CACHE_TTLS)
+        for source in build_sources(list(SOURCE_REGISTRY)):
+            self.assertGreater(adapter.ttl_for(source.url), 0, source.name)
+
+
+class TestPrefetchWindow(PostingSystemTestCase):
+    def test_prefetch_runs_only_in_warm_up_period(self):
+        for (hour, minute), expected in [((18, 20), False), ((18, 31), True), ((18, 54), True),
+                                         ((18, 56), False), ((19, 2), False), ((20, 0), False)]:
+            self.clock.set(hour, minute)
+            self.assertEqual(self.system.should_prefetch_now(), expected, (hour, minute))
+
+    def test_posting_window_and_already_posted(self):
+        self.clock.set(19, 4)
+        self.assertTrue(self.system.should_post_now())
+        self.clock.set(19, 6)
+        self.assertFalse(self.system.should_post_now())
+        self.clock.set(18, 40)
+        self.system.last_post_date = self.clock.now().date()
+        self.assertFalse(self.system.should_prefetch_now())
+
+
+class TestPrefetchedDraft(PostingSystemTestCase):
+    def test_prefetched_draft_is_posted_without_fetching_again(self):
+        self.prefetch()
+        self.assertEqual(self.news_calls, 1)
+
+        self.clock.set(19, 1)
+        tweet = self.system.make_post()
+        self.assertEqual(self.posted, [tweet])
+        self.assertEqual(self.news_calls, 1)
+        self.assertEqual(self.system.last_post_date, self.clock.now().date())
+
+    def test_draft_is_refreshed_only_after_refresh_interval(self):
+        self.prefetch()
+        self.clock.set(18, 45)
+        self.prefetch()
+        self.assertEqual(self.news_calls, 1)
+        self.clock.set(18, 51)
+        self.prefetch()
+        self.assertEqual(self.news_calls, 2)
+        self.assertEqual(self.system._prefetched_draft['created_at'], self.clock.now())
+
+    def test_stale_draft_is_discarded(self):
+        self.clock.set(18, 20)
+        self.prefetch()
+        self.clock.set(19, 0)
+        self.assertIsNone(self.system.take_prefetched_draft())
+        self.assertIsNone(self.system._prefetched_draft)
+
+    def test_falls_back_to_live_generation_without_a_draft(self):
+        self.clock.set(19, 1)
+        self.assertIsNone(self.system.take_prefetched_draft())
+        tweet = self.system.make_post()
+        self.assertTrue(tweet)
+        self.assertEqual(self.posted, [tweet])
+        self.assertEqual(self.news_calls, 1)
+
+    def test_failed_prefetch_leaves_no_draft(self):
+        self.system.news_aggregator.get_news_and_trending = lambda **kwargs: ([], [])
+        self.system.max_retries = 1
+        self.prefetch()
+        self.assertIsNone(self.system._prefetched_draft)
+
+
+class TestDraftReservoirRefill(PostingSystemTestCase):
+    def setUp(self):
+        super().setUp()
+        now = int(time.time())
+        self.news = [dict(NEWS[0], published_on=now),
+                     dict(NEWS[0], id='cryptocompare:2', title='GPU networks rally as AI demand grows',
+                          url='https://example.com/2', published_on=now)]
+
+        def get_news_and_trending(**kwargs):
+            self.news_calls += 1
+            return [dict(item) for item in self.news], []
+
+        self.system.news_aggregator.get_news_and_trending = get_news_and_trending
+
+    def test_each_story_is_drafted_once(self):
+        self.assertEqual(self.system.refill_reservoir(), 2)
+        self.assertEqual(self.system.draft_reservoir.count(), 2)
+        self.assertEqual(self.system.refill_reservoir(), 0)
+
+        self.system.take_reservoir_draft()
+        self.system.take_reservoir_draft()
+        # Taken stories stay known, so an empty reservoir is not refilled with them
+        self.assertEqual(self.system.draft_reservoir.free_slots(), self.system.draft_reservoir.capacity)
+        self.assertEqual(self.system.refill_reservoir(), 0)
+
+    def test_make_post_falls_back_to_reservoir_when_news_is_down(self):
+        self.system.refill_reservoir()
+        ready = self.system.draft_reservoir.count()
+        self.system.news_aggregator.get_news_and_trending = lambda **kwargs: ([], [])
+
+        self.clock.set(19, 1)
+        tweet = self.system.make_post()
+        self.assertTrue(tweet)
+        self.assertEqual(self.posted, [tweet])
+        self.assertEqual(self.system.draft_reservoir.count(), ready - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import time
+import unittest
+
+from real_crypto_news import (ArticleRanker, CryptoNewsAggregator, TEMPLATE_REGISTRY,
+                              generate_tweet, generate_tweets)
+from keyword_matcher import KeywordMatcher
+
+
+class TestConcurrentFetch(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = CryptoNewsAggregator()
+
+    def test_sources_run_concurrently(self):
+        def slow_news():
+            time.sleep(0.3)
+            return ['news']
+
+        def slow_coins():
+            time.sleep(0.3)
+            return ['coin']
+
+        self.aggregator.get_latest_news = slow_news
+        self.aggregator.get_trending_ai_coins = slow_coins
+
+        start = time.monotonic()
+        news, trending = self.aggregator.get_news_and_trending(news_timeout=2, trending_timeout=2)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual((news, trending), (['news'], ['coin']))
+        self.assertLess(elapsed, 0.55)
+
+    def test_slow_source_yields_partial_result(self):
+        def stuck_coins():
+            time.sleep(1)
+            return ['coin']
+
+        self.aggregator.get_latest_news = lambda: ['news']
+        self.aggregator.get_trending_ai_coins = stuck_coins
+
+        start = time.monotonic()
+        news, trending = self.aggregator.get_news_and_trending(news_timeout=2, trending_timeout=0.1)
+
+        self.assertEqual((news, trending), (['news'], []))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_stuck_fetch_is_reused_not_resubmitted(self):
+        calls = []
+
+        def stuck_coins():
+            calls.append(1)
+            time.sleep(0.5)
+            return ['coin']
+
+        self.aggregator.get_latest_news = lambda: ['news']
+        self.aggregator.get_trending_ai_coins = stuck_coins
+
+        for _ in range(3):
+            self.assertEqual(self.aggregator.get_news_and_trending(news_timeout=2, trending_timeout=0.05),
+                             (['news'], []))
+        self.assertEqual(len(calls), 1)
+        # The late result is picked up by the next call instead of starting over
+        self.assertEqual(self.aggregator.get_news_and_trending(news_timeout=2, trending_timeout=1),
+                         (['news'], ['coin']))
+        self.assertEqual(len(calls), 1)
+
+
+class TestArticleRanker(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_700_000_000
+        self.ranker = ArticleRanker(KeywordMatcher(['machine learning', 'llm'], word_keywords=['ai']))
+
+    def make_item(self, title, age_hours=1, source='CoinDesk', coverage=1):
+        return {'title': title, 'body': '', 'source': source, 'coverage': coverage,
+                'published_on': self.now - age_hours * 3600}
+
+    def test_fresher_article_wins_when_otherwise_equal(self):
+        old = self.make_item('AI trading desk opens', age_hours=20)
+        new = self.make_item('AI trading desk opens', age_hours=1)
+        self.assertIs(self.ranker.top_k([old, new], now=self.now)[0], new)
+
+    def test_verified_source_and_trending_overlap_raise_score(self):
+        plain = self.make_item('AI model released for BTC holders')
+        verified = self.make_item('AI model released for BTC holders', source='OpenAI Blog')
+        trending = self.make_item('AI model released for FET holders')
+        coins = [{'item': {'name': 'Fetch.ai', 'symbol': 'FET'}}]
+
+        plain_score, verified_score, trending_score = self.ranker.score(
+            [plain, verified, trending], trending_coins=coins, now=self.now)
+        self.assertGreater(verified_score, plain_score)
+        self.assertGreater(trending_score, plain_score)
+
+    def test_top_k_orders_best_first(self):
+        items = [self.make_item('AI', age_hours=age) for age in (30, 2, 10, 1)]
+        ranked = self.ranker.top_k(items, k=3, now=self.now)
+        self.assertEqual([item['published_on'] for item in ranked],
+                         [self.now - h * 3600 for h in (1, 2, 10)])
+
+    def test_empty_batch(self):
+        self.assertEqual(self.ranker.top_k([], k=1), [])
+
+
+class TestTweetGeneration(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = CryptoNewsAggregator()
+        self.news = [{'title': 'AI agents run a hedge fund',
+                      'ai_insights': ['The language model trades hourly']}]
+
+    def test_tweet_contains_headline_and_hashtags(self):
+        tweet = generate_tweet(self.news[0], aggregator=self.aggregator)
+        self.assertIn(':\nAI agents run a hedge fund', tweet)
+        self.assertIn('\n\nPatch Note: The language model', tweet)
+        self.assertTrue(tweet.endswith('\n#AIFirst #CryptoNetworks #TheNetwork'))
+
+    def test_generate_tweets_batch(self):
+        news = self.news + [{'title': 'LLM desk opens'}]
+        tweets = generate_tweets(news, 5, aggregator=self.aggregator)
+        self.assertEqual(len(tweets), 5)
+        self.assertIn('LLM desk opens', tweets[1])
+        self.assertEqual(generate_tweets([], 5), [])
+
+    def test_registry_loaded_from_data_file(self):
+        self.assertEqual(len(TEMPLATE_REGISTRY.formats), 6)
+        self.assertIn(('@cobie', 'would never fall for human trading cope 🧵'), TEMPLATE_REGISTRY.influencer_refs)
+
+
+if __name__ == '__main__':
+    unittest.main()
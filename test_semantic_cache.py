@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from llm_gateway import LLMGateway
+from semantic_cache import SemanticCache, vectorize
+from test_llm_cache import CountingCompletions
+
+PROMPT = ("Create a twitter post for software developers about autonomous AI agents.\n"
+          "Content type: tips\nTone: witty\nTarget audience interests: automation, open source, LLM tooling\n"
+          "Include a call to action from: reply, retweet, follow\nGenerated at 2024-05-01 09:00")
+SAME_BUT_LATER = PROMPT.replace('2024-05-01 09:00', '2024-05-02 17:30')
+REWORDED = PROMPT.replace('Tone: witty', 'Tone: witty and sharp')
+DIFFERENT = "Summarise the latest bitcoin ETF flows for institutional investors in one paragraph."
+
+
+def messages(text):
+    return [{'role': 'user', 'content': text}]
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'semantic.npz')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_vectors_ignore_numbers(self):
+        self.assertAlmostEqual(float(vectorize(PROMPT) @ vectorize(SAME_BUT_LATER)), 1.0, places=5)
+        self.assertLess(float(vectorize(PROMPT) @ vectorize(DIFFERENT)), 0.3)
+
+    def test_near_duplicates_hit_and_others_miss(self):
+        cache = SemanticCache(self.path)
+        cache.add('gpt-4', messages(PROMPT), 'cached')
+        self.assertEqual(cache.lookup('gpt-4', messages(SAME_BUT_LATER)), 'cached')
+        self.assertEqual(cache.lookup('gpt-4', messages(REWORDED)), 'cached')
+        self.assertIsNone(cache.lookup('gpt-4', messages(DIFFERENT)))
+        self.assertIsNone(cache.lookup('gpt-3.5-turbo', messages(PROMPT)))
+
+    def test_oldest_rows_are_overwritten_and_persisted(self):
+        cache = SemanticCache(self.path, max_entries=2)
+        for i, text in enumerate([DIFFERENT, PROMPT, "Explain zero knowledge proofs to a five year old"]):
+            cache.add('gpt-4', messages(text), f'body {i}')
+        self.assertIsNone(cache.lookup('gpt-4', messages(DIFFERENT)))
+        cache.save()
+
+        reloaded = SemanticCache(self.path, max_entries=2)
+        self.assertEqual(reloaded.size, 2)
+        self.assertEqual(reloaded.lookup('gpt-4', messages(PROMPT)), 'body 1')
+        self.assertTrue(np.allclose(reloaded.matrix, cache.matrix[[1, 0]]))
+
+    def test_gateway_reuses_near_duplicate_completion(self):
+        completions = CountingCompletions()
+        gateway = LLMGateway(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+                             semantic_cache=SemanticCache(self.path))
+
+        first = gateway.complete(messages(PROMPT), temperature=0.7, semantic=True)
+        second = gateway.complete(messages(SAME_BUT_LATER), temperature=0.7, semantic=True)
+        self.assertEqual((first, second), ('reply 1', 'reply 1'))
+        self.assertEqual(gateway.get_stats()['semantic_hits'], 1)
+
+        gateway.complete(messages(SAME_BUT_LATER), temperature=0.7)
+        gateway.complete(messages(SAME_BUT_LATER), temperature=0.7, semantic=True, use_cache=False)
+        self.assertEqual(completions.calls, 3)
+
+
+    def test_scope_must_match_exactly(self):
+        cache = SemanticCache(self.path)
+        cache.add('gpt-4', messages(PROMPT), 'phishing tip', scope='phishing')
+        self.assertIsNone(cache.lookup('gpt-4', messages(SAME_BUT_LATER), scope='malware'))
+        self.assertEqual(cache.lookup('gpt-4', messages(SAME_BUT_LATER), scope='phishing'), 'phishing tip')
+        cache.save()
+        self.assertIsNone(SemanticCache(self.path).lookup('gpt-4', messages(PROMPT)))
+
+    def test_gateway_scopes_by_params_and_topic(self):
+        completions = CountingCompletions()
+        gateway = LLMGateway(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+                             semantic_cache=SemanticCache(self.path))
+
+        phishing = PROMPT.replace('autonomous AI agents', 'protecting against phishing attacks')
+        malware = PROMPT.replace('autonomous AI agents', 'protecting against malware attacks')
+        gateway.complete(messages(phishing), temperature=0.7, semantic=True, semantic_key='phishing')
+        gateway.complete(messages(malware), temperature=0.7, semantic=True, semantic_key='malware')
+        gateway.complete(messages(phishing), temperature=0.7, max_tokens=50, semantic=True,
+                         semantic_key='phishing')
+        self.assertEqual(completions.calls, 3)
+        self.assertEqual(gateway.complete(messages(phishing), temperature=0.7, semantic=True,
+                                          semantic_key='phishing'), 'reply 1')
+        self.assertEqual(completions.calls, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+from singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_identical_calls_share_one_execution(self):
+        flight = SingleFlight()
+        executions = []
+
+        async def generate(topic):
+            executions.append(topic)
+            await asyncio.sleep(0.05)
+            return f'post about {topic}'
+
+        async def scenario():
+            calls = [flight.do(('generate', 'ai'), lambda: generate('ai')) for _ in range(5)]
+            calls.append(flight.do(('generate', 'defi'), lambda: generate('defi')))
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, ['post about ai'] * 5 + ['post about defi'])
+        self.assertEqual(executions, ['ai', 'defi'])
+        stats = flight.get_stats()
+        self.assertEqual((stats['calls'], stats['executions'], stats['saved'], stats['in_flight']), (6, 2, 4, 0))
+
+    def test_sequential_calls_run_again(self):
+        flight = SingleFlight()
+        counter = []
+
+        async def work():
+            counter.append(1)
+            return len(counter)
+
+        async def scenario():
+            return [await flight.do('key', work), await flight.do('key', work)]
+
+        self.assertEqual(asyncio.run(scenario()), [1, 2])
+
+    def test_errors_fan_out_and_cancelled_waiter_does_not_cancel_work(self):
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("upstream down")
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return 'done'
+
+        async def scenario():
+            failures = await asyncio.gather(*(flight.do('bad', failing) for _ in range(3)),
+                                            return_exceptions=True)
+            impatient = asyncio.ensure_future(flight.do('slow', slow))
+            patient = asyncio.ensure_future(flight.do('slow', slow))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            return failures, await patient
+
+        failures, result = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(error, RuntimeError) for error in failures))
+        self.assertEqual(result, 'done')
+        self.assertEqual(flight.get_stats()['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
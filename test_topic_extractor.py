@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from posting_system import TweetMemory
+from topic_extractor import TopicExtractor, tokenize
+
+HISTORY = [
+    'AI agents are eating crypto',
+    'Crypto AI tokens pump again',
+    'Why AI agents need wallets',
+    'Crypto markets love AI narratives',
+]
+
+
+class TestTopicExtractor(unittest.TestCase):
+    def test_tokenize_drops_noise(self):
+        tokens = tokenize("RT The #AI agent's $FET rally https://t.co/x 2024 is what we're watching")
+        self.assertEqual(tokens, ['ai', 'agent', 'fet', 'rally', 'watching'])
+
+    def test_common_history_terms_rank_below_distinctive_ones(self):
+        extractor = TopicExtractor(max_topics=2)
+        extractor.fit(HISTORY)
+        self.assertEqual(extractor.extract('AI crypto and zero knowledge proofs'), ['zero', 'knowledge'])
+
+    def test_unrelated_texts_share_no_topics(self):
+        extractor = TopicExtractor()
+        self.assertFalse(set(extractor.extract('Solana validators upgrade'))
+                         & set(extractor.extract('Privacy coins face delisting')))
+
+    def test_memoised_and_batched(self):
+        extractor = TopicExtractor()
+        first = extractor.extract('agents trading memecoins')
+        batch = extractor.extract_batch(['agents trading memecoins', 'gpu shortage', 'gpu shortage'])
+        self.assertEqual(batch[0], first)
+        self.assertEqual(batch[1], batch[2])
+        self.assertEqual(extractor.get_stats()['misses'], 2)
+
+    def test_vocabulary_refreshes_in_batches_and_persists(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'vocabulary.json')
+            extractor = TopicExtractor(path, refresh_every=2)
+            extractor.add_documents(HISTORY[:1])
+            self.assertEqual(extractor.documents, 0)
+            extractor.add_documents(HISTORY[1:2])
+            self.assertEqual(extractor.documents, 2)
+            self.assertEqual(TopicExtractor(path).document_frequency['crypto'], 2)
+
+    def test_tweet_memory_matches_on_real_topics(self):
+        memory = TweetMemory()
+        memory.store_interaction('Thoughts on zk rollups?', 'Rollups scale')
+        memory.store_interaction('Best meme coins this week?', 'None of them')
+        history = memory.get_relevant_history('Are rollups safe?')
+        self.assertEqual([item['response'] for item in history], ['Rollups scale'])
+
+
+if __name__ == '__main__':
+    unittest.main()
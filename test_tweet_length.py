@@ -0,0 +1,62 @@
+import unittest
+
+from real_crypto_news import CryptoNewsAggregator, generate_tweet
+from tweet_length import (MAX_TWEET_LENGTH, filter_tweets, is_valid_tweet, truncate_tweet,
+                          weighted_length)
+
+
+class TestWeightedLength(unittest.TestCase):
+    def test_latin_text_counts_one_per_character(self):
+        self.assertEqual(weighted_length('AI agents run a hedge fund'), 26)
+
+    def test_cjk_counts_double(self):
+        self.assertEqual(weighted_length('\u4eba\u5de5\u667a\u80fd'), 8)
+
+    def test_emoji_sequences_count_two(self):
+        self.assertEqual(weighted_length('\U0001f916'), 2)
+        self.assertEqual(weighted_length('\U0001f469\U0001f3fd\u200d\U0001f4bb'), 2)
+        self.assertEqual(weighted_length('\U0001f1fa\U0001f1f8'), 2)
+
+    def test_urls_count_as_tco_links(self):
+        self.assertEqual(weighted_length('read https://example.com/a/very/long/path/to/an/article'), 5 + 23)
+
+    def test_validity(self):
+        self.assertTrue(is_valid_tweet('a' * MAX_TWEET_LENGTH))
+        self.assertFalse(is_valid_tweet('a' * (MAX_TWEET_LENGTH + 1)))
+        self.assertFalse(is_valid_tweet('   '))
+        self.assertFalse(is_valid_tweet('\u4eba' * 141))
+
+
+class TestTruncation(unittest.TestCase):
+    def test_truncated_tweet_fits(self):
+        tweet = truncate_tweet('word ' * 100)
+        self.assertEqual(weighted_length(tweet), MAX_TWEET_LENGTH)
+        self.assertTrue(tweet.endswith('\u2026'))
+
+    def test_url_and_emoji_are_never_split(self):
+        text = 'x' * 260 + ' https://example.com/article \U0001f916'
+        tweet = truncate_tweet(text)
+        self.assertNotIn('https://', tweet)
+        self.assertLessEqual(weighted_length(tweet), MAX_TWEET_LENGTH)
+
+        tweet = truncate_tweet('x' * 278 + '\U0001f469\u200d\U0001f4bb tail')
+        self.assertNotIn('\U0001f469', tweet)
+
+    def test_filter_tweets(self):
+        candidates = ['short', 'x' * 300]
+        self.assertEqual(filter_tweets(candidates), ['short'])
+        self.assertEqual(len(filter_tweets(candidates, trim=True)), 2)
+
+
+class TestGeneratedTweetsFit(unittest.TestCase):
+    def test_long_headline_and_insight_are_fitted(self):
+        aggregator = CryptoNewsAggregator()
+        news_item = {'title': 'AI ' * 120, 'ai_insights': ['machine learning ' * 30]}
+        for _ in range(20):
+            tweet = generate_tweet(news_item, aggregator=aggregator)
+            self.assertLessEqual(weighted_length(tweet), MAX_TWEET_LENGTH)
+            self.assertTrue(tweet.endswith('#TheNetwork'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from posting_system import TweetMemory
+
+
+class KeywordTweetMemory(TweetMemory):
+    """TweetMemory whose topics are just the tweet's words"""
+
+    def _extract_topics(self, text):
+        return text.split()
+
+
+class TestTweetMemory(unittest.TestCase):
+    def setUp(self):
+        self.memory = KeywordTweetMemory(history_limit=2)
+
+    def test_ranks_by_overlap_then_recency(self):
+        self.memory.store_interaction('ai agents', 'r1')
+        self.memory.store_interaction('ai', 'r2')
+        self.memory.store_interaction('ai privacy', 'r3')
+        self.memory.store_interaction('tech', 'r4')
+        for i, interaction in enumerate(self.memory.interactions.values()):
+            interaction['timestamp'] = f'2024-01-01T00:00:0{i}'
+        history = self.memory.get_relevant_history('ai agents')
+        self.assertEqual([item['response'] for item in history], ['r1', 'r3'])
+
+    def test_unrelated_interactions_are_never_returned(self):
+        self.memory.store_interaction('tech', 'r1')
+        self.assertEqual(self.memory.get_relevant_history('ai'), [])
+
+    def test_repeated_topics_count_once(self):
+        self.memory.store_interaction('ai ai ai', 'r1')
+        self.memory.store_interaction('ai agents', 'r2')
+        history = self.memory.get_relevant_history('ai agents')
+        self.assertEqual(history[0]['response'], 'r2')
+        self.assertEqual(self.memory.topic_index['ai'], list(self.memory.interactions))
+
+
+if __name__ == '__main__':
+    unittest.main()
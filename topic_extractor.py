@@ -0,0 +1,178 @@
+"""Lightweight topic extraction for conversation memory.
+
+Text is tokenised (URLs, numbers and stopwords dropped, #hashtags and
+$cashtags reduced to their word) and each token is scored by TF-IDF
+against a vocabulary of document frequencies built from our own posts, so
+words we use in every tweet ("crypto", "ai") rank below the ones that make
+a tweet distinctive. Results are memoised by content hash; new posts are
+folded into the vocabulary in batches so the memo is not thrown away on
+every post.
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_TOKEN_RE = re.compile(r"[#$]?[a-z0-9][a-z0-9_'-]*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down
+during each few for from further get gets got had hadn't has hasn't have haven't having he her here hers
+herself him himself his how i i'm if in into is isn't it it's its itself just let's like me more most
+much my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should shouldn't so some such than that that's the their theirs them themselves then there there's these
+they they're this those through to too under until up us very via was wasn't we we're were weren't what
+what's when where which while who whom why will with won't would wouldn't yet you you're your yours
+yourself yourselves
+amp co com gonna http https lol new rt take thing things think today via www yeah
+""".split())
+
+
+def tokenize(text):
+    """Split text into lowercase content words"""
+    tokens = []
+    for token in _TOKEN_RE.findall(_URL_RE.sub(' ', (text or '').lower())):
+        token = token.lstrip('#$').rstrip("'-")
+        if token.endswith("'s"):
+            token = token[:-2]
+        if len(token) < 2 or token.isdigit() or token in STOPWORDS:
+            continue
+        tokens.append(token)
+    return tokens
+
+
+class TopicExtractor:
+    """Top TF-IDF terms of a text against a post-history vocabulary.
+
+    Texts passed to `add_documents` are queued and folded into the document
+    frequencies every `refresh_every` texts; the memo is cleared only then.
+    The vocabulary keeps the `max_vocabulary` most common terms and is saved
+    to `path` (if given) on every refresh.
+    """
+
+    def __init__(self, path=None, max_topics=5, refresh_every=20, max_vocabulary=20000, cache_size=4096):
+        self.path = path
+        self.max_topics = max_topics
+        self.refresh_every = refresh_every
+        self.max_vocabulary = max_vocabulary
+        self.cache_size = cache_size
+        self.documents = 0
+        self.document_frequency = Counter()
+        self.pending = []
+        self._cache = OrderedDict()  # content hash -> topics
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the vocabulary from disk, starting empty if missing or corrupt."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.documents = state.get('documents', 0)
+            self.document_frequency = Counter(state.get('document_frequency', {}))
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Error loading topic vocabulary: {str(e)}")
+
+    def save(self):
+        """Atomically write the vocabulary to disk."""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        state = {'documents': self.documents, 'document_frequency': self.document_frequency}
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def fit(self, texts):
+        """Rebuild the vocabulary from a full post history"""
+        self.documents = 0
+        self.document_frequency = Counter()
+        self.pending = list(texts)
+        self.refresh()
+
+    def add_documents(self, texts):
+        """Queue posts for the vocabulary, refreshing it once enough have arrived"""
+        self.pending.extend(texts)
+        if len(self.pending) >= self.refresh_every:
+            self.refresh()
+
+    def refresh(self):
+        """Fold queued posts into the vocabulary"""
+        for text in self.pending:
+            self.document_frequency.update(set(tokenize(text)))
+            self.documents += 1
+        self.pending = []
+        if len(self.document_frequency) > self.max_vocabulary:
+            self.document_frequency = Counter(dict(self.document_frequency.most_common(self.max_vocabulary)))
+        with self._lock:
+            self._cache.clear()
+        self.save()
+
+    def idf(self, term):
+        """Smoothed inverse document frequency; unseen terms score highest"""
+        return math.log((1 + self.documents) / (1 + self.document_frequency.get(term, 0))) + 1
+
+    def _compute(self, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        counts = Counter(tokens)
+        first_seen = {}
+        for position, token in enumerate(tokens):
+            first_seen.setdefault(token, position)
+        # Highest TF-IDF first; ties go to the term that appears earlier
+        return heapq.nlargest(self.max_topics, counts,
+                              key=lambda term: (counts[term] * self.idf(term), -first_seen[term]))
+
+    def extract(self, text):
+        """Get the text's topics, best first"""
+        key = hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+        with self._lock:
+            topics = self._cache.get(key)
+            if topics is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return list(topics)
+            self.stats['misses'] += 1
+        topics = self._compute(text)
+        with self._lock:
+            self._cache[key] = topics
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(topics)
+
+    def extract_batch(self, texts):
+        """Get topics for many texts, computing each distinct text once"""
+        unique = {}
+        for text in texts:
+            if text not in unique:
+                unique[text] = self.extract(text)
+        return [list(unique[text]) for text in texts]
+
+    def get_stats(self):
+        """Get memo counters plus the hit rate and vocabulary size"""
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['documents'] = self.documents
+        stats['vocabulary'] = len(self.document_frequency)
+        return stats
@@ -0,0 +1,110 @@
+"""Twitter weighted tweet length, matching twitter-text's v3 counting rules.
+
+* Code points in the "light" ranges (Latin, most punctuation) weigh 1,
+  everything else (CJK, most symbols) weighs 2.
+* Every emoji sequence, including ZWJ, skin-tone and flag sequences, weighs 2.
+* Every URL counts as 23, the length of its t.co link.
+* Text is NFC-normalised before counting.
+
+Only URLs with an explicit scheme or a leading "www." are recognised; bare
+domains like "example.com" are counted as plain text.
+"""
+
+import re
+import unicodedata
+
+MAX_TWEET_LENGTH = 280
+URL_LENGTH = 23
+ELLIPSIS = '\u2026'
+
+# Code point ranges weighing 1 (twitter-text config v3); everything else weighs 2
+_LIGHT_RANGES = '\u0000-\u10ff\u2000-\u200d\u2010-\u201f\u2032-\u2037'
+_HEAVY_RE = re.compile(f'[^{_LIGHT_RANGES}]')
+
+_URL_PATTERN = r'(?:https?://|www\.)[^\s<>"]+[^\s<>".,:;!?\'")\]]'
+
+_PICTOGRAPH = (
+    '\u00a9\u00ae\u203c\u2049\u2122\u2139\u2194-\u2199\u21a9\u21aa\u231a\u231b\u2328\u23cf'
+    '\u23e9-\u23f3\u23f8-\u23fa\u24c2\u25aa\u25ab\u25b6\u25c0\u25fb-\u25fe\u2600-\u27bf'
+    '\u2934\u2935\u2b05-\u2b07\u2b1b\u2b1c\u2b50\u2b55\u3030\u303d\u3297\u3299'
+    '\U0001f000-\U0001faff'
+)
+_EMOJI_MODIFIERS = '\ufe0f\U0001f3fb-\U0001f3ff\U000e0020-\U000e007f'
+_EMOJI_PATTERN = (
+    r'[\U0001f1e6-\U0001f1ff]{2}'  # flags
+    '|[0-9#*]\ufe0f?\u20e3'  # keycaps
+    f'|[{_PICTOGRAPH}][{_EMOJI_MODIFIERS}]*(?:\u200d[{_PICTOGRAPH}][{_EMOJI_MODIFIERS}]*)*'
+)
+
+_TOKEN_RE = re.compile(f'(?P<url>{_URL_PATTERN})|(?P<emoji>{_EMOJI_PATTERN})')
+
+
+def _plain_length(text):
+    if text.isascii():
+        return len(text)
+    return len(text) + len(_HEAVY_RE.findall(text))
+
+
+def _tokens(text):
+    """Yield (segment, weighted length) pieces; URLs and emoji are never split."""
+    position = 0
+    for match in _TOKEN_RE.finditer(text):
+        if match.start() > position:
+            yield text[position:match.start()], None
+        yield match.group(0), URL_LENGTH if match.lastgroup == 'url' else 2
+        position = match.end()
+    if position < len(text):
+        yield text[position:], None
+
+
+def weighted_length(text):
+    """Get the length Twitter counts against the 280 limit."""
+    text = unicodedata.normalize('NFC', text)
+    return sum(_plain_length(segment) if length is None else length
+               for segment, length in _tokens(text))
+
+
+def is_valid_tweet(text, max_length=MAX_TWEET_LENGTH):
+    """Check that a tweet is non-empty and within the weighted limit."""
+    return bool(text.strip()) and weighted_length(text) <= max_length
+
+
+def truncate_tweet(text, max_length=MAX_TWEET_LENGTH, ellipsis=ELLIPSIS):
+    """Cut a tweet to fit the weighted limit, ending with an ellipsis.
+
+    URLs and emoji are dropped whole rather than cut in half.
+    """
+    text = unicodedata.normalize('NFC', text)
+    if weighted_length(text) <= max_length:
+        return text
+
+    budget = max_length - weighted_length(ellipsis)
+    parts = []
+    for segment, length in _tokens(text):
+        if length is not None:
+            if length > budget:
+                break
+            parts.append(segment)
+            budget -= length
+            continue
+        for char in segment:
+            char_length = _plain_length(char)
+            if char_length > budget:
+                break
+            parts.append(char)
+            budget -= char_length
+        else:
+            continue
+        break
+    return ''.join(parts).rstrip() + ellipsis
+
+
+def filter_tweets(candidates, max_length=MAX_TWEET_LENGTH, trim=False):
+    """Drop candidates over the weighted limit, or truncate them when trim is set."""
+    result = []
+    for candidate in candidates:
+        if is_valid_tweet(candidate, max_length):
+            result.append(candidate)
+        elif trim and candidate.strip():
+            result.append(truncate_tweet(candidate, max_length))
+    return result